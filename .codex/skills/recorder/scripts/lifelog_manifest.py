@@ -0,0 +1,196 @@
+import json
+import os
+
+from lifelog_segments import SEGMENT_SUFFIX, list_segments, read_day, read_footer
+from record_codec import loads
+from record_patches import load_patches, patch_record
+from record_rollup import ROLLUP_NAME, count_module_status, lifelog_rollup, merge_cells, write_rollup
+
+
+MANIFEST_NAME = "manifest.json"
+MANIFEST_VERSION = 2
+
+
+def get_manifest_path(lifelog_root: str) -> str:
+    return os.path.join(lifelog_root, MANIFEST_NAME)
+
+
+def day_key(lifelog_root: str, path: str) -> str | None:
+    parts = os.path.relpath(path, lifelog_root).replace(os.sep, "/").split("/")
+    if len(parts) != 3 or not parts[2].endswith(".jsonl"):
+        return None
+    return f"{parts[0]}-{parts[1]}-{parts[2][: -len('.jsonl')]}"
+
+
+def summarize(records) -> dict:
+    records = list(records)
+    low = high = None
+    for data in records:
+        timestamp = data.get("timestamp")
+        if isinstance(timestamp, str) and timestamp:
+            low = timestamp if low is None or timestamp < low else low
+            high = timestamp if high is None or timestamp > high else high
+    return {"count": len(records), "min_ts": low, "max_ts": high, "rollup": count_module_status(records)}
+
+
+def _parse_lines(raw: bytes):
+    offset = 0
+    for line in raw.split(b"\n"):
+        start = offset
+        offset += len(line) + 1
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            data = loads(line.decode("utf-8", errors="replace"))
+        except json.JSONDecodeError:
+            continue
+        if isinstance(data, dict):
+            yield start, data
+
+
+def _parse(raw: bytes):
+    for _, data in _parse_lines(raw):
+        yield data
+
+
+def _current_records(raw: bytes, patches: list):
+    for offset, data in _parse_lines(raw):
+        if patches:
+            data = patch_record(data, patches, offset)
+            if data is None:
+                continue
+        yield data
+
+
+def scan_day_file(lifelog_root: str, path: str) -> dict:
+    with open(path, "rb") as f:
+        raw = f.read()
+    entry = summarize(_current_records(raw, load_patches(path)))
+    entry["file"] = os.path.relpath(path, lifelog_root).replace(os.sep, "/")
+    entry["bytes"] = len(raw)
+    return entry
+
+
+def scan_segment(lifelog_root: str, path: str) -> dict:
+    footer = read_footer(path)
+    year, month = footer["month"].split("-")
+    rel = os.path.relpath(path, lifelog_root).replace(os.sep, "/")
+    days = {}
+    for day, frame in footer["days"].items():
+        entry = summarize(_parse(read_day(path, day, footer)))
+        entry.update({"segment": rel, "offset": frame["offset"], "length": frame["length"], "bytes": frame["bytes"]})
+        days[f"{year}-{month}-{day}"] = entry
+    return days
+
+
+def load_manifest(lifelog_root: str) -> dict | None:
+    try:
+        with open(get_manifest_path(lifelog_root), "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return None
+    if not isinstance(manifest, dict) or manifest.get("version") != MANIFEST_VERSION:
+        return None
+    return manifest
+
+
+def write_manifest(lifelog_root: str, manifest: dict) -> None:
+    manifest["days"] = dict(sorted(manifest["days"].items()))
+    path = get_manifest_path(lifelog_root)
+    os.makedirs(lifelog_root, exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8", newline="\n") as f:
+        json.dump(manifest, f, ensure_ascii=False, separators=(",", ":"))
+    os.replace(tmp_path, path)
+    write_rollup(os.path.join(lifelog_root, ROLLUP_NAME), lifelog_rollup(manifest))
+
+
+def rebuild_manifest(lifelog_root: str, day_files: list[str]) -> dict:
+    days = {}
+    for path in list_segments(lifelog_root):
+        try:
+            days.update(scan_segment(lifelog_root, path))
+        except (OSError, ValueError):
+            continue
+    for path in day_files:
+        key = day_key(lifelog_root, path)
+        if key is not None:
+            days[key] = scan_day_file(lifelog_root, path)
+    manifest = {"version": MANIFEST_VERSION, "days": days}
+    write_manifest(lifelog_root, manifest)
+    return manifest
+
+
+def note_day_append(lifelog_root: str, path: str, before_size: int, records: list, list_day_files) -> None:
+    key = day_key(lifelog_root, path)
+    if key is None:
+        return
+    manifest = load_manifest(lifelog_root)
+    if manifest is None:
+        rebuild_manifest(lifelog_root, list_day_files())
+        return
+    entry = manifest["days"].get(key)
+    if before_size == 0:
+        entry = {"count": 0, "min_ts": None, "max_ts": None, "rollup": {},
+                 "file": os.path.relpath(path, lifelog_root).replace(os.sep, "/")}
+    elif entry is None or entry.get("file") is None or entry.get("bytes") != before_size:
+        # The day file changed outside the recorder since the manifest last saw it.
+        manifest["days"][key] = scan_day_file(lifelog_root, path)
+        write_manifest(lifelog_root, manifest)
+        return
+    added = summarize(records)
+    entry["count"] += added["count"]
+    for bound, pick in (("min_ts", min), ("max_ts", max)):
+        values = [v for v in (entry.get(bound), added[bound]) if v]
+        entry[bound] = pick(values) if values else None
+    entry["rollup"] = merge_cells(entry.get("rollup") or {}, added["rollup"])
+    entry["bytes"] = os.path.getsize(path)
+    manifest["days"][key] = entry
+    write_manifest(lifelog_root, manifest)
+
+
+def refresh_stale_days(lifelog_root: str, list_day_files) -> bool:
+    manifest = load_manifest(lifelog_root)
+    if manifest is None:
+        rebuild_manifest(lifelog_root, list_day_files())
+        return True
+    changed = False
+    present = set()
+    for path in list_day_files():
+        key = day_key(lifelog_root, path)
+        if key is None:
+            continue
+        present.add(key)
+        entry = manifest["days"].get(key)
+        if entry is None or entry.get("file") is None or entry.get("bytes") != os.path.getsize(path):
+            manifest["days"][key] = scan_day_file(lifelog_root, path)
+            changed = True
+    for key in [k for k, v in manifest["days"].items() if v.get("file") and k not in present]:
+        del manifest["days"][key]
+        changed = True
+    if changed:
+        write_manifest(lifelog_root, manifest)
+    return changed
+
+
+def refresh_days(lifelog_root: str, paths: list[str], list_day_files) -> None:
+    manifest = load_manifest(lifelog_root)
+    if manifest is None:
+        rebuild_manifest(lifelog_root, list_day_files())
+        return
+    for path in paths:
+        if path.endswith(SEGMENT_SUFFIX):
+            rel = os.path.relpath(path, lifelog_root).replace(os.sep, "/")
+            manifest["days"] = {k: v for k, v in manifest["days"].items() if v.get("segment") != rel}
+            if os.path.exists(path):
+                manifest["days"].update(scan_segment(lifelog_root, path))
+            continue
+        key = day_key(lifelog_root, path)
+        if key is None:
+            continue
+        if os.path.exists(path):
+            manifest["days"][key] = scan_day_file(lifelog_root, path)
+        elif manifest["days"].get(key, {}).get("file"):
+            del manifest["days"][key]
+    write_manifest(lifelog_root, manifest)
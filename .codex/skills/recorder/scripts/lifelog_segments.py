@@ -0,0 +1,122 @@
+import gzip
+import json
+import os
+import struct
+
+from record_codec import id_needles, loads, may_contain
+
+
+SEGMENT_SUFFIX = ".seg"
+SEGMENT_MAGIC = b"LKS1"
+SEGMENT_VERSION = 1
+TRAILER = struct.Struct("<QI4s")
+
+
+def get_segment_path(lifelog_root: str, year: str, month: str) -> str:
+    return os.path.join(lifelog_root, year, month + SEGMENT_SUFFIX)
+
+
+def list_segments(lifelog_root: str) -> list[str]:
+    segments = []
+    if not os.path.isdir(lifelog_root):
+        return segments
+    for year in sorted(os.listdir(lifelog_root)):
+        year_dir = os.path.join(lifelog_root, year)
+        if year.startswith(".") or not os.path.isdir(year_dir):
+            continue
+        for name in sorted(os.listdir(year_dir)):
+            if name.endswith(SEGMENT_SUFFIX):
+                segments.append(os.path.join(year_dir, name))
+    return segments
+
+
+def write_segment(path: str, month: str, days: dict[str, bytes]) -> dict:
+    frames = []
+    footer: dict = {"version": SEGMENT_VERSION, "month": month, "days": {}}
+    offset = 0
+    for day in sorted(days):
+        data = days[day]
+        if not data.strip():
+            continue
+        frame = gzip.compress(data, mtime=0)
+        count = sum(1 for line in data.splitlines() if line.strip())
+        footer["days"][day] = {"offset": offset, "length": len(frame), "count": count, "bytes": len(data)}
+        frames.append(frame)
+        offset += len(frame)
+    footer_bytes = json.dumps(footer, ensure_ascii=False, sort_keys=True).encode("utf-8")
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        for frame in frames:
+            f.write(frame)
+        f.write(footer_bytes)
+        f.write(TRAILER.pack(offset, len(footer_bytes), SEGMENT_MAGIC))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    return footer
+
+
+def read_footer(path: str) -> dict:
+    with open(path, "rb") as f:
+        f.seek(-TRAILER.size, os.SEEK_END)
+        footer_offset, footer_length, magic = TRAILER.unpack(f.read(TRAILER.size))
+        if magic != SEGMENT_MAGIC:
+            raise ValueError(f"not a lifelog segment: {path}")
+        f.seek(footer_offset)
+        return json.loads(f.read(footer_length))
+
+
+def read_frame(path: str, offset: int, length: int) -> bytes:
+    with open(path, "rb") as f:
+        f.seek(offset)
+        return gzip.decompress(f.read(length))
+
+
+def read_day(path: str, day: str, footer: dict | None = None) -> bytes:
+    footer = footer or read_footer(path)
+    frame = footer["days"].get(day)
+    if frame is None:
+        return b""
+    return read_frame(path, frame["offset"], frame["length"])
+
+
+def read_all_days(path: str) -> dict[str, bytes]:
+    footer = read_footer(path)
+    return {day: read_day(path, day, footer) for day in footer["days"]}
+
+
+def scan_segment_offsets(path: str):
+    footer = read_footer(path)
+    for day in sorted(footer["days"]):
+        frame = footer["days"][day]
+        data = read_frame(path, frame["offset"], frame["length"])
+        inner = 0
+        for raw in data.splitlines(keepends=True):
+            line = raw.strip()
+            if line:
+                try:
+                    record = loads(line)
+                except (json.JSONDecodeError, UnicodeDecodeError):
+                    record = None
+                if isinstance(record, dict) and record.get("id"):
+                    yield str(record["id"]), frame["offset"], frame["length"], inner, len(raw)
+            inner += len(raw)
+
+
+def find_day_with_id(path: str, record_id: str) -> str | None:
+    footer = read_footer(path)
+    needles = id_needles(record_id)
+    for day in sorted(footer["days"]):
+        data = read_day(path, day, footer)
+        if not may_contain(data, needles):
+            continue
+        for line in data.splitlines():
+            if not may_contain(line, needles):
+                continue
+            try:
+                record = loads(line)
+            except (json.JSONDecodeError, UnicodeDecodeError):
+                continue
+            if isinstance(record, dict) and record.get("id") == record_id:
+                return day
+    return None
@@ -0,0 +1,133 @@
+import json
+import socket
+import sys
+
+import record_jsonl
+from record_profile import profile_mode
+from record_service import get_service_address, parse_address
+
+
+CONNECT_TIMEOUT = 0.5
+
+
+def connect_service(address: str | None = None) -> socket.socket | None:
+    try:
+        kind, target = parse_address(get_service_address(address))
+    except SystemExit:
+        return None
+    family = socket.AF_UNIX if kind == "unix" else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.settimeout(CONNECT_TIMEOUT)
+    try:
+        sock.connect(target)
+    except OSError:
+        sock.close()
+        return None
+    sock.settimeout(None)
+    return sock
+
+
+def send_commands(commands: list, address: str | None = None) -> list | None:
+    sock = connect_service(address)
+    if sock is None:
+        return None
+    responses = []
+    with sock:
+        payload = "".join(json.dumps(c, ensure_ascii=False) + "\n" for c in commands)
+        try:
+            sock.sendall(payload.encode("utf-8"))
+            sock.shutdown(socket.SHUT_WR)
+            with sock.makefile("rb") as f:
+                for line in f:
+                    if line.strip():
+                        responses.append(json.loads(line))
+        except OSError:
+            pass
+    return responses
+
+
+def run_commands(commands: list, address: str | None = None) -> list:
+    responses = send_commands(commands, address)
+    if responses is not None:
+        # Commands the service may have started are never replayed locally, so writes run at most once.
+        lost = {"ok": False, "error": "recorder service closed the connection before answering"}
+        return responses + [dict(lost) for _ in commands[len(responses):]]
+    schema = record_jsonl.load_schema()
+    return [record_jsonl.execute_command(command, schema) for command in commands]
+
+
+def command_from_args(args) -> dict:
+    defaults = record_jsonl.get_command_defaults()
+    command = {}
+    for key, value in vars(args).items():
+        if key in ("record_type", "input") or value == defaults.get(key):
+            continue
+        command[key] = value
+    if args.record_type in ("update", "delete"):
+        command["op"] = args.record_type
+    else:
+        command["op"] = "create"
+        command["record_type"] = args.record_type
+    return command
+
+
+def main() -> None:
+    parser = record_jsonl.build_parser()
+    args = parser.parse_args()
+    if profile_mode(args.profile) is not None:
+        # Traces time this process, so a profiled command runs in-process instead of through the service.
+        record_jsonl.main()
+        return
+    if args.record_type == "compact":
+        record_jsonl.compact_all(args)
+        return
+    if args.record_type == "archive":
+        record_jsonl.archive_lifelog(args)
+        return
+    if args.record_type == "query":
+        record_jsonl.print_query(args)
+        return
+    if args.record_type == "search":
+        record_jsonl.print_search(args)
+        return
+    if args.record_type == "dedupe":
+        record_jsonl.print_dedupe(args)
+        return
+    if args.record_type == "sync":
+        record_jsonl.sync_mirror(args)
+        return
+    if args.record_type == "profile":
+        record_jsonl.print_profile_summary(args)
+        return
+
+    if args.record_type == "batch":
+        source = sys.stdin if args.input in (None, "-") else open(args.input, "r", encoding="utf-8")
+        try:
+            commands = []
+            for line in source:
+                if not line.strip():
+                    continue
+                try:
+                    command = json.loads(line)
+                except json.JSONDecodeError:
+                    command = line.strip()
+                if isinstance(command, dict) and args.write_mode:
+                    command.setdefault("write_mode", args.write_mode)
+                if isinstance(command, dict) and args.fsync:
+                    command.setdefault("fsync", True)
+                commands.append(command)
+        finally:
+            if source is not sys.stdin:
+                source.close()
+        for response in run_commands(commands):
+            print(json.dumps(response, ensure_ascii=False))
+        return
+
+    response = run_commands([command_from_args(args)])[0]
+    if not response.get("ok"):
+        raise SystemExit(response.get("error"))
+    print(json.dumps(response, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
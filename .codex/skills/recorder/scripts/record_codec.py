@@ -0,0 +1,61 @@
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+BACKEND = "orjson" if orjson is not None else "json"
+
+
+if orjson is not None:
+    def _decode(data):
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            # orjson is stricter than stdlib (NaN, huge ints, lone surrogates); keep stdlib semantics.
+            return json.loads(data)
+else:
+    _decode = json.loads
+
+
+def loads(data):
+    return _decode(data)
+
+
+def dumps(data) -> str:
+    # Encoding stays on stdlib so rewritten lines are byte-identical to what the recorder always wrote.
+    return json.dumps(data, ensure_ascii=False)
+
+
+def wrap_decoder(wrap):
+    global _decode
+    previous = _decode
+    _decode = wrap(previous)
+    return previous
+
+
+def restore_decoder(previous) -> None:
+    global _decode
+    _decode = previous
+
+
+def value_needles(value) -> tuple[bytes, ...]:
+    if isinstance(value, str):
+        forms = {json.dumps(value, ensure_ascii=False)[1:-1], json.dumps(value)[1:-1]}
+    else:
+        forms = {json.dumps(value, ensure_ascii=False)}
+    return tuple(form.encode("utf-8") for form in forms)
+
+
+def id_needles(record_id: str) -> tuple[bytes, ...]:
+    return tuple(b'"' + needle + b'"' for needle in value_needles(str(record_id)))
+
+
+def may_contain(raw: bytes, needles: tuple[bytes, ...]) -> bool:
+    return any(needle in raw for needle in needles)
+
+
+def may_match(raw: bytes, groups: list) -> bool:
+    return all(may_contain(raw, needles) for needles in groups)
@@ -0,0 +1,99 @@
+import hashlib
+import random
+import sqlite3
+import struct
+
+from record_search import tokenize
+from record_snapshot import StateView
+
+
+DEDUPE_VERSION = "1"
+DEDUPE_FIELDS = ("title", "summary")
+MINHASH_PERMUTATIONS = 64
+LSH_BANDS = 16
+LSH_ROWS = MINHASH_PERMUTATIONS // LSH_BANDS
+DEFAULT_THRESHOLD = 0.5
+MERSENNE_PRIME = (1 << 61) - 1
+MAX_HASH = (1 << 32) - 1
+SIGNATURE = struct.Struct(f"<{MINHASH_PERMUTATIONS}I")
+
+_rng = random.Random(20240611)
+PERMUTATIONS = tuple(
+    (_rng.randrange(1, MERSENNE_PRIME), _rng.randrange(0, MERSENNE_PRIME)) for _ in range(MINHASH_PERMUTATIONS)
+)
+
+
+def shingles(record: dict) -> set[str]:
+    text = " ".join(str(record.get(field) or "") for field in DEDUPE_FIELDS)
+    return set(tokenize(text))
+
+
+def minhash(tokens: set[str]) -> tuple[int, ...] | None:
+    if not tokens:
+        return None
+    hashes = [int.from_bytes(hashlib.blake2b(t.encode("utf-8"), digest_size=8).digest(), "little") for t in tokens]
+    return tuple(min(((a * h + b) % MERSENNE_PRIME) & MAX_HASH for h in hashes) for a, b in PERMUTATIONS)
+
+
+def band_keys(signature: tuple[int, ...]) -> list[tuple[int, bytes]]:
+    keys = []
+    for band in range(LSH_BANDS):
+        rows = signature[band * LSH_ROWS:(band + 1) * LSH_ROWS]
+        keys.append((band, hashlib.blake2b(struct.pack(f"<{LSH_ROWS}I", *rows), digest_size=8).digest()))
+    return keys
+
+
+def similarity(left: tuple[int, ...], right: tuple[int, ...]) -> float:
+    return sum(1 for a, b in zip(left, right) if a == b) / MINHASH_PERMUTATIONS
+
+
+class DuplicateIndex(StateView):
+    version = DEDUPE_VERSION
+    tables = ("signatures", "bands")
+
+    def create_tables(self, conn: sqlite3.Connection) -> None:
+        conn.execute("CREATE TABLE IF NOT EXISTS signatures (id TEXT PRIMARY KEY, title TEXT, timestamp TEXT, sig BLOB)")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS bands (band INTEGER, key BLOB, id TEXT, PRIMARY KEY (band, key, id)) WITHOUT ROWID"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS bands_id ON bands (id)")
+
+    def add(self, conn: sqlite3.Connection, records: list) -> None:
+        for record in records:
+            signature = minhash(shingles(record))
+            if signature is None:
+                continue
+            doc_id = str(record["id"])
+            conn.execute(
+                "INSERT OR REPLACE INTO signatures (id, title, timestamp, sig) VALUES (?, ?, ?, ?)",
+                (doc_id, record.get("title"), record.get("timestamp"), SIGNATURE.pack(*signature)),
+            )
+            conn.executemany(
+                "INSERT OR REPLACE INTO bands (band, key, id) VALUES (?, ?, ?)",
+                ((band, key, doc_id) for band, key in band_keys(signature)),
+            )
+
+    def remove(self, conn: sqlite3.Connection, ids: list) -> None:
+        conn.executemany("DELETE FROM bands WHERE id = ?", ((i,) for i in ids))
+        conn.executemany("DELETE FROM signatures WHERE id = ?", ((i,) for i in ids))
+
+    def find_duplicates(self, candidate: dict, threshold: float = DEFAULT_THRESHOLD, limit: int = 5) -> list[dict]:
+        self.ensure_fresh()
+        signature = minhash(shingles(candidate))
+        if signature is None:
+            return []
+        conn = self.connect()
+        ids: set[str] = set()
+        for band, key in band_keys(signature):
+            ids.update(row[0] for row in conn.execute("SELECT id FROM bands WHERE band = ? AND key = ?", (band, key)))
+        ids.discard(str(candidate.get("id") or ""))
+        matches = []
+        for doc_id in ids:
+            row = conn.execute("SELECT title, timestamp, sig FROM signatures WHERE id = ?", (doc_id,)).fetchone()
+            if row is None:
+                continue
+            score = similarity(signature, SIGNATURE.unpack(row[2]))
+            if score >= threshold:
+                matches.append({"id": doc_id, "title": row[0], "timestamp": row[1], "similarity": round(score, 4)})
+        matches.sort(key=lambda match: match["similarity"], reverse=True)
+        return matches[:limit]
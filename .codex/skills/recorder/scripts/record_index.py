@@ -0,0 +1,197 @@
+import json
+import os
+import sqlite3
+import zlib
+from typing import Callable
+
+from lifelog_segments import SEGMENT_SUFFIX, read_frame, scan_segment_offsets
+from record_codec import loads
+from record_profile import timed
+
+
+INDEX_VERSION = "2"
+INDEX_DIRNAME = ".index"
+
+
+def file_stamp(path: str) -> tuple[int, int] | None:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_size, st.st_mtime_ns
+
+
+def scan_line_offsets(path: str):
+    offset = 0
+    with open(path, "rb") as f:
+        for raw in f:
+            length = len(raw)
+            line = raw.strip()
+            if line:
+                try:
+                    data = loads(line)
+                except (json.JSONDecodeError, UnicodeDecodeError):
+                    data = None
+                if isinstance(data, dict) and data.get("id"):
+                    yield str(data["id"]), offset, length, None, None
+            offset += length
+
+
+def scan_entries(path: str):
+    if path.endswith(SEGMENT_SUFFIX):
+        return scan_segment_offsets(path)
+    return scan_line_offsets(path)
+
+
+class RecordIndex:
+    def __init__(self, path: str, list_files: Callable[[], list[str]]) -> None:
+        self.path = path
+        self.list_files = list_files
+        self._conn: sqlite3.Connection | None = None
+
+    def connect(self) -> sqlite3.Connection:
+        if self._conn is not None:
+            return self._conn
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        row = conn.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()
+        if row is None or row[0] != INDEX_VERSION:
+            conn.execute("DROP TABLE IF EXISTS files")
+            conn.execute("DROP TABLE IF EXISTS ids")
+            conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('version', ?)", (INDEX_VERSION,))
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS files (path TEXT PRIMARY KEY, size INTEGER, mtime_ns INTEGER)"
+        )
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS ids (id TEXT PRIMARY KEY, path TEXT, offset INTEGER, length INTEGER, "
+            "inner_offset INTEGER, inner_length INTEGER)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS ids_path ON ids (path)")
+        conn.commit()
+        self._conn = conn
+        return conn
+
+    def close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def stored_stamp(self, path: str) -> tuple[int, int] | None:
+        row = self.connect().execute("SELECT size, mtime_ns FROM files WHERE path = ?", (path,)).fetchone()
+        if row is None:
+            return None
+        return row[0], row[1]
+
+    def is_fresh(self, path: str) -> bool:
+        stamp = file_stamp(path)
+        return stamp is not None and stamp == self.stored_stamp(path)
+
+    def replace_file(self, path: str, entries) -> None:
+        conn = self.connect()
+        with conn:
+            conn.execute("DELETE FROM ids WHERE path = ?", (path,))
+            conn.executemany(
+                "INSERT OR REPLACE INTO ids (id, path, offset, length, inner_offset, inner_length) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                ((entry[0], path, *entry[1:3], *_inner(entry)) for entry in entries),
+            )
+            self._store_stamp(conn, path)
+
+    @timed("index_rebuild")
+    def reindex_file(self, path: str) -> None:
+        if not os.path.exists(path):
+            self.forget_file(path)
+            return
+        self.replace_file(path, scan_entries(path))
+
+    def forget_file(self, path: str) -> None:
+        conn = self.connect()
+        with conn:
+            conn.execute("DELETE FROM ids WHERE path = ?", (path,))
+            conn.execute("DELETE FROM files WHERE path = ?", (path,))
+
+    def note_append(self, path: str, before: tuple[int, int] | None, entries: list) -> None:
+        if before != self.stored_stamp(path):
+            self.reindex_file(path)
+            return
+        conn = self.connect()
+        with conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO ids (id, path, offset, length, inner_offset, inner_length) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                ((entry[0], path, *entry[1:3], *_inner(entry)) for entry in entries),
+            )
+            self._store_stamp(conn, path)
+
+    @timed("index_refresh")
+    def refresh(self) -> None:
+        files = self.list_files()
+        for path in files:
+            if not self.is_fresh(path):
+                self.reindex_file(path)
+        known = {row[0] for row in self.connect().execute("SELECT path FROM files")}
+        for path in known - set(files):
+            self.forget_file(path)
+
+    def lookup(self, record_id: str) -> tuple | None:
+        query = "SELECT path, offset, length, inner_offset, inner_length FROM ids WHERE id = ?"
+        row = self.connect().execute(query, (record_id,)).fetchone()
+        if row is None:
+            return None
+        if not self.is_fresh(row[0]):
+            self.reindex_file(row[0])
+            row = self.connect().execute(query, (record_id,)).fetchone()
+        return row
+
+    def find(self, record_id: str) -> tuple[str, dict, int] | None:
+        for _ in range(2):
+            entry = self.lookup(record_id)
+            if entry is None:
+                self.refresh()
+                entry = self.lookup(record_id)
+            if entry is None:
+                return None
+            data = read_line_at(*entry)
+            if data is not None and data.get("id") == record_id:
+                return entry[0], data, entry[1]
+            self.reindex_file(entry[0])
+        return None
+
+    def _store_stamp(self, conn: sqlite3.Connection, path: str) -> None:
+        stamp = file_stamp(path)
+        if stamp is None:
+            conn.execute("DELETE FROM files WHERE path = ?", (path,))
+            return
+        conn.execute(
+            "INSERT OR REPLACE INTO files (path, size, mtime_ns) VALUES (?, ?, ?)",
+            (path, stamp[0], stamp[1]),
+        )
+
+
+def _inner(entry: tuple) -> tuple:
+    if len(entry) > 3:
+        return entry[3], entry[4]
+    return None, None
+
+
+def read_line_at(path: str, offset: int, length: int,
+                 inner_offset: int | None = None, inner_length: int | None = None) -> dict | None:
+    try:
+        if inner_offset is not None:
+            raw = read_frame(path, offset, length)[inner_offset:inner_offset + inner_length]
+        else:
+            with open(path, "rb") as f:
+                f.seek(offset)
+                raw = f.read(length)
+    except (OSError, ValueError, EOFError, zlib.error):
+        return None
+    try:
+        data = loads(raw)
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        return None
+    return data if isinstance(data, dict) else None
@@ -1,12 +1,76 @@
 import argparse
 import json
 import os
+import sqlite3
+import subprocess
+import sys
+import time
 from typing import Any
 import uuid
 from datetime import datetime
 
+from lifelog_segments import (
+    SEGMENT_SUFFIX,
+    find_day_with_id,
+    get_segment_path,
+    list_segments,
+    read_all_days,
+    read_footer,
+    read_frame,
+    write_segment,
+)
+from lifelog_manifest import get_manifest_path, note_day_append, refresh_days, refresh_stale_days
+from record_codec import dumps, id_needles, loads, may_contain
+from record_dedupe import DEFAULT_THRESHOLD, DuplicateIndex, band_keys, minhash, shingles, similarity
+from record_index import INDEX_DIRNAME, RecordIndex, file_stamp
+from record_lock import fsync_directory, group_commit, locked
+from record_mirror import AnalyticsMirror
+from record_profile import (
+    PROFILE_MODES,
+    add_phase,
+    finish_profile,
+    phase,
+    profile_mode,
+    start_profile,
+    summarize_traces,
+    timed,
+)
+from record_query import (
+    iter_lifelog_partitions,
+    iter_records,
+    parse_bound,
+    parse_predicate,
+    predicate_needles,
+    project,
+    run_query,
+)
+from record_rollup import ROLLUP_NAME
+from record_schema import ValidationFailed, load_schema, validate_record
+from record_search import SEARCH_FIELDS, SearchIndex
+from record_snapshot import SNAPSHOT_COLUMNS, TaskSnapshot, source_stamps
+from record_patches import (
+    PATCH_SUFFIX,
+    apply_patches,
+    build_patch,
+    build_tombstone,
+    get_patch_path,
+    load_patches,
+    patch_record,
+    read_patch_log,
+    should_compact,
+    truncate_patches,
+)
 
-SCHEMA_PATH = os.path.join(".codex", "schema.json")
+
+RECORDS_ROOT = os.path.join("workspace", "records")
+PROFILE_DIR = os.path.join(RECORDS_ROOT, INDEX_DIRNAME)
+RECORD_TYPES = ("knowledge", "news", "lifelog", "agent_kernel_memory", "tasks")
+
+_record_indexes: dict[str, RecordIndex] = {}
+_task_snapshot: TaskSnapshot | None = None
+_search_indexes: dict[str, SearchIndex] = {}
+_dedupe_index: DuplicateIndex | None = None
+_durable = False
 
 
 def ensure_dir(path: str) -> None:
@@ -24,25 +88,65 @@ def generate_id() -> str:
 
 
 def append_jsonl(path: str, data: dict) -> None:
+    append_jsonl_many(path, [data])
+
+
+@timed("append")
+def append_jsonl_many(path: str, records: list) -> None:
     ensure_dir(path)
-    line = json.dumps(data, ensure_ascii=False)
-    with open(path, "a", encoding="utf-8", newline="\n") as f:
-        f.write(line + "\n")
+    lines = [(dumps(data) + "\n").encode("utf-8") for data in records]
+    with record_lock(path):
+        before = file_stamp(path)
+        before_state = get_state_stamps(path)
+        with open(path, "ab") as f:
+            offset = f.tell()
+            f.write(b"".join(lines))
+        entries = []
+        for data, payload in zip(records, lines):
+            if data.get("id"):
+                entries.append((str(data["id"]), offset, len(payload)))
+            offset += len(payload)
+        index = get_index_for_path(path)
+        if index is not None and entries:
+            try:
+                index.note_append(path, before, entries)
+            except sqlite3.Error:
+                pass
+        note_state_changes(path, before_state, records)
+        note_manifest_append(path, before[0] if before else 0, records)
+    commit_appends(path, offset)
+
+
+def is_durable() -> bool:
+    return _durable or os.environ.get("LIFEKERNEL_RECORDER_FSYNC") == "1"
+
+
+def get_lock_dir(path: str) -> str:
+    record_type = get_record_type_for_path(path)
+    if record_type is None:
+        return os.path.join(os.path.dirname(path), INDEX_DIRNAME)
+    return os.path.join(RECORDS_ROOT, record_type, INDEX_DIRNAME)
+
 
+def record_lock(path: str):
+    return locked(os.path.join(get_lock_dir(path), "write.lock"))
 
-def parse_list(value: str) -> list:
+
+def commit_appends(path: str, end: int, lock_dir: str | None = None) -> None:
+    if not is_durable():
+        return
+    lock_dir = lock_dir or get_lock_dir(path)
+    group_commit(path, end, os.path.join(lock_dir, "sync.lock"), os.path.join(lock_dir, "sync.json"))
+
+
+def parse_list(value: str | list | None) -> list:
     if not value:
         return []
+    if isinstance(value, list):
+        return [str(v).strip() for v in value if str(v).strip()]
     return [v.strip() for v in value.split(",") if v.strip()]
 
 
-def load_schema() -> dict:
-    if not os.path.exists(SCHEMA_PATH):
-        raise SystemExit(f"schema not found: {SCHEMA_PATH}")
-    with open(SCHEMA_PATH, "r", encoding="utf-8") as f:
-        return json.load(f)
-
-
 def normalize_content(record_type: str, record: dict) -> str:
     if record_type == "knowledge":
         return record.get("title") or record.get("summary") or record.get("solution") or record.get("problem") or "未命名"
@@ -57,20 +161,6 @@ def normalize_content(record_type: str, record: dict) -> str:
     return "未命名"
 
 
-def validate_record(record: dict, record_type: str, schema: dict) -> None:
-    if record_type not in schema.get("types", {}):
-        raise SystemExit(f"schema missing record type: {record_type}")
-    required = schema.get("common", {}).get("required", []) + schema["types"][record_type].get("required", [])
-    for field in required:
-        value = record.get(field)
-        if value in (None, "", []):
-            raise SystemExit(f"missing required field: {field}")
-    enums = schema.get("enums", {})
-    for field, allowed in enums.items():
-        if field in record and record[field] not in allowed:
-            raise SystemExit(f"invalid enum value for {field}: {record[field]}")
-
-
 def get_lifelog_path(timestamp: str) -> str:
     try:
         dt = datetime.fromisoformat(timestamp)
@@ -86,6 +176,176 @@ def get_lifelog_path(timestamp: str) -> str:
     )
 
 
+def get_lifelog_root() -> str:
+    return os.path.join(RECORDS_ROOT, "lifelog")
+
+
+def list_lifelog_files() -> list[str]:
+    files = []
+    for root, dirnames, filenames in os.walk(get_lifelog_root()):
+        dirnames[:] = sorted(d for d in dirnames if not d.startswith("."))
+        for name in sorted(filenames):
+            if name.endswith(".jsonl"):
+                files.append(os.path.join(root, name))
+    return files
+
+
+def list_lifelog_sources() -> list[str]:
+    return list_lifelog_files() + list_segments(get_lifelog_root())
+
+
+def get_record_index(record_type: str) -> RecordIndex:
+    index = _record_indexes.get(record_type)
+    if index is None:
+        if record_type == "lifelog":
+            list_files = list_lifelog_sources
+        else:
+            path = get_record_path(record_type)
+            list_files = lambda: [path] if os.path.exists(path) else []
+        index_path = os.path.join(RECORDS_ROOT, record_type, INDEX_DIRNAME, "ids.sqlite")
+        index = RecordIndex(index_path, list_files)
+        _record_indexes[record_type] = index
+    return index
+
+
+def get_task_snapshot() -> TaskSnapshot:
+    global _task_snapshot
+    if _task_snapshot is None:
+        _task_snapshot = TaskSnapshot(
+            get_record_path("tasks"),
+            os.path.join(RECORDS_ROOT, "tasks", INDEX_DIRNAME, "snapshot.sqlite"),
+            os.path.join(RECORDS_ROOT, "tasks", "snapshot.json"),
+            os.path.join(RECORDS_ROOT, "tasks", "rollup.json"),
+            os.path.join(RECORDS_ROOT, "tasks", "history.json"),
+        )
+    return _task_snapshot
+
+
+def is_tasks_path(path: str) -> bool:
+    return os.path.normpath(path) == os.path.normpath(get_record_path("tasks"))
+
+
+def get_search_index(record_type: str) -> SearchIndex:
+    index = _search_indexes.get(record_type)
+    if index is None:
+        index = SearchIndex(
+            record_type,
+            get_record_path(record_type),
+            os.path.join(RECORDS_ROOT, record_type, INDEX_DIRNAME, "search.sqlite"),
+            os.path.join(RECORDS_ROOT, record_type, "search.json"),
+        )
+        _search_indexes[record_type] = index
+    return index
+
+
+def get_dedupe_index() -> DuplicateIndex:
+    global _dedupe_index
+    if _dedupe_index is None:
+        _dedupe_index = DuplicateIndex(
+            get_record_path("news"),
+            os.path.join(RECORDS_ROOT, "news", INDEX_DIRNAME, "minhash.sqlite"),
+        )
+    return _dedupe_index
+
+
+def get_state_views(path: str) -> list:
+    if is_tasks_path(path):
+        return [get_task_snapshot()]
+    record_type = get_record_type_for_path(path)
+    views: list = []
+    if record_type in SEARCH_FIELDS:
+        views.append(get_search_index(record_type))
+    if record_type == "news":
+        views.append(get_dedupe_index())
+    return views
+
+
+def get_state_stamps(path: str) -> list | None:
+    if not get_state_views(path):
+        return None
+    return source_stamps(path)
+
+
+def list_state_views() -> list:
+    return [get_task_snapshot()] + [get_search_index(record_type) for record_type in SEARCH_FIELDS]
+
+
+@timed("export")
+def export_state_views() -> list[str]:
+    """Rewrite the dashboard exports whose source changed since they were last written."""
+    written = refresh_lifelog_export()
+    for view in list_state_views():
+        if not os.path.exists(view.path):
+            continue
+        try:
+            if view.export_if_stale():
+                written.extend(view.export_paths())
+        except sqlite3.Error:
+            pass
+    return written
+
+
+@timed("state_views")
+def note_state_changes(path: str, before: list | None, upserts=(), deletes=()) -> None:
+    for view in get_state_views(path):
+        try:
+            view.apply(before, upserts, deletes)
+        except sqlite3.Error:
+            pass
+
+
+@timed("manifest")
+def note_manifest_append(path: str, before_size: int, records: list) -> None:
+    if get_record_type_for_path(path) != "lifelog":
+        return
+    try:
+        note_day_append(get_lifelog_root(), path, before_size, records, list_lifelog_files)
+    except (OSError, ValueError):
+        pass
+
+
+@timed("manifest")
+def refresh_lifelog_export() -> list[str]:
+    root = get_lifelog_root()
+    if not os.path.isdir(root):
+        return []
+    try:
+        with record_lock(root):
+            if refresh_stale_days(root, list_lifelog_files):
+                return [get_manifest_path(root), os.path.join(root, ROLLUP_NAME)]
+    except (OSError, ValueError):
+        pass
+    return []
+
+
+@timed("manifest")
+def refresh_lifelog_manifest(paths: list[str]) -> None:
+    paths = [path for path in paths if get_record_type_for_path(path) == "lifelog"]
+    if not paths:
+        return
+    try:
+        refresh_days(get_lifelog_root(), paths, list_lifelog_files)
+    except (OSError, ValueError):
+        pass
+
+
+def get_record_type_for_path(path: str) -> str | None:
+    rel = os.path.relpath(os.path.normpath(path), RECORDS_ROOT)
+    record_type = rel.split(os.sep, 1)[0]
+    if record_type not in RECORD_TYPES:
+        return None
+    if record_type != "lifelog" and os.path.normpath(path) != os.path.normpath(get_record_path(record_type)):
+        return None
+    return record_type
+
+
+def get_index_for_path(path: str) -> RecordIndex | None:
+    record_type = get_record_type_for_path(path)
+    if record_type is None:
+        return None
+    return get_record_index(record_type)
+
+
 def get_record_path(record_type: str, record_id: str = "") -> str:
     if record_type == "knowledge":
         return os.path.join("workspace", "records", "knowledge", "knowledge.jsonl")
@@ -98,92 +358,635 @@ def get_record_path(record_type: str, record_id: str = "") -> str:
     raise SystemExit(f"unsupported record type: {record_type}")
 
 
-def load_latest_record(path: str, record_id: str) -> dict:
+def load_latest_record(path: str, record_id: str) -> tuple[dict, int]:
     if not os.path.exists(path):
         raise SystemExit(f"record file not found: {path}")
-    latest = None
-    with open(path, "r", encoding="utf-8") as f:
-        for line in f:
-            line = line.strip()
-            if not line:
-                continue
-            try:
-                data = json.loads(line)
-            except json.JSONDecodeError:
-                continue
-            if data.get("id") == record_id:
-                latest = data
+    latest = scan_lines_for_id(read_bytes(path), record_id, id_needles(record_id))
     if latest is None:
         raise SystemExit(f"record id not found: {record_id}")
     return latest
 
 
+def scan_lines_for_id(data: bytes, record_id: str, needles: tuple[bytes, ...]) -> tuple[dict, int] | None:
+    latest = None
+    if not may_contain(data, needles):
+        return None
+    offset = 0
+    for line in data.split(b"\n"):
+        start = offset
+        offset += len(line) + 1
+        if not may_contain(line, needles):
+            continue
+        try:
+            record = loads(line)
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            continue
+        if isinstance(record, dict) and record.get("id") == record_id:
+            latest = record, start
+    return latest
+
+
+@timed("find_record")
 def find_record_by_id(target_type: str, record_id: str) -> tuple[str, dict]:
     if target_type != "lifelog":
         path = get_record_path(target_type)
-        record = load_latest_record(path, record_id)
-        return path, record
+        if not os.path.exists(path):
+            raise SystemExit(f"record file not found: {path}")
+    elif not os.path.exists(get_lifelog_root()):
+        raise SystemExit(f"record file not found: {get_lifelog_root()}")
+    try:
+        found = get_record_index(target_type).find(record_id)
+    except sqlite3.Error:
+        found = scan_record_by_id(target_type, record_id)
+    if found is None:
+        raise SystemExit(f"record id not found: {record_id}")
+    path, record, offset = found
+    patched = patch_record(record, load_patches(path), offset)
+    if patched is None:
+        raise SystemExit(f"record id not found: {record_id}")
+    return path, patched
 
-    lifelog_root = os.path.join("workspace", "records", "lifelog")
+
+@timed("scan_records")
+def scan_record_by_id(target_type: str, record_id: str) -> tuple[str, dict, int | None]:
+    if target_type != "lifelog":
+        path = get_record_path(target_type)
+        record, offset = load_latest_record(path, record_id)
+        return path, record, offset
+
+    lifelog_root = get_lifelog_root()
     if not os.path.exists(lifelog_root):
         raise SystemExit(f"record file not found: {lifelog_root}")
 
-    for root, _, files in os.walk(lifelog_root):
-        for name in files:
-            if not name.endswith(".jsonl"):
-                continue
-            path = os.path.join(root, name)
-            latest = None
-            with open(path, "r", encoding="utf-8") as f:
-                for line in f:
-                    line = line.strip()
-                    if not line:
-                        continue
-                    try:
-                        data = json.loads(line)
-                    except json.JSONDecodeError:
-                        continue
-                    if data.get("id") == record_id:
-                        latest = data
-            if latest is not None:
-                return path, latest
+    needles = id_needles(record_id)
+    for path in list_lifelog_files():
+        latest = scan_lines_for_id(read_bytes(path), record_id, needles)
+        if latest is not None:
+            return path, *latest
+
+    for path in list_segments(lifelog_root):
+        footer = read_footer(path)
+        latest = None
+        for frame in footer["days"].values():
+            found = scan_lines_for_id(read_frame(path, frame["offset"], frame["length"]), record_id, needles)
+            latest = found[0] if found is not None else latest
+        if latest is not None:
+            return path, latest, None
 
     raise SystemExit(f"record id not found: {record_id}")
 
 
 def load_records_with_raw(path: str) -> list:
+    return apply_patches(load_base_records_with_raw(path), load_patches(path))
+
+
+@timed("load_records")
+def load_base_records_with_raw(path: str) -> list:
     if not os.path.exists(path):
         raise SystemExit(f"record file not found: {path}")
     records = []
-    with open(path, "r", encoding="utf-8") as f:
+    offset = 0
+    with open(path, "rb") as f:
         for line in f:
-            raw = line.rstrip("\n")
+            start = offset
+            offset += len(line)
+            raw = line.decode("utf-8").rstrip("\r\n")
             if not raw:
                 continue
             try:
-                data = json.loads(raw)
+                data = loads(raw)
             except json.JSONDecodeError:
-                records.append({"raw": raw, "data": None, "dirty": False})
+                records.append({"raw": raw, "data": None, "dirty": False, "offset": start})
                 continue
-            records.append({"raw": raw, "data": data, "dirty": False})
+            records.append({"raw": raw, "data": data, "dirty": False, "offset": start})
     return records
 
 
+@timed("write_records")
 def write_records(path: str, records: list) -> None:
     ensure_dir(path)
-    with open(path, "w", encoding="utf-8", newline="\n") as f:
+    entries = []
+    offset = 0
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
         for item in records:
             data = item.get("data")
             raw = item.get("raw")
             if data is not None:
-                if item.get("dirty"):
-                    f.write(json.dumps(data, ensure_ascii=False) + "\n")
-                elif raw:
-                    f.write(raw + "\n")
+                if item.get("dirty") or not raw:
+                    line = dumps(data)
                 else:
-                    f.write(json.dumps(data, ensure_ascii=False) + "\n")
+                    line = raw
             elif raw:
-                f.write(raw + "\n")
+                line = raw
+            else:
+                continue
+            payload = (line + "\n").encode("utf-8")
+            f.write(payload)
+            if isinstance(data, dict) and data.get("id"):
+                entries.append((str(data["id"]), offset, len(payload)))
+            offset += len(payload)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    if is_durable():
+        fsync_directory(path)
+    index = get_index_for_path(path)
+    if index is not None:
+        try:
+            index.replace_file(path, entries)
+        except sqlite3.Error:
+            pass
+
+
+def rewrite_records(path: str, records: list) -> None:
+    with record_lock(path):
+        write_records(path, records)
+        if os.path.exists(get_patch_path(path)):
+            os.remove(get_patch_path(path))
+
+
+@timed("append_patches")
+def append_patches(path: str, ops: list, record_type: str) -> None:
+    payload = "".join(dumps(op) + "\n" for op in ops).encode("utf-8")
+    with record_lock(path):
+        with open(get_patch_path(path), "ab") as f:
+            f.write(payload)
+            end = f.tell()
+    commit_appends(get_patch_path(path), end, get_lock_dir(path))
+    maybe_compact(path, record_type)
+
+
+@timed("compact")
+def compact_records(path: str) -> bool:
+    with record_lock(path):
+        patches, consumed = read_patch_log(path)
+        if consumed == 0:
+            return False
+        before_state = get_state_stamps(path)
+        records = apply_patches(load_base_records_with_raw(path), patches)
+        write_records(path, records)
+        truncate_patches(path, consumed)
+        note_state_changes(path, before_state)
+        refresh_lifelog_manifest([path])
+    return True
+
+
+def get_compact_log_path(path: str) -> str:
+    return os.path.join(get_lock_dir(path), "compact.log")
+
+
+def maybe_compact(path: str, record_type: str) -> None:
+    mode = os.environ.get("LIFEKERNEL_RECORDER_AUTO_COMPACT", "inline")
+    if mode == "off" or not should_compact(path):
+        return
+    if mode != "background":
+        try:
+            compact_records(path)
+        except (OSError, sqlite3.Error, ValueError) as exc:
+            # The patch is already committed; a failed compaction only leaves the log for the next attempt.
+            print(f"auto compaction of {path} failed: {exc}", file=sys.stderr)
+        return
+    kwargs: dict[str, Any] = {}
+    if os.name == "nt":
+        kwargs["creationflags"] = getattr(subprocess, "DETACHED_PROCESS", 0)
+    else:
+        kwargs["start_new_session"] = True
+    log_path = get_compact_log_path(path)
+    ensure_dir(log_path)
+    with open(log_path, "ab") as log:
+        subprocess.Popen(
+            [sys.executable, os.path.abspath(__file__), "--record-type", "compact", "--target-type", record_type],
+            stdin=subprocess.DEVNULL,
+            stdout=log,
+            stderr=log,
+            **kwargs,
+        )
+
+
+def list_patched_files(target_type: str | None = None) -> list[tuple[str, str]]:
+    targets = []
+    for record_type in [target_type] if target_type else RECORD_TYPES:
+        if record_type == "lifelog":
+            for root, dirnames, filenames in os.walk(get_lifelog_root()):
+                dirnames[:] = sorted(d for d in dirnames if not d.startswith("."))
+                for name in sorted(filenames):
+                    if name.endswith(".jsonl" + PATCH_SUFFIX):
+                        targets.append((record_type, os.path.join(root, name[: -len(PATCH_SUFFIX)])))
+        elif os.path.exists(get_patch_path(get_record_path(record_type))):
+            targets.append((record_type, get_record_path(record_type)))
+    return targets
+
+
+def get_write_mode(args: argparse.Namespace) -> str:
+    return args.write_mode or os.environ.get("LIFEKERNEL_RECORDER_WRITE_MODE") or "rewrite"
+
+
+def fill_update_defaults(data: dict, target_type: str, timestamp: str, source: str | None) -> None:
+    if "timestamp" not in data or not data.get("timestamp"):
+        data["timestamp"] = timestamp
+    if "type" not in data or not data.get("type"):
+        data["type"] = target_type
+    if "source" not in data or not data.get("source"):
+        data["source"] = source or "conversation"
+    if "content" not in data or not data.get("content"):
+        data["content"] = normalize_content(target_type, data)
+    if target_type == "lifelog":
+        if "action" not in data or not data.get("action"):
+            data["action"] = data.get("description") or data.get("content")
+    if target_type == "agent_kernel_memory":
+        if "scope" not in data:
+            data["scope"] = "user"
+        if "deleted" not in data:
+            data["deleted"] = False
+    if target_type == "tasks":
+        data["status"] = normalize_task_status(data.get("status"))
+        data["priority"] = normalize_priority(data.get("priority"))
+
+
+def diff_fields(before: dict, after: dict) -> dict:
+    return {k: v for k, v in after.items() if k not in before or before[k] != v}
+
+
+def check_mutation_args(args: argparse.Namespace) -> None:
+    action = args.record_type
+    if not args.target_type:
+        raise SystemExit(f"--target-type is required for {action}")
+    if not args.record_id:
+        raise SystemExit(f"--id is required for {action}")
+    if action != "update":
+        return
+    if not args.update_key:
+        raise SystemExit("--key is required for update")
+    if args.update_value is None and args.update_value_json is None:
+        raise SystemExit("--value or --value-json is required for update")
+
+
+def parse_update_value(args: argparse.Namespace) -> Any:
+    if args.update_value_json:
+        try:
+            return json.loads(args.update_value_json)
+        except json.JSONDecodeError as exc:
+            raise SystemExit("--value-json must be valid JSON") from exc
+    return args.update_value
+
+
+def fill_memory_delete_defaults(data: dict, timestamp: str, source: str | None) -> None:
+    data["deleted"] = True
+    if "timestamp" not in data or not data.get("timestamp"):
+        data["timestamp"] = timestamp
+    if "type" not in data or not data.get("type"):
+        data["type"] = "agent_kernel_memory"
+    if "source" not in data or not data.get("source"):
+        data["source"] = source or "conversation"
+    if "content" not in data or not data.get("content"):
+        data["content"] = normalize_content("agent_kernel_memory", data)
+    if "scope" not in data:
+        data["scope"] = "user"
+
+
+def mutate_record_data(data: dict, args: argparse.Namespace, schema: dict, timestamp: str) -> dict:
+    updated = dict(data)
+    if args.record_type == "update":
+        updated[args.update_key] = parse_update_value(args)
+        fill_update_defaults(updated, args.target_type, timestamp, args.source)
+    else:
+        fill_memory_delete_defaults(updated, timestamp, args.source)
+    validate_record(updated, args.target_type, schema)
+    return updated
+
+
+def mutate_records(records: list, args: argparse.Namespace, schema: dict, timestamp: str) -> list:
+    is_physical_delete = args.record_type == "delete" and args.target_type != "agent_kernel_memory"
+    matched = [item for item in records if item.get("data") and item["data"].get("id") == args.record_id]
+    if not matched:
+        raise SystemExit(f"record id not found: {args.record_id}")
+    if is_physical_delete:
+        return [item for item in records if not (item.get("data") and item["data"].get("id") == args.record_id)]
+    updates = [(item, mutate_record_data(item["data"], args, schema, timestamp)) for item in matched]
+    for item, data in updates:
+        item["data"] = data
+        item["dirty"] = True
+    return records
+
+
+def build_patch_op(current: dict, args: argparse.Namespace, schema: dict, timestamp: str, end: int) -> dict:
+    if args.record_type == "delete" and args.target_type != "agent_kernel_memory":
+        return build_tombstone(args.record_id, timestamp, end)
+    data = mutate_record_data(current, args, schema, timestamp)
+    return build_patch(args.record_id, diff_fields(current, data), timestamp, end)
+
+
+def apply_mutations(path: str, mutations: list, schema: dict, write_mode: str) -> list:
+    with record_lock(path):
+        return _apply_mutations(path, mutations, schema, write_mode)
+
+
+def _apply_mutations(path: str, mutations: list, schema: dict, write_mode: str) -> list:
+    errors: list = []
+    before_state = get_state_stamps(path)
+    if write_mode == "patch":
+        ops = []
+        states: dict[str, dict | None] = {}
+        end = os.path.getsize(path)
+        for args, timestamp in mutations:
+            try:
+                if args.record_id not in states:
+                    states[args.record_id] = find_record_by_id(args.target_type, args.record_id)[1]
+                current = states[args.record_id]
+                if current is None:
+                    raise SystemExit(f"record id not found: {args.record_id}")
+                op = build_patch_op(current, args, schema, timestamp, end)
+            except SystemExit as exc:
+                errors.append(exc)
+                continue
+            states[args.record_id] = patch_record(current, [op])
+            ops.append(op)
+            errors.append(None)
+        if ops:
+            append_patches(path, ops, mutations[0][0].target_type)
+            note_state_changes(
+                path,
+                before_state,
+                [state for state in states.values() if state is not None],
+                [record_id for record_id, state in states.items() if state is None],
+            )
+            refresh_lifelog_manifest([path])
+        return errors
+
+    records = load_records_with_raw(path)
+    for args, timestamp in mutations:
+        try:
+            records = mutate_records(records, args, schema, timestamp)
+        except SystemExit as exc:
+            errors.append(exc)
+            continue
+        errors.append(None)
+    if any(error is None for error in errors):
+        rewrite_records(path, records)
+        touched = {args.record_id for (args, _), error in zip(mutations, errors) if error is None}
+        current = {
+            item["data"]["id"]: item["data"] for item in records
+            if item.get("data") and item["data"].get("id") in touched
+        }
+        note_state_changes(path, before_state, list(current.values()), touched - set(current))
+        refresh_lifelog_manifest([path])
+    return errors
+
+
+def resolve_record_path(target_type: str, record_id: str) -> str:
+    path, _ = find_record_by_id(target_type, record_id)
+    if path.endswith(SEGMENT_SUFFIX):
+        path = unarchive_record_day(path, record_id)
+    return path
+
+
+def mutate_record(args: argparse.Namespace, schema: dict, timestamp: str) -> str:
+    check_mutation_args(args)
+    path = resolve_record_path(args.target_type, args.record_id)
+    if args.record_type == "update":
+        parse_update_value(args)
+    error = apply_mutations(path, [(args, timestamp)], schema, get_write_mode(args))[0]
+    if error is not None:
+        raise error
+    return path
+
+
+def write_json_atomic(path: str, data: Any) -> None:
+    ensure_dir(path)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8", newline="\n") as f:
+        json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+    os.replace(tmp_path, path)
+
+
+def read_bytes(path: str) -> bytes:
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def join_jsonl_bytes(head: bytes, tail: bytes) -> bytes:
+    if head and not head.endswith(b"\n"):
+        head += b"\n"
+    return head + tail
+
+
+def archive_lifelog(args: argparse.Namespace) -> None:
+    root = get_lifelog_root()
+    if not os.path.isdir(root):
+        return
+    current_month = datetime.now().astimezone().strftime("%Y/%m")
+    index = get_record_index("lifelog")
+    with record_lock(root):
+        for year in sorted(os.listdir(root)):
+            year_dir = os.path.join(root, year)
+            if year.startswith(".") or not os.path.isdir(year_dir):
+                continue
+            for month in sorted(os.listdir(year_dir)):
+                month_dir = os.path.join(year_dir, month)
+                if not os.path.isdir(month_dir) or f"{year}/{month}" >= current_month:
+                    continue
+                day_files = sorted(
+                    os.path.join(month_dir, name) for name in os.listdir(month_dir) if name.endswith(".jsonl")
+                )
+                if not day_files:
+                    continue
+                for path in day_files:
+                    compact_records(path)
+                segment_path = get_segment_path(root, year, month)
+                days = read_all_days(segment_path) if os.path.exists(segment_path) else {}
+                for path in day_files:
+                    day = os.path.basename(path)[: -len(".jsonl")]
+                    days[day] = join_jsonl_bytes(days.get(day, b""), read_bytes(path))
+                write_segment(segment_path, f"{year}-{month}", days)
+                index.reindex_file(segment_path)
+                for path in day_files:
+                    os.remove(path)
+                    index.forget_file(path)
+                refresh_lifelog_manifest([segment_path] + day_files)
+                try:
+                    os.rmdir(month_dir)
+                except OSError:
+                    pass
+                print(segment_path)
+        refresh_stale_days(root, list_lifelog_files)
+
+
+def unarchive_record_day(segment_path: str, record_id: str) -> str:
+    with record_lock(segment_path):
+        day = find_day_with_id(segment_path, record_id)
+        if day is None:
+            raise SystemExit(f"record id not found: {record_id}")
+        footer = read_footer(segment_path)
+        days = read_all_days(segment_path)
+        data = days.pop(day)
+        year, month = footer["month"].split("-")
+        day_path = os.path.join(get_lifelog_root(), year, month, f"{day}.jsonl")
+        if os.path.exists(day_path):
+            # Prepending shifts every line, so fold the day's patch log in before its offsets go stale.
+            compact_records(day_path)
+            data = join_jsonl_bytes(data, read_bytes(day_path))
+        ensure_dir(day_path)
+        with open(day_path + ".tmp", "wb") as f:
+            f.write(data)
+        os.replace(day_path + ".tmp", day_path)
+        if days:
+            write_segment(segment_path, footer["month"], days)
+        else:
+            os.remove(segment_path)
+        index = get_record_index("lifelog")
+        index.reindex_file(segment_path)
+        index.reindex_file(day_path)
+        refresh_lifelog_manifest([segment_path, day_path])
+    return day_path
+
+
+def query_records(target_type: str | None, where: list | None = None, since: str | None = None,
+                  until: str | None = None, fields: str | list | None = None, sort: str | None = None,
+                  limit: int | None = None):
+    if target_type not in RECORD_TYPES:
+        raise SystemExit("query requires --target-type")
+    if limit is not None and int(limit) < 0:
+        raise SystemExit("--limit must be >= 0")
+    predicates = [parse_predicate(expr) for expr in where or []]
+    low, high = parse_bound(since), parse_bound(until)
+    records = None
+    if target_type == "lifelog":
+        partitions = iter_lifelog_partitions(get_lifelog_root(), low, high)
+    else:
+        path = get_record_path(target_type)
+        partitions = [(path, None, None)] if os.path.exists(path) else []
+    if target_type == "tasks":
+        include: dict[str, tuple] = {}
+        exclude: dict[str, tuple] = {}
+        for field, op, values in predicates:
+            if field in SNAPSHOT_COLUMNS and op in ("=", "!=") and "" not in values:
+                (include if op == "=" else exclude)[field] = values
+        try:
+            snapshot = get_task_snapshot()
+            snapshot.ensure_fresh()
+            records = snapshot.iter_records(include, exclude)
+        except sqlite3.Error:
+            records = None
+    return run_query(
+        iter_records(partitions, predicate_needles(predicates)) if records is None else records,
+        predicates,
+        low,
+        high,
+        parse_list(fields),
+        sort,
+        None if limit is None else int(limit),
+    )
+
+
+def search_records(text: str | None, target_type: str | None = None, fields: str | list | None = None,
+                   limit: int | None = None) -> list[dict]:
+    if not text:
+        raise SystemExit("search requires --text")
+    if target_type is not None and target_type not in SEARCH_FIELDS:
+        raise SystemExit(f"search supports: {', '.join(SEARCH_FIELDS)}")
+    limit = 10 if limit is None else int(limit)
+    hits = []
+    for record_type in [target_type] if target_type else list(SEARCH_FIELDS):
+        index = get_search_index(record_type)
+        hits.extend(index.search(text, limit))
+        try:
+            index.export_if_stale()
+        except sqlite3.Error:
+            pass
+    hits.sort(key=lambda hit: hit[0], reverse=True)
+    projection = parse_list(fields)
+    results = []
+    for score, record in hits[:limit]:
+        result = project(record, projection)
+        result["_score"] = round(score, 4)
+        results.append(result)
+    return results
+
+
+def print_query(args: argparse.Namespace) -> None:
+    for record in query_records(args.target_type, args.where, args.since, args.until, args.fields, args.sort, args.limit):
+        print(json.dumps(record, ensure_ascii=False))
+
+
+def dedupe_candidates(candidates: list, threshold: float | None = None, limit: int | None = None) -> list[dict]:
+    threshold = DEFAULT_THRESHOLD if threshold is None else float(threshold)
+    limit = 5 if limit is None else int(limit)
+    index = get_dedupe_index()
+    seen: dict[tuple[int, bytes], list[int]] = {}
+    signatures: list = []
+    results = []
+    for position, candidate in enumerate(candidates):
+        if not isinstance(candidate, dict):
+            results.append({"ok": False, "error": "candidate must be a JSON object"})
+            signatures.append(None)
+            continue
+        signature = minhash(shingles(candidate))
+        signatures.append(signature)
+        in_batch = set()
+        if signature is not None:
+            for key in band_keys(signature):
+                in_batch.update(seen.get(key, ()))
+                seen.setdefault(key, []).append(position)
+        results.append({
+            "ok": True,
+            "title": candidate.get("title"),
+            "duplicates": index.find_duplicates(candidate, threshold, limit),
+            "batch_duplicates": sorted(
+                other for other in in_batch if similarity(signature, signatures[other]) >= threshold
+            ),
+        })
+    return results
+
+
+def print_dedupe(args: argparse.Namespace) -> None:
+    source = sys.stdin if args.input in (None, "-") else open(args.input, "r", encoding="utf-8")
+    try:
+        lines = [(line_no, line.strip()) for line_no, line in enumerate(source, 1) if line.strip()]
+    finally:
+        if source is not sys.stdin:
+            source.close()
+    candidates = []
+    for _, line in lines:
+        try:
+            candidates.append(json.loads(line))
+        except json.JSONDecodeError:
+            candidates.append(None)
+    for (line_no, _), result in zip(lines, dedupe_candidates(candidates, args.threshold, args.limit)):
+        result["line"] = line_no
+        if "batch_duplicates" in result:
+            result["batch_duplicates"] = [lines[other][0] for other in result["batch_duplicates"]]
+        print(json.dumps(result, ensure_ascii=False))
+
+
+def print_search(args: argparse.Namespace) -> None:
+    for record in search_records(args.text, args.target_type, args.fields, args.limit):
+        print(json.dumps(record, ensure_ascii=False))
+
+
+def get_mirror_path() -> str:
+    return os.path.join(RECORDS_ROOT, INDEX_DIRNAME, "analytics.sqlite")
+
+
+def sync_mirror(args: argparse.Namespace) -> None:
+    mirror = AnalyticsMirror(get_mirror_path())
+    try:
+        for record_type in [args.target_type] if args.target_type else RECORD_TYPES:
+            if record_type == "lifelog":
+                paths = list_lifelog_sources()
+            else:
+                path = get_record_path(record_type)
+                paths = [path] if os.path.exists(path) else []
+            print(json.dumps(mirror.sync(record_type, paths, full=args.force), ensure_ascii=False))
+    finally:
+        mirror.close()
+    print(json.dumps({"exported": export_state_views()}, ensure_ascii=False))
+
+
+def compact_all(args: argparse.Namespace) -> None:
+    for _, path in list_patched_files(args.target_type):
+        if (args.force or should_compact(path)) and compact_records(path):
+            print(path)
 
 
 def build_lifelog_entry(description: str, timestamp: str, module: str, skill_name: str,
@@ -233,141 +1036,21 @@ def normalize_priority(value: str | None) -> str:
     return "P2"
 
 
-def main() -> None:
-    parser = argparse.ArgumentParser(description="Unified JSONL recorder")
-    parser.add_argument("--record-type", required=True, choices=["knowledge", "news", "lifelog", "agent_kernel_memory", "tasks", "update", "delete"])
-    parser.add_argument("--timestamp", default=None)
-    parser.add_argument("--id", dest="record_id", default=None)
-    parser.add_argument("--module", default=None)
-    parser.add_argument("--source", default=None)
-    parser.add_argument("--status", default=None)
-    parser.add_argument("--related-file", action="append", default=[])
-    parser.add_argument("--auto-record", action="store_true")
-    parser.add_argument("--no-auto-record", action="store_true")
-
-    parser.add_argument("--title", default=None)
-    parser.add_argument("--summary", default=None)
-    parser.add_argument("--problem", default=None)
-    parser.add_argument("--symptom", default=None)
-    parser.add_argument("--root-cause", dest="root_cause", default=None)
-    parser.add_argument("--solution", default=None)
-    parser.add_argument("--environment", default=None)
-    parser.add_argument("--tags", default=None)
-    parser.add_argument("--examples", default=None)
-
-    parser.add_argument("--description", default=None)
-    parser.add_argument("--details", default=None)
-    parser.add_argument("--priority", default=None)
-    parser.add_argument("--due-time", dest="due_time", default=None)
-    parser.add_argument("--completed-at", dest="completed_at", default=None)
-    parser.add_argument("--note", default=None)
-    parser.add_argument("--scope", default=None)
-
-    parser.add_argument("--extra", default=None, help="Extra JSON string to merge into record")
-    parser.add_argument("--target-type", default=None, choices=["knowledge", "news", "lifelog", "agent_kernel_memory", "tasks"])
-    parser.add_argument("--key", dest="update_key", default=None)
-    parser.add_argument("--value", dest="update_value", default=None)
-    parser.add_argument("--value-json", dest="update_value_json", default=None)
+def resolve_auto_record(args: argparse.Namespace) -> bool:
+    auto_record = True
+    if args.no_auto_record:
+        auto_record = False
+    elif args.auto_record:
+        auto_record = True
+    return auto_record
 
-    args = parser.parse_args()
 
-    schema = load_schema()
-    timestamp = args.timestamp or iso_now()
+@timed("build_records")
+def build_records(args: argparse.Namespace, schema: dict, timestamp: str) -> tuple[str, list]:
     related_files = args.related_file
+    writes: list[tuple[str, dict]] = []
 
-    if args.record_type == "update":
-        if not args.target_type:
-            raise SystemExit("--target-type is required for update")
-        if not args.record_id:
-            raise SystemExit("--id is required for update")
-        if not args.update_key:
-            raise SystemExit("--key is required for update")
-        if args.update_value is None and args.update_value_json is None:
-            raise SystemExit("--value or --value-json is required for update")
-
-        path, _ = find_record_by_id(args.target_type, args.record_id)
-        if args.update_value_json:
-            try:
-                value = json.loads(args.update_value_json)
-            except json.JSONDecodeError as exc:
-                raise SystemExit("--value-json must be valid JSON") from exc
-        else:
-            value = args.update_value
-
-        records = load_records_with_raw(path)
-        updated_any = False
-        for item in records:
-            data = item.get("data")
-            if not data:
-                continue
-            if data.get("id") == args.record_id:
-                data[args.update_key] = value
-                if "timestamp" not in data or not data.get("timestamp"):
-                    data["timestamp"] = timestamp
-                if "type" not in data or not data.get("type"):
-                    data["type"] = args.target_type
-                if "source" not in data or not data.get("source"):
-                    data["source"] = args.source or "conversation"
-                if "content" not in data or not data.get("content"):
-                    data["content"] = normalize_content(args.target_type, data)
-                if args.target_type == "lifelog":
-                    if "action" not in data or not data.get("action"):
-                        data["action"] = data.get("description") or data.get("content")
-                if args.target_type == "agent_kernel_memory":
-                    if "scope" not in data:
-                        data["scope"] = "user"
-                    if "deleted" not in data:
-                        data["deleted"] = False
-                if args.target_type == "tasks":
-                    data["status"] = normalize_task_status(data.get("status"))
-                    data["priority"] = normalize_priority(data.get("priority"))
-                validate_record(data, args.target_type, schema)
-                item["dirty"] = True
-                updated_any = True
-        if not updated_any:
-            raise SystemExit(f"record id not found: {args.record_id}")
-        write_records(path, records)
-
-    elif args.record_type == "delete":
-        if not args.target_type:
-            raise SystemExit("--target-type is required for delete")
-        if not args.record_id:
-            raise SystemExit("--id is required for delete")
-        path, _ = find_record_by_id(args.target_type, args.record_id)
-        if args.target_type == "agent_kernel_memory":
-            records = load_records_with_raw(path)
-            updated_any = False
-            for item in records:
-                data = item.get("data")
-                if not data:
-                    continue
-                if data.get("id") == args.record_id:
-                    data["deleted"] = True
-                    if "timestamp" not in data or not data.get("timestamp"):
-                        data["timestamp"] = timestamp
-                    if "type" not in data or not data.get("type"):
-                        data["type"] = "agent_kernel_memory"
-                    if "source" not in data or not data.get("source"):
-                        data["source"] = args.source or "conversation"
-                    if "content" not in data or not data.get("content"):
-                        data["content"] = normalize_content("agent_kernel_memory", data)
-                    if "scope" not in data:
-                        data["scope"] = "user"
-                    validate_record(data, "agent_kernel_memory", schema)
-                    item["dirty"] = True
-                    updated_any = True
-            if not updated_any:
-                raise SystemExit(f"record id not found: {args.record_id}")
-            write_records(path, records)
-            return
-        records = load_records_with_raw(path)
-        before = len(records)
-        records = [item for item in records if not (item.get("data") and item["data"].get("id") == args.record_id)]
-        if len(records) == before:
-            raise SystemExit(f"record id not found: {args.record_id}")
-        write_records(path, records)
-
-    elif args.record_type == "knowledge":
+    if args.record_type == "knowledge":
         record = {
             "title": args.title,
             "summary": args.summary,
@@ -393,14 +1076,9 @@ def main() -> None:
         if args.extra:
             record.update(json.loads(args.extra))
         validate_record(record, "knowledge", schema)
-        append_jsonl(os.path.join("workspace", "records", "knowledge", "knowledge.jsonl"), record)
+        writes.append((get_record_path("knowledge"), record))
 
-        auto_record = True
-        if args.no_auto_record:
-            auto_record = False
-        elif args.auto_record:
-            auto_record = True
-        if auto_record:
+        if resolve_auto_record(args):
             desc_seed = args.title or args.summary or args.problem or "未命名"
             description = f"新增 knowledge：{desc_seed}"
             lifelog_entry = build_lifelog_entry(
@@ -413,7 +1091,7 @@ def main() -> None:
                 related_files=["workspace/records/knowledge/knowledge.jsonl"],
             )
             validate_record(lifelog_entry, "lifelog", schema)
-            append_jsonl(get_lifelog_path(timestamp), lifelog_entry)
+            writes.append((get_lifelog_path(timestamp), lifelog_entry))
 
     elif args.record_type == "news":
         record = {
@@ -434,14 +1112,9 @@ def main() -> None:
         if args.extra:
             record.update(json.loads(args.extra))
         validate_record(record, "news", schema)
-        append_jsonl(os.path.join("workspace", "records", "news", "news.jsonl"), record)
+        writes.append((get_record_path("news"), record))
 
-        auto_record = True
-        if args.no_auto_record:
-            auto_record = False
-        elif args.auto_record:
-            auto_record = True
-        if auto_record:
+        if resolve_auto_record(args):
             desc_seed = args.title or args.summary or "未命名"
             description = f"新增 news：{desc_seed}"
             lifelog_entry = build_lifelog_entry(
@@ -454,7 +1127,7 @@ def main() -> None:
                 related_files=["workspace/records/news/news.jsonl"],
             )
             validate_record(lifelog_entry, "lifelog", schema)
-            append_jsonl(get_lifelog_path(timestamp), lifelog_entry)
+            writes.append((get_lifelog_path(timestamp), lifelog_entry))
 
     elif args.record_type == "lifelog":
         if not args.description:
@@ -473,7 +1146,8 @@ def main() -> None:
         if args.extra:
             entry.update(json.loads(args.extra))
         validate_record(entry, "lifelog", schema)
-        append_jsonl(get_lifelog_path(timestamp), entry)
+        record_id = entry["id"]
+        writes.append((get_lifelog_path(timestamp), entry))
 
     elif args.record_type == "agent_kernel_memory":
         record = {
@@ -493,9 +1167,10 @@ def main() -> None:
         if args.extra:
             record.update(json.loads(args.extra))
         validate_record(record, "agent_kernel_memory", schema)
-        append_jsonl(os.path.join("workspace", "records", "agent_kernel_memory", "agent_kernel_memory.jsonl"), record)
+        record_id = record["id"]
+        writes.append((get_record_path("agent_kernel_memory"), record))
 
-    else:  # tasks
+    elif args.record_type == "tasks":
         task_status = normalize_task_status(args.status)
         if task_status == "todo" and args.completed_at:
             task_status = "done"
@@ -521,7 +1196,319 @@ def main() -> None:
         if args.extra:
             record.update(json.loads(args.extra))
         validate_record(record, "tasks", schema)
-        append_jsonl(os.path.join("workspace", "records", "tasks", "tasks.jsonl"), record)
+        record_id = record["id"]
+        writes.append((get_record_path("tasks"), record))
+
+    else:
+        raise SystemExit(f"unsupported record type: {args.record_type}")
+
+    return record_id, writes
+
+
+BATCH_ALIASES = {
+    "id": "record_id",
+    "key": "update_key",
+    "value": "update_value",
+    "value_json": "update_value_json",
+    "related_files": "related_file",
+}
+
+
+COMMAND_ONLY_ARGS = ("input", "where", "since", "until", "fields", "sort", "limit", "text", "threshold", "profile")
+
+
+def namespace_from_command(command: dict, defaults: dict) -> argparse.Namespace:
+    if not isinstance(command, dict):
+        raise SystemExit("batch command must be a JSON object")
+    values = dict(defaults)
+    values["record_type"] = None
+    op = command.get("op", "create")
+    for key, value in command.items():
+        if key == "op":
+            continue
+        if key == "type" and op == "create" and "record_type" not in command:
+            key = "record_type"
+        key = BATCH_ALIASES.get(key, key)
+        if key == "profile":
+            raise SystemExit("profile is not supported per command; run record_jsonl.py --profile without the service")
+        if key not in values or key in COMMAND_ONLY_ARGS or (key == "record_type" and op != "create"):
+            raise SystemExit(f"unsupported batch field: {key}")
+        values[key] = value
+    if op in ("update", "delete"):
+        values["record_type"] = op
+    elif op != "create":
+        raise SystemExit(f"unsupported batch op: {op}")
+    if values["record_type"] not in RECORD_TYPES + ("update", "delete"):
+        raise SystemExit(f"unsupported record type: {values['record_type']}")
+    if values["extra"] is not None and not isinstance(values["extra"], str):
+        values["extra"] = json.dumps(values["extra"], ensure_ascii=False)
+    if values["update_value_json"] is not None and not isinstance(values["update_value_json"], str):
+        values["update_value_json"] = json.dumps(values["update_value_json"], ensure_ascii=False)
+    if isinstance(values["related_file"], str):
+        values["related_file"] = [values["related_file"]]
+    return argparse.Namespace(**values)
+
+
+_command_defaults: dict | None = None
+
+
+def get_command_defaults() -> dict:
+    global _command_defaults
+    if _command_defaults is None:
+        _command_defaults = vars(build_parser().parse_args(["--record-type", "batch"]))
+    return _command_defaults
+
+
+def error_result(exc: BaseException) -> dict:
+    if isinstance(exc, json.JSONDecodeError):
+        return {"ok": False, "error": f"invalid JSON: {exc}"}
+    if not isinstance(exc, SystemExit):
+        return {"ok": False, "error": f"{type(exc).__name__}: {exc}"}
+    result: dict[str, Any] = {"ok": False, "error": str(exc)}
+    if isinstance(exc, ValidationFailed):
+        result["errors"] = exc.errors
+    return result
+
+
+def execute_command(command: dict, schema: dict) -> dict:
+    global _durable
+    durable = _durable
+    try:
+        op = command.get("op") if isinstance(command, dict) else None
+        if op == "ping":
+            return {"ok": True, "op": "ping"}
+        if op == "get":
+            target_type = command.get("target_type")
+            record_id = command.get("id")
+            if target_type not in RECORD_TYPES or not record_id:
+                raise SystemExit("get requires target_type and id")
+            path, record = find_record_by_id(target_type, record_id)
+            return {"ok": True, "op": "get", "type": target_type, "id": record_id, "path": path, "record": record}
+        if op == "query":
+            records = list(query_records(
+                command.get("target_type"),
+                command.get("where"),
+                command.get("since"),
+                command.get("until"),
+                command.get("fields"),
+                command.get("sort"),
+                command.get("limit"),
+            ))
+            return {"ok": True, "op": "query", "type": command.get("target_type"), "records": records}
+        if op == "search":
+            records = search_records(
+                command.get("text"),
+                command.get("target_type"),
+                command.get("fields"),
+                command.get("limit"),
+            )
+            return {"ok": True, "op": "search", "records": records}
+        if op == "dedupe":
+            candidates = command.get("candidates")
+            if not isinstance(candidates, list):
+                raise SystemExit("dedupe requires a candidates list")
+            results = dedupe_candidates(candidates, command.get("threshold"), command.get("limit"))
+            return {"ok": True, "op": "dedupe", "results": results}
+        args = namespace_from_command(command, get_command_defaults())
+        _durable = durable or bool(args.fsync)
+        timestamp = args.timestamp or iso_now()
+        if args.record_type in ("update", "delete"):
+            mutate_record(args, schema, timestamp)
+            return {"ok": True, "op": args.record_type, "type": args.target_type, "id": args.record_id}
+        record_id, writes = build_records(args, schema, timestamp)
+        for path, record in writes:
+            append_jsonl(path, record)
+        return {"ok": True, "op": "create", "type": args.record_type, "id": record_id}
+    except (json.JSONDecodeError, SystemExit) as exc:
+        return error_result(exc)
+    except Exception as exc:
+        # The service must answer every command; the client never replays one it may have started.
+        return error_result(exc)
+    finally:
+        _durable = durable
+
+
+def run_batch(args: argparse.Namespace, schema: dict) -> None:
+    defaults = get_command_defaults()
+    results: list[dict] = []
+    appends: dict[str, list] = {}
+    mutations: list[tuple[dict, argparse.Namespace, str]] = []
+
+    source = sys.stdin if args.input in (None, "-") else open(args.input, "r", encoding="utf-8")
+    try:
+        for line_no, line in enumerate(source, 1):
+            line = line.strip()
+            if not line:
+                continue
+            result: dict[str, Any] = {"line": line_no}
+            results.append(result)
+            try:
+                command = namespace_from_command(json.loads(line), defaults)
+                if args.write_mode and not command.write_mode:
+                    command.write_mode = args.write_mode
+                timestamp = command.timestamp or iso_now()
+                if command.record_type in ("update", "delete"):
+                    check_mutation_args(command)
+                    if command.record_type == "update":
+                        parse_update_value(command)
+                    result.update({"op": command.record_type, "type": command.target_type, "id": command.record_id})
+                    mutations.append((result, command, timestamp))
+                    continue
+                record_id, writes = build_records(command, schema, timestamp)
+            except (json.JSONDecodeError, SystemExit) as exc:
+                result.update(error_result(exc))
+                continue
+            for path, record in writes:
+                appends.setdefault(path, []).append(record)
+            result.update({"ok": True, "op": "create", "type": command.record_type, "id": record_id})
+    finally:
+        if source is not sys.stdin:
+            source.close()
+
+    for path, records in appends.items():
+        append_jsonl_many(path, records)
+
+    groups: dict[tuple[str, str], list] = {}
+    for result, command, timestamp in mutations:
+        try:
+            path = resolve_record_path(command.target_type, command.record_id)
+        except SystemExit as exc:
+            result.update(error_result(exc))
+            continue
+        groups.setdefault((path, get_write_mode(command)), []).append((result, command, timestamp))
+    for (path, write_mode), items in groups.items():
+        errors = apply_mutations(path, [(command, timestamp) for _, command, timestamp in items], schema, write_mode)
+        for (result, _, _), error in zip(items, errors):
+            result.update({"ok": True} if error is None else error_result(error))
+
+    for result in results:
+        print(json.dumps(result, ensure_ascii=False))
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Unified JSONL recorder")
+    parser.add_argument("--record-type", required=True, choices=["knowledge", "news", "lifelog", "agent_kernel_memory", "tasks", "update", "delete", "compact", "batch", "archive", "query", "search", "dedupe", "sync", "profile"])
+    parser.add_argument("--timestamp", default=None)
+    parser.add_argument("--id", dest="record_id", default=None)
+    parser.add_argument("--module", default=None)
+    parser.add_argument("--source", default=None)
+    parser.add_argument("--status", default=None)
+    parser.add_argument("--related-file", action="append", default=[])
+    parser.add_argument("--auto-record", action="store_true")
+    parser.add_argument("--no-auto-record", action="store_true")
+
+    parser.add_argument("--title", default=None)
+    parser.add_argument("--summary", default=None)
+    parser.add_argument("--problem", default=None)
+    parser.add_argument("--symptom", default=None)
+    parser.add_argument("--root-cause", dest="root_cause", default=None)
+    parser.add_argument("--solution", default=None)
+    parser.add_argument("--environment", default=None)
+    parser.add_argument("--tags", default=None)
+    parser.add_argument("--examples", default=None)
+
+    parser.add_argument("--description", default=None)
+    parser.add_argument("--details", default=None)
+    parser.add_argument("--priority", default=None)
+    parser.add_argument("--due-time", dest="due_time", default=None)
+    parser.add_argument("--completed-at", dest="completed_at", default=None)
+    parser.add_argument("--note", default=None)
+    parser.add_argument("--scope", default=None)
+
+    parser.add_argument("--extra", default=None, help="Extra JSON string to merge into record")
+    parser.add_argument("--target-type", default=None, choices=["knowledge", "news", "lifelog", "agent_kernel_memory", "tasks"])
+    parser.add_argument("--key", dest="update_key", default=None)
+    parser.add_argument("--value", dest="update_value", default=None)
+    parser.add_argument("--value-json", dest="update_value_json", default=None)
+    parser.add_argument("--write-mode", default=None, choices=["rewrite", "patch"])
+    parser.add_argument("--force", action="store_true")
+    parser.add_argument("--fsync", action="store_true", help="fsync writes (group-committed across concurrent writers)")
+    parser.add_argument(
+        "--profile",
+        nargs="?",
+        const="trace",
+        choices=PROFILE_MODES,
+        default=None,
+        help="append per-phase timings to the profile trace (cprofile: also dump cProfile stats)",
+    )
+    parser.add_argument("--input", default=None, help="NDJSON command file for batch mode (default: stdin)")
+    parser.add_argument("--where", action="append", default=[], help="query predicate: field=a|b, field!=value, field~text")
+    parser.add_argument("--since", default=None, help="query lower bound (YYYY-MM-DD or ISO timestamp)")
+    parser.add_argument("--until", default=None, help="query upper bound (YYYY-MM-DD or ISO timestamp)")
+    parser.add_argument("--fields", default=None, help="comma-separated fields to output")
+    parser.add_argument("--sort", default=None, help="sort field, field:desc (or -field) for descending")
+    parser.add_argument("--limit", type=int, default=None)
+    parser.add_argument("--text", default=None, help="full-text search query (knowledge/news)")
+    parser.add_argument("--threshold", type=float, default=None, help="dedupe similarity threshold (default 0.5)")
+    return parser
+
+
+def get_trace_path() -> str:
+    return os.path.join(PROFILE_DIR, "profile.jsonl")
+
+
+def print_profile_summary(args: argparse.Namespace) -> None:
+    path = args.input or get_trace_path()
+    if not os.path.exists(path):
+        raise SystemExit(f"profile trace not found: {path}")
+    with open(path, "r", encoding="utf-8") as f:
+        for summary in summarize_traces(f, args.since):
+            print(json.dumps(summary, ensure_ascii=False))
+
+
+def run_command(args: argparse.Namespace) -> None:
+    with phase("load_schema"):
+        schema = load_schema()
+    timestamp = args.timestamp or iso_now()
+
+    if args.record_type in ("update", "delete"):
+        mutate_record(args, schema, timestamp)
+    elif args.record_type == "compact":
+        compact_all(args)
+    elif args.record_type == "batch":
+        run_batch(args, schema)
+    elif args.record_type == "archive":
+        archive_lifelog(args)
+    elif args.record_type == "query":
+        print_query(args)
+    elif args.record_type == "search":
+        print_search(args)
+    elif args.record_type == "dedupe":
+        print_dedupe(args)
+    elif args.record_type == "sync":
+        sync_mirror(args)
+    elif args.record_type == "profile":
+        print_profile_summary(args)
+    else:
+        _, writes = build_records(args, schema, timestamp)
+        for path, record in writes:
+            append_jsonl(path, record)
+
+
+def main() -> None:
+    global _durable
+    started = time.perf_counter()
+    parser = build_parser()
+    args = parser.parse_args()
+    _durable = args.fsync
+
+    profiler = start_profile(
+        profile_mode(args.profile), get_trace_path(), os.path.join(PROFILE_DIR, "profiles"), started
+    )
+    if profiler is None:
+        run_command(args)
+        return
+    add_phase("parse_args", time.perf_counter() - started)
+    status = "error"
+    try:
+        with phase("command"):
+            run_command(args)
+        status = "ok"
+    finally:
+        finish_profile(
+            {"command": args.record_type, "target_type": args.target_type, "write_mode": args.write_mode},
+            status,
+        )
 
 
 if __name__ == "__main__":
@@ -0,0 +1,134 @@
+import json
+import os
+import threading
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+    import msvcrt
+
+
+_registry_lock = threading.Lock()
+_locks: dict[str, "FileLock"] = {}
+
+
+class FileLock:
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._thread_lock = threading.RLock()
+        self._depth = 0
+        self._fd: int | None = None
+
+    def acquire(self) -> None:
+        self._thread_lock.acquire()
+        if self._depth == 0:
+            try:
+                self._fd = _lock_fd(self.path)
+            except BaseException:
+                self._thread_lock.release()
+                raise
+        self._depth += 1
+
+    def release(self) -> None:
+        self._depth -= 1
+        if self._depth == 0 and self._fd is not None:
+            _unlock_fd(self._fd)
+            self._fd = None
+        self._thread_lock.release()
+
+    def __enter__(self) -> "FileLock":
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.release()
+
+
+def _lock_fd(path: str) -> int:
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+        else:
+            while True:
+                try:
+                    msvcrt.locking(fd, msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    continue
+    except BaseException:
+        os.close(fd)
+        raise
+    return fd
+
+
+def _unlock_fd(fd: int) -> None:
+    try:
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+        else:
+            os.lseek(fd, 0, os.SEEK_SET)
+            msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+    finally:
+        os.close(fd)
+
+
+def get_lock(path: str) -> FileLock:
+    key = os.path.abspath(path)
+    with _registry_lock:
+        lock = _locks.get(key)
+        if lock is None:
+            lock = FileLock(key)
+            _locks[key] = lock
+        return lock
+
+
+@contextmanager
+def locked(path: str):
+    lock = get_lock(path)
+    lock.acquire()
+    try:
+        yield lock
+    finally:
+        lock.release()
+
+
+def fsync_directory(path: str) -> None:
+    if os.name == "nt":
+        return
+    fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def group_commit(path: str, end: int, sync_lock_path: str, watermark_path: str) -> bool:
+    with locked(sync_lock_path):
+        key = os.path.normpath(path)
+        try:
+            with open(watermark_path, "r", encoding="utf-8") as f:
+                marks = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            marks = {}
+        try:
+            st = os.stat(path)
+        except OSError:
+            return False
+        mark = marks.get(key)
+        if mark and mark[0] == st.st_ino and mark[1] >= end:
+            return False
+        with open(path, "ab") as f:
+            size = os.fstat(f.fileno()).st_size
+            os.fsync(f.fileno())
+        marks[key] = [st.st_ino, size]
+        tmp_path = watermark_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(marks, f)
+        os.replace(tmp_path, watermark_path)
+        return True
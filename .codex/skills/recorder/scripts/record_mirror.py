@@ -0,0 +1,244 @@
+import hashlib
+import json
+import os
+import sqlite3
+
+from lifelog_segments import SEGMENT_SUFFIX, read_all_days
+from record_codec import loads
+from record_patches import PATCH_SUFFIX, applies_to, get_patch_path
+
+
+MIRROR_VERSION = "3"
+HEAD_BYTES = 4096
+MIRROR_COLUMNS = (
+    "id", "type", "timestamp", "day", "module", "status", "priority", "source", "title",
+    "due", "completed_at", "deleted", "tags", "content", "data", "path", "offset",
+)
+
+
+def _text(value) -> str | None:
+    if value is None or isinstance(value, str):
+        return value
+    return json.dumps(value, ensure_ascii=False)
+
+
+def _row(record_type: str, data: dict, path: str, offset: int | None) -> tuple:
+    timestamp = data.get("timestamp")
+    return (
+        str(data["id"]),
+        record_type,
+        _text(timestamp),
+        timestamp[:10] if isinstance(timestamp, str) and len(timestamp) >= 10 else None,
+        _text(data.get("module")),
+        _text(data.get("status")),
+        _text(data.get("priority")),
+        _text(data.get("source")),
+        _text(data.get("title")),
+        _text(data.get("due") or data.get("due_time")),
+        _text(data.get("completed_at")),
+        1 if data.get("deleted") is True else 0,
+        json.dumps(data["tags"], ensure_ascii=False) if "tags" in data else None,
+        _text(data.get("content")),
+        json.dumps(data, ensure_ascii=False),
+        path,
+        offset,
+    )
+
+
+def _parse_lines(raw: bytes, base: int | None = 0):
+    offset = base or 0
+    for line in raw.split(b"\n"):
+        start = offset
+        offset += len(line) + 1
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            data = loads(line.decode("utf-8", errors="replace"))
+        except json.JSONDecodeError:
+            continue
+        if isinstance(data, dict):
+            yield (None if base is None else start), data
+
+
+def _prefix_digest(path: str, length: int) -> str:
+    # First and last HEAD_BYTES of the synced prefix: a compaction or rewrite that reuses the inode and
+    # grows past the watermark still changes the bytes just before it.
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        digest.update(f.read(min(length, HEAD_BYTES)))
+        f.seek(max(length - HEAD_BYTES, 0))
+        digest.update(f.read(min(length, HEAD_BYTES)))
+    return digest.hexdigest()
+
+
+class AnalyticsMirror:
+    def __init__(self, db_path: str) -> None:
+        self.db_path = db_path
+        self._conn: sqlite3.Connection | None = None
+
+    def connect(self) -> sqlite3.Connection:
+        if self._conn is not None:
+            return self._conn
+        directory = os.path.dirname(self.db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        row = conn.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()
+        if row is None or row[0] != MIRROR_VERSION:
+            conn.execute("DROP TABLE IF EXISTS records")
+            conn.execute("DROP TABLE IF EXISTS watermarks")
+            conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('version', ?)", (MIRROR_VERSION,))
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS records (id TEXT NOT NULL, type TEXT NOT NULL, timestamp TEXT, day TEXT, "
+            "module TEXT, status TEXT, priority TEXT, source TEXT, title TEXT, due TEXT, completed_at TEXT, "
+            "deleted INTEGER NOT NULL DEFAULT 0, tags TEXT, content TEXT, data TEXT NOT NULL, path TEXT, "
+            "offset INTEGER, PRIMARY KEY (type, id))"
+        )
+        for column in ("id", "timestamp", "type", "module", "status", "day", "path"):
+            conn.execute(f"CREATE INDEX IF NOT EXISTS records_{column} ON records ({column})")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS watermarks (path TEXT PRIMARY KEY, type TEXT, inode INTEGER, "
+            "offset INTEGER, mtime_ns INTEGER, head TEXT)"
+        )
+        conn.commit()
+        self._conn = conn
+        return conn
+
+    def close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def sync(self, record_type: str, paths: list[str], full: bool = False) -> dict:
+        conn = self.connect()
+        stats = {"type": record_type, "files": 0, "bytes": 0, "rows": 0, "full": 0}
+        with conn:
+            if full:
+                conn.execute("DELETE FROM records WHERE type = ?", (record_type,))
+                conn.execute("DELETE FROM watermarks WHERE type = ?", (record_type,))
+            known = {row[0] for row in conn.execute("SELECT path FROM watermarks WHERE type = ?", (record_type,))}
+            current = set(paths) | {get_patch_path(p) for p in paths if not p.endswith(SEGMENT_SUFFIX)}
+            for path in sorted(known - current):
+                if not path.endswith(".patches"):
+                    conn.execute("DELETE FROM records WHERE type = ? AND path = ?", (record_type, path))
+                conn.execute("DELETE FROM watermarks WHERE path = ?", (path,))
+            for path in paths:
+                if path.endswith(SEGMENT_SUFFIX):
+                    self._sync_segment(conn, record_type, path, stats)
+                else:
+                    self._sync_jsonl(conn, record_type, path, stats)
+        return stats
+
+    def _watermark(self, conn: sqlite3.Connection, path: str) -> tuple | None:
+        return conn.execute("SELECT inode, offset, mtime_ns, head FROM watermarks WHERE path = ?", (path,)).fetchone()
+
+    def _store_watermark(self, conn: sqlite3.Connection, record_type: str, path: str, st: os.stat_result,
+                         offset: int) -> None:
+        conn.execute(
+            "INSERT OR REPLACE INTO watermarks (path, type, inode, offset, mtime_ns, head) VALUES (?, ?, ?, ?, ?, ?)",
+            (path, record_type, st.st_ino, offset, st.st_mtime_ns, _prefix_digest(path, offset)),
+        )
+
+    def _is_continuation(self, path: str, st: os.stat_result, mark: tuple | None) -> bool:
+        if mark is None:
+            return False
+        inode, offset, mtime_ns, head = mark
+        if st.st_ino != inode or st.st_size < offset:
+            return False
+        if st.st_mtime_ns != mtime_ns and st.st_size == offset:
+            # Modified without growing past the watermark: rewritten in place, not appended to.
+            return False
+        return _prefix_digest(path, offset) == head
+
+    def _read_tail(self, path: str, start: int) -> tuple[bytes, int]:
+        with open(path, "rb") as f:
+            f.seek(start)
+            raw = f.read()
+        end = raw.rfind(b"\n") + 1
+        return raw[:end], start + end
+
+    def _upsert(self, conn: sqlite3.Connection, record_type: str, path: str, records, stats: dict) -> None:
+        rows = [_row(record_type, data, path, offset) for offset, data in records if data.get("id")]
+        conn.executemany(
+            f"INSERT OR REPLACE INTO records ({', '.join(MIRROR_COLUMNS)}) VALUES ({', '.join('?' * len(MIRROR_COLUMNS))})",
+            rows,
+        )
+        stats["rows"] += len(rows)
+
+    def _sync_jsonl(self, conn: sqlite3.Connection, record_type: str, path: str, stats: dict) -> None:
+        try:
+            st = os.stat(path)
+        except OSError:
+            return
+        patch_path = get_patch_path(path)
+        mark = self._watermark(conn, path)
+        start = 0
+        if self._is_continuation(path, st, mark):
+            start = mark[1]
+            if st.st_size == start and st.st_mtime_ns == mark[2]:
+                self._sync_patches(conn, record_type, patch_path, stats, reset=False)
+                return
+        else:
+            conn.execute("DELETE FROM records WHERE type = ? AND path = ?", (record_type, path))
+            conn.execute("DELETE FROM watermarks WHERE path = ?", (patch_path,))
+            stats["full"] += 1
+        raw, end = self._read_tail(path, start)
+        stats["files"] += 1
+        stats["bytes"] += len(raw)
+        self._upsert(conn, record_type, path, _parse_lines(raw, start), stats)
+        self._store_watermark(conn, record_type, path, st, end)
+        self._sync_patches(conn, record_type, patch_path, stats, reset=start == 0)
+
+    def _sync_patches(self, conn: sqlite3.Connection, record_type: str, patch_path: str, stats: dict,
+                      reset: bool) -> None:
+        try:
+            st = os.stat(patch_path)
+        except OSError:
+            conn.execute("DELETE FROM watermarks WHERE path = ?", (patch_path,))
+            return
+        mark = None if reset else self._watermark(conn, patch_path)
+        start = mark[1] if self._is_continuation(patch_path, st, mark) else 0
+        if mark is not None and start == mark[1] and st.st_size == start:
+            return
+        raw, end = self._read_tail(patch_path, start)
+        stats["bytes"] += len(raw)
+        base_path = patch_path[: -len(PATCH_SUFFIX)]
+        for _, op in _parse_lines(raw):
+            if not op.get("id") or op.get("op") not in ("patch", "delete"):
+                continue
+            row = conn.execute(
+                "SELECT data, offset FROM records WHERE type = ? AND id = ? AND path = ?",
+                (record_type, op["id"], base_path),
+            ).fetchone()
+            if row is None or not applies_to(op, row[1]):
+                continue
+            if op["op"] == "delete":
+                conn.execute("DELETE FROM records WHERE type = ? AND id = ?", (record_type, op["id"]))
+                continue
+            data = json.loads(row[0])
+            data.update(op.get("set") or {})
+            self._upsert(conn, record_type, base_path, [(row[1], data)], stats)
+        self._store_watermark(conn, record_type, patch_path, st, end)
+
+    def _sync_segment(self, conn: sqlite3.Connection, record_type: str, path: str, stats: dict) -> None:
+        try:
+            st = os.stat(path)
+        except OSError:
+            return
+        mark = self._watermark(conn, path)
+        if mark is not None and mark[0] == st.st_ino and mark[1] == st.st_size and mark[2] == st.st_mtime_ns:
+            return
+        conn.execute("DELETE FROM records WHERE type = ? AND path = ?", (record_type, path))
+        stats["files"] += 1
+        stats["full"] += 1
+        stats["bytes"] += st.st_size
+        for _, raw in sorted(read_all_days(path).items()):
+            self._upsert(conn, record_type, path, _parse_lines(raw, None), stats)
+        conn.execute(
+            "INSERT OR REPLACE INTO watermarks (path, type, inode, offset, mtime_ns, head) VALUES (?, ?, ?, ?, ?, ?)",
+            (path, record_type, st.st_ino, st.st_size, st.st_mtime_ns, None),
+        )
@@ -0,0 +1,122 @@
+import json
+import os
+
+from record_codec import loads
+
+
+PATCH_SUFFIX = ".patches"
+COMPACT_MIN_BYTES = 4 * 1024
+COMPACT_MAX_BYTES = 1024 * 1024
+COMPACT_RATIO = 0.1
+
+
+def get_patch_path(path: str) -> str:
+    return path + PATCH_SUFFIX
+
+
+def build_patch(record_id: str, changes: dict, timestamp: str, end: int) -> dict:
+    return {"op": "patch", "id": record_id, "set": changes, "timestamp": timestamp, "end": end}
+
+
+def build_tombstone(record_id: str, timestamp: str, end: int) -> dict:
+    return {"op": "delete", "id": record_id, "timestamp": timestamp, "end": end}
+
+
+def applies_to(op: dict, offset: int | None) -> bool:
+    # "end" is the base file size when the op was written: lines appended later (a record re-created
+    # with the same id) are out of its reach. Ops from older logs have no end and reach every line.
+    end = op.get("end")
+    return offset is None or not isinstance(end, int) or offset < end
+
+
+def read_patch_log(path: str) -> tuple[list, int]:
+    patch_path = get_patch_path(path)
+    if not os.path.exists(patch_path):
+        return [], 0
+    with open(patch_path, "rb") as f:
+        raw = f.read()
+    consumed = raw.rfind(b"\n") + 1
+    patches = []
+    for line in raw[:consumed].decode("utf-8").splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            op = loads(line)
+        except json.JSONDecodeError:
+            continue
+        if isinstance(op, dict) and op.get("id") and op.get("op") in ("patch", "delete"):
+            patches.append(op)
+    return patches, consumed
+
+
+def load_patches(path: str) -> list:
+    return read_patch_log(path)[0]
+
+
+def patch_record(data: dict, patches: list, offset: int | None = None) -> dict | None:
+    merged = data
+    for op in patches:
+        if op["id"] != data.get("id") or not applies_to(op, offset):
+            continue
+        if op["op"] == "delete":
+            return None
+        if merged is data:
+            merged = dict(data)
+        merged.update(op.get("set") or {})
+    return merged
+
+
+def apply_patches(records: list, patches: list) -> list:
+    if not patches:
+        return records
+    by_id: dict[str, list] = {}
+    for item in records:
+        data = item.get("data")
+        if isinstance(data, dict) and data.get("id"):
+            by_id.setdefault(data["id"], []).append(item)
+    deleted = False
+    for op in patches:
+        for item in by_id.get(op["id"], []):
+            if item.get("deleted") or not applies_to(op, item.get("offset")):
+                continue
+            if op["op"] == "delete":
+                item["deleted"] = deleted = True
+                continue
+            item["data"].update(op.get("set") or {})
+            item["dirty"] = True
+    if not deleted:
+        return records
+    return [item for item in records if not item.get("deleted")]
+
+
+def should_compact(path: str) -> bool:
+    patch_path = get_patch_path(path)
+    try:
+        patch_size = os.path.getsize(patch_path)
+    except OSError:
+        return False
+    try:
+        base_size = os.path.getsize(path)
+    except OSError:
+        base_size = 0
+    if patch_size >= COMPACT_MAX_BYTES:
+        return True
+    return patch_size >= COMPACT_MIN_BYTES and patch_size >= base_size * COMPACT_RATIO
+
+
+def truncate_patches(path: str, consumed: int) -> None:
+    patch_path = get_patch_path(path)
+    try:
+        with open(patch_path, "rb") as f:
+            f.seek(consumed)
+            tail = f.read()
+    except OSError:
+        return
+    if not tail:
+        os.remove(patch_path)
+        return
+    tmp_path = patch_path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(tail)
+    os.replace(tmp_path, patch_path)
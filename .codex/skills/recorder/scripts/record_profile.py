@@ -0,0 +1,235 @@
+import cProfile
+import functools
+import json
+import os
+import sys
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+import record_codec
+
+
+PROFILE_ENV = "LIFEKERNEL_RECORDER_PROFILE"
+TRACE_ENV = "LIFEKERNEL_RECORDER_TRACE"
+PROFILE_MODES = ("trace", "cprofile")
+
+
+def _proc_io() -> dict | None:
+    try:
+        with open("/proc/self/io", "r", encoding="ascii") as f:
+            fields = dict(line.split(":", 1) for line in f if ":" in line)
+    except OSError:
+        return None
+    return {"read": int(fields["rchar"]), "written": int(fields["wchar"])}
+
+
+def _process_age() -> float | None:
+    try:
+        with open("/proc/self/stat", "r", encoding="ascii") as f:
+            started = int(f.read().rsplit(")", 1)[1].split()[19])
+        with open("/proc/uptime", "r", encoding="ascii") as f:
+            uptime = float(f.read().split()[0])
+    except (OSError, ValueError, IndexError):
+        return None
+    return uptime - started / os.sysconf("SC_CLK_TCK")
+
+
+class Profiler:
+    def __init__(self, mode: str, trace_path: str, cprofile_dir: str | None, started: float | None = None) -> None:
+        self.mode = mode
+        self.trace_path = trace_path
+        self.cprofile_dir = cprofile_dir
+        now = time.perf_counter()
+        self.started = now if started is None else started
+        age = _process_age()
+        self.startup = None if age is None else max(age - (now - self.started), 0.0)
+        self.phases: dict[str, list] = {}
+        self.counters = {"lines_parsed": 0, "files_opened": 0, "sqlite_connects": 0}
+        self.io_before = _proc_io()
+        self._loads = json.loads
+        self._decode = None
+        self._cprofile = None
+
+    def start(self) -> None:
+        def counting(decode):
+            def counted(*args, **kwargs):
+                self.counters["lines_parsed"] += 1
+                return decode(*args, **kwargs)
+            return counted
+
+        json.loads = counting(self._loads)
+        self._decode = record_codec.wrap_decoder(counting)
+        if self.mode == "cprofile":
+            self._cprofile = cProfile.Profile()
+            self._cprofile.enable()
+
+    def audit(self, event: str, args: tuple) -> None:
+        if event == "open" and isinstance(args[0], (str, bytes, os.PathLike)):
+            self.counters["files_opened"] += 1
+        elif event == "sqlite3.connect":
+            self.counters["sqlite_connects"] += 1
+
+    def add(self, name: str, seconds: float) -> None:
+        entry = self.phases.setdefault(name, [0.0, 0])
+        entry[0] += seconds
+        entry[1] += 1
+
+    def finish(self, command: dict, status: str) -> dict:
+        json.loads = self._loads
+        record_codec.restore_decoder(self._decode)
+        total = time.perf_counter() - self.started
+        trace = {
+            "ts": datetime.now().astimezone().isoformat(timespec="seconds"),
+            "pid": os.getpid(),
+            **command,
+            "status": status,
+            "total_ms": round(total * 1000, 3),
+            "startup_ms": round(self.startup * 1000, 3) if self.startup is not None else None,
+            "phases": {name: {"ms": round(s * 1000, 3), "calls": n} for name, (s, n) in self.phases.items()},
+            "counters": dict(self.counters),
+        }
+        io_after = _proc_io()
+        if self.io_before is not None and io_after is not None:
+            trace["counters"]["bytes_read"] = io_after["read"] - self.io_before["read"]
+            trace["counters"]["bytes_written"] = io_after["written"] - self.io_before["written"]
+        if self._cprofile is not None:
+            self._cprofile.disable()
+            os.makedirs(self.cprofile_dir, exist_ok=True)
+            dump = os.path.join(self.cprofile_dir, f"{datetime.now():%Y%m%d-%H%M%S}-{os.getpid()}.prof")
+            self._cprofile.dump_stats(dump)
+            trace["cprofile"] = dump
+        return trace
+
+
+_active: Profiler | None = None
+_audit_installed = False
+
+
+def _audit(event: str, args: tuple) -> None:
+    if _active is not None:
+        _active.audit(event, args)
+
+
+def profile_mode(flag: str | None) -> str | None:
+    if flag:
+        return flag
+    value = os.environ.get(PROFILE_ENV, "").strip().lower()
+    if value in ("", "0", "false", "off"):
+        return None
+    return "cprofile" if value == "cprofile" else "trace"
+
+
+def start_profile(mode: str | None, trace_path: str, cprofile_dir: str,
+                  started: float | None = None) -> Profiler | None:
+    global _active, _audit_installed
+    if mode is None:
+        return None
+    _active = Profiler(mode, os.environ.get(TRACE_ENV) or trace_path, cprofile_dir, started)
+    if not _audit_installed:
+        sys.addaudithook(_audit)
+        _audit_installed = True
+    _active.start()
+    return _active
+
+
+def finish_profile(command: dict, status: str) -> None:
+    global _active
+    profiler, _active = _active, None
+    if profiler is None:
+        return
+    trace = profiler.finish(command, status)
+    directory = os.path.dirname(profiler.trace_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    line = (json.dumps(trace, ensure_ascii=False) + "\n").encode("utf-8")
+    fd = os.open(profiler.trace_path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+    try:
+        os.write(fd, line)
+    finally:
+        os.close(fd)
+
+
+def add_phase(name: str, seconds: float) -> None:
+    if _active is not None:
+        _active.add(name, seconds)
+
+
+@contextmanager
+def phase(name: str):
+    if _active is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        add_phase(name, time.perf_counter() - started)
+
+
+def timed(name: str):
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if _active is None:
+                return fn(*args, **kwargs)
+            with phase(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def _percentile(values: list, q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
+
+
+def summarize_traces(lines, since: str | None = None) -> list[dict]:
+    groups: dict[str, list] = {}
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            trace = json.loads(line)
+        except json.JSONDecodeError:
+            continue
+        if not isinstance(trace, dict) or (since and str(trace.get("ts", "")) < since):
+            continue
+        key = " ".join(str(trace[k]) for k in ("command", "target_type", "write_mode") if trace.get(k))
+        groups.setdefault(key, []).append(trace)
+    summaries = []
+    for key, traces in groups.items():
+        totals = [t.get("total_ms") or 0 for t in traces]
+        startups = [t["startup_ms"] for t in traces if t.get("startup_ms") is not None]
+        elapsed = sum(totals) or 1.0
+        phases: dict[str, list] = {}
+        counters: dict[str, int] = {}
+        for trace in traces:
+            for name, value in (trace.get("phases") or {}).items():
+                entry = phases.setdefault(name, [0.0, 0])
+                entry[0] += value.get("ms", 0)
+                entry[1] += value.get("calls", 0)
+            for name, value in (trace.get("counters") or {}).items():
+                counters[name] = counters.get(name, 0) + (value or 0)
+        runs = len(traces)
+        summaries.append({
+            "command": key,
+            "runs": runs,
+            "errors": sum(1 for t in traces if t.get("status") != "ok"),
+            "total_ms": {
+                "sum": round(sum(totals), 3),
+                "mean": round(sum(totals) / runs, 3),
+                "p50": _percentile(totals, 0.5),
+                "p95": _percentile(totals, 0.95),
+                "max": max(totals),
+            },
+            "startup_ms": round(sum(startups) / len(startups), 3) if startups else None,
+            "phases": {
+                name: {"mean_ms": round(ms / runs, 3), "share": round(ms / elapsed, 4), "calls": calls}
+                for name, (ms, calls) in sorted(phases.items(), key=lambda item: item[1][0], reverse=True)
+            },
+            "counters": {name: round(value / runs, 1) for name, value in sorted(counters.items())},
+        })
+    summaries.sort(key=lambda s: s["total_ms"]["sum"], reverse=True)
+    return summaries
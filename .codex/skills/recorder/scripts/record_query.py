@@ -0,0 +1,231 @@
+import heapq
+import json
+import os
+from datetime import datetime, timedelta, timezone
+from itertools import islice
+
+from lifelog_segments import SEGMENT_SUFFIX, read_day, read_footer
+from record_codec import loads, may_match, value_needles
+from record_patches import applies_to, load_patches
+
+
+PREDICATE_OPS = ("!=", "~", "=")
+# Day files are named after each record's own local date, and UTC offsets run from -12:00 to +14:00.
+EARLIEST_OFFSET = timezone(timedelta(hours=-12))
+LATEST_OFFSET = timezone(timedelta(hours=14))
+
+
+def parse_predicate(expr: str) -> tuple[str, str, tuple[str, ...]]:
+    for op in PREDICATE_OPS:
+        field, sep, value = expr.partition(op)
+        if sep and field.strip():
+            return field.strip(), op, tuple(value.split("|"))
+    raise SystemExit(f"invalid --where predicate (use field=value, field!=value or field~text): {expr}")
+
+
+def _as_strings(value) -> list[str]:
+    if value is None:
+        return [""]
+    if isinstance(value, list):
+        return [v if isinstance(v, str) else json.dumps(v, ensure_ascii=False) for v in value]
+    if isinstance(value, bool):
+        return ["true" if value else "false"]
+    if isinstance(value, str):
+        return [value]
+    return [json.dumps(value, ensure_ascii=False)]
+
+
+def predicate_needles(predicates: list) -> list:
+    groups = []
+    for field, op, values in predicates:
+        if op == "=" and "" not in values:
+            groups.append(tuple(needle for value in values for needle in value_needles(value)))
+    return groups
+
+
+def match_predicates(record: dict, predicates: list) -> bool:
+    for field, op, values in predicates:
+        actual = _as_strings(record.get(field))
+        if op == "~":
+            hit = any(v.lower() in a.lower() for v in values for a in actual)
+        else:
+            hit = any(a in values for a in actual)
+            if op == "!=":
+                hit = not hit
+        if not hit:
+            return False
+    return True
+
+
+def parse_bound(value: str | None) -> tuple[str, datetime | None] | None:
+    if not value:
+        return None
+    if len(value) == 10:
+        try:
+            datetime.strptime(value, "%Y-%m-%d")
+        except ValueError:
+            raise SystemExit(f"invalid date: {value}") from None
+        return value, None
+    try:
+        dt = datetime.fromisoformat(value)
+    except ValueError:
+        raise SystemExit(f"invalid date: {value}") from None
+    if dt.tzinfo is None:
+        dt = dt.astimezone()
+    return dt.strftime("%Y-%m-%d"), dt
+
+
+def in_range(timestamp, since, until) -> bool:
+    if since is None and until is None:
+        return True
+    if not isinstance(timestamp, str) or len(timestamp) < 10:
+        return False
+    day = timestamp[:10]
+    for bound, upper in ((since, False), (until, True)):
+        if bound is None:
+            continue
+        bound_day, bound_dt = bound
+        if bound_dt is None:
+            if (day > bound_day) if upper else (day < bound_day):
+                return False
+            continue
+        try:
+            dt = datetime.fromisoformat(timestamp)
+        except ValueError:
+            return False
+        if dt.tzinfo is None:
+            dt = dt.astimezone()
+        if (dt > bound_dt) if upper else (dt < bound_dt):
+            return False
+    return True
+
+
+def partition_day(bound, upper: bool) -> str | None:
+    """Widest local date a record inside the bound can carry; exact timestamps are checked by in_range."""
+    if bound is None:
+        return None
+    day, dt = bound
+    if dt is None:
+        return day
+    return dt.astimezone(LATEST_OFFSET if upper else EARLIEST_OFFSET).strftime("%Y-%m-%d")
+
+
+def day_in_range(day: str, low: str | None, high: str | None) -> bool:
+    if low is not None and day < low:
+        return False
+    if high is not None and day > high:
+        return False
+    return True
+
+
+def iter_lifelog_partitions(lifelog_root: str, since=None, until=None):
+    if not os.path.isdir(lifelog_root):
+        return
+    low = partition_day(since, False)
+    high = partition_day(until, True)
+    for year in sorted(os.listdir(lifelog_root)):
+        year_dir = os.path.join(lifelog_root, year)
+        if year.startswith(".") or not os.path.isdir(year_dir):
+            continue
+        if (low and year < low[:4]) or (high and year > high[:4]):
+            continue
+        months: dict[str, list[str]] = {}
+        for name in os.listdir(year_dir):
+            month = name[: -len(SEGMENT_SUFFIX)] if name.endswith(SEGMENT_SUFFIX) else name
+            months.setdefault(month, []).append(name)
+        for month in sorted(months):
+            prefix = f"{year}-{month}"
+            if (low and prefix < low[:7]) or (high and prefix > high[:7]):
+                continue
+            # A partly archived month keeps some days in its segment and the rest as day files.
+            days = []
+            for name in months[month]:
+                path = os.path.join(year_dir, name)
+                if name.endswith(SEGMENT_SUFFIX):
+                    footer = read_footer(path)
+                    days.extend((day, path, day, footer) for day in footer["days"])
+                elif os.path.isdir(path):
+                    days.extend((day_name[:-6], os.path.join(path, day_name), None, None)
+                                for day_name in os.listdir(path) if day_name.endswith(".jsonl"))
+            for day, path, segment_day, footer in sorted(days, key=lambda entry: (entry[0], entry[1])):
+                if day_in_range(f"{prefix}-{day}", low, high):
+                    yield path, segment_day, footer
+
+
+def iter_partition_lines(path: str, day: str | None, footer: dict | None):
+    if day is not None:
+        yield from read_day(path, day, footer).splitlines()
+        return
+    with open(path, "rb") as f:
+        yield from f
+
+
+def iter_records(partitions, needles: list | None = None):
+    for path, day, footer in partitions:
+        ops: dict[str, list] = {}
+        if day is None:
+            for op in load_patches(path):
+                ops.setdefault(op["id"], []).append(op)
+        # Patches can change field values, so the byte pre-filter only applies to unpatched partitions.
+        groups = needles if needles and not ops else None
+        offset = 0
+        for line in iter_partition_lines(path, day, footer):
+            start = offset
+            offset += len(line)
+            line = line.strip()
+            if not line or (groups and not may_match(line, groups)):
+                continue
+            try:
+                record = loads(line)
+            except (json.JSONDecodeError, UnicodeDecodeError):
+                continue
+            if not isinstance(record, dict):
+                continue
+            for op in ops.get(record.get("id"), ()):
+                if not applies_to(op, start):
+                    continue
+                if op["op"] == "delete":
+                    record = None
+                    break
+                record.update(op.get("set") or {})
+            if record is not None:
+                yield record
+
+
+def _sort_value(value):
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return 0, value, ""
+    return 1, 0, "" if value is None else str(value)
+
+
+def sort_records(records, sort: str | None, limit: int | None):
+    if not sort:
+        return records if limit is None else islice(records, limit)
+    field, _, order = sort.partition(":")
+    descending = field.startswith("-") or order.lower() == "desc"
+    field = field.lstrip("-+")
+
+    def key(record):
+        value = record.get(field)
+        return (value is not None) == descending, _sort_value(value)
+
+    if limit is None:
+        return iter(sorted(records, key=key, reverse=descending))
+    pick = heapq.nlargest if descending else heapq.nsmallest
+    return iter(pick(limit, records, key=key))
+
+
+def project(record: dict, fields: list) -> dict:
+    if not fields:
+        return record
+    return {field: record[field] for field in fields if field in record}
+
+
+def run_query(records, predicates: list, since=None, until=None, fields: list | None = None,
+              sort: str | None = None, limit: int | None = None):
+    matched = (
+        record for record in records
+        if in_range(record.get("timestamp"), since, until) and match_predicates(record, predicates)
+    )
+    for record in sort_records(matched, sort, limit):
+        yield project(record, fields or [])
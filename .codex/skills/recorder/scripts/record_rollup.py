@@ -0,0 +1,72 @@
+import json
+import os
+from datetime import date
+
+
+ROLLUP_NAME = "rollup.json"
+ROLLUP_VERSION = 1
+LIFELOG_DIMS = ("day", "module", "status")
+TASK_DIMS = ("status", "priority", "week")
+
+
+def dim_value(value) -> str:
+    if value is None:
+        return ""
+    return value if isinstance(value, str) else json.dumps(value, ensure_ascii=False)
+
+
+def iso_week(timestamp) -> str:
+    if not isinstance(timestamp, str) or len(timestamp) < 10:
+        return ""
+    try:
+        year, week, _ = date.fromisoformat(timestamp[:10]).isocalendar()
+    except ValueError:
+        return ""
+    return f"{year}-W{week:02d}"
+
+
+def count_module_status(records) -> dict:
+    cells: dict[str, dict[str, int]] = {}
+    for data in records:
+        statuses = cells.setdefault(dim_value(data.get("module")), {})
+        status = dim_value(data.get("status"))
+        statuses[status] = statuses.get(status, 0) + 1
+    return cells
+
+
+def merge_cells(target: dict, cells: dict) -> dict:
+    for module, statuses in cells.items():
+        merged = target.setdefault(module, {})
+        for status, count in statuses.items():
+            merged[status] = merged.get(status, 0) + count
+    return target
+
+
+def lifelog_rollup(manifest: dict) -> dict:
+    cells = []
+    for day, entry in sorted(manifest["days"].items()):
+        for module, statuses in sorted((entry.get("rollup") or {}).items()):
+            for status, count in sorted(statuses.items()):
+                if count:
+                    cells.append([day, module, status, count])
+    return build_rollup("lifelog", LIFELOG_DIMS, cells)
+
+
+def build_rollup(record_type: str, dims: tuple, cells: list) -> dict:
+    return {
+        "version": ROLLUP_VERSION,
+        "type": record_type,
+        "dims": list(dims),
+        "total": sum(cell[-1] for cell in cells),
+        "cells": cells,
+    }
+
+
+def write_rollup(path: str, payload: dict) -> None:
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8", newline="\n") as f:
+        json.dump(payload, f, ensure_ascii=False, separators=(",", ":"))
+    os.replace(tmp_path, path)
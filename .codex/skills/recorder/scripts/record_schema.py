@@ -0,0 +1,165 @@
+import hashlib
+import json
+import marshal
+import os
+
+
+SCHEMA_PATH = os.path.join(".codex", "schema.json")
+CACHE_PATH = os.path.join(".codex", ".cache", "schema_validators.marshal")
+CACHE_VERSION = 1
+
+EMPTY_VALUES = (None, "", [])
+FIELD_TYPES = {
+    "string": (str,),
+    "array": (list,),
+    "object": (dict,),
+    "boolean": (bool,),
+    "number": (int, float),
+}
+
+_loaded: tuple | None = None
+# (schema path, size, mtime_ns) -> (schema, validators); only the current schema file is kept.
+_compiled: dict[tuple[str, int, int], tuple] = {}
+
+
+class ValidationFailed(SystemExit):
+    def __init__(self, errors: list) -> None:
+        super().__init__(errors[0]["message"])
+        self.errors = errors
+
+
+class RecordValidator:
+    __slots__ = ("record_type", "required", "enums", "field_types")
+
+    def __init__(self, record_type: str, spec: dict) -> None:
+        self.record_type = record_type
+        self.required = spec["required"]
+        self.enums = spec["enums"]
+        self.field_types = tuple(
+            (field, type_name, FIELD_TYPES[type_name]) for field, type_name in spec["field_types"]
+        )
+
+    def check(self, record: dict) -> list:
+        errors = []
+        for field in self.required:
+            if record.get(field) in EMPTY_VALUES:
+                errors.append({"field": field, "code": "required", "message": f"missing required field: {field}"})
+        for field, allowed in self.enums:
+            if field not in record:
+                continue
+            value = record[field]
+            try:
+                valid = value in allowed
+            except TypeError:
+                valid = False
+            if not valid:
+                errors.append({"field": field, "code": "enum", "message": f"invalid enum value for {field}: {value}"})
+        for field, type_name, types in self.field_types:
+            value = record.get(field)
+            if value is not None and not isinstance(value, types):
+                errors.append({"field": field, "code": "type", "message": f"invalid type for {field}: expected {type_name}"})
+        return errors
+
+
+def compile_specs(schema: dict) -> dict:
+    common = tuple(schema.get("common", {}).get("required", []))
+    enums = tuple((field, frozenset(allowed)) for field, allowed in schema.get("enums", {}).items())
+    field_types = schema.get("field_types", {})
+    for type_name in field_types.values():
+        if type_name not in FIELD_TYPES:
+            raise SystemExit(f"unsupported field type in schema: {type_name}")
+    specs = {}
+    for record_type, spec in schema.get("types", {}).items():
+        required = tuple(dict.fromkeys(common + tuple(spec.get("required", []))))
+        fields = set(required) | set(spec.get("optional", []))
+        specs[record_type] = {
+            "required": required,
+            "enums": enums,
+            "field_types": tuple((f, t) for f, t in field_types.items() if f in fields),
+        }
+    return specs
+
+
+def _read_cache(stamp: tuple[int, int]) -> dict | None:
+    try:
+        with open(CACHE_PATH, "rb") as f:
+            cache = marshal.load(f)
+    except (OSError, EOFError, ValueError, TypeError):
+        return None
+    if not isinstance(cache, dict) or cache.get("version") != CACHE_VERSION:
+        return None
+    cache["fresh"] = cache.get("stamp") == stamp
+    return cache
+
+
+def _write_cache(cache: dict) -> None:
+    try:
+        os.makedirs(os.path.dirname(CACHE_PATH), exist_ok=True)
+        tmp_path = CACHE_PATH + ".tmp"
+        with open(tmp_path, "wb") as f:
+            marshal.dump(cache, f)
+        os.replace(tmp_path, CACHE_PATH)
+    except OSError:
+        pass
+
+
+def load_schema() -> dict:
+    global _loaded
+    try:
+        st = os.stat(SCHEMA_PATH)
+    except OSError:
+        raise SystemExit(f"schema not found: {SCHEMA_PATH}") from None
+    stamp = (st.st_size, st.st_mtime_ns)
+    if _loaded is not None and _loaded[0] == stamp:
+        return _loaded[1]
+
+    cache = _read_cache(stamp)
+    if cache is not None and cache["fresh"]:
+        schema, specs = cache["schema"], cache["specs"]
+    else:
+        with open(SCHEMA_PATH, "rb") as f:
+            raw = f.read()
+        digest = hashlib.sha256(raw).hexdigest()
+        if cache is not None and cache.get("sha256") == digest:
+            schema, specs = cache["schema"], cache["specs"]
+        else:
+            schema = json.loads(raw)
+            specs = compile_specs(schema)
+        _write_cache({
+            "version": CACHE_VERSION,
+            "stamp": stamp,
+            "sha256": digest,
+            "schema": schema,
+            "specs": specs,
+        })
+
+    key = (SCHEMA_PATH, *stamp)
+    _compiled.clear()
+    _compiled[key] = (schema, build_validators(specs))
+    _loaded = (stamp, schema)
+    return schema
+
+
+def build_validators(specs: dict) -> dict:
+    return {record_type: RecordValidator(record_type, spec) for record_type, spec in specs.items()}
+
+
+def get_validators(schema: dict) -> dict:
+    if _loaded is not None:
+        entry = _compiled.get((SCHEMA_PATH, *_loaded[0]))
+        if entry is not None and entry[0] is schema:
+            return entry[1]
+    return build_validators(compile_specs(schema))
+
+
+def check_record(record: dict, record_type: str, schema: dict) -> list:
+    validator = get_validators(schema).get(record_type)
+    if validator is None:
+        return [{"field": "type", "code": "unknown_type", "message": f"schema missing record type: {record_type}"}]
+    return validator.check(record)
+
+
+def validate_record(record: dict, record_type: str, schema: dict) -> None:
+    errors = check_record(record, record_type, schema)
+    if errors:
+        raise ValidationFailed(errors)
@@ -0,0 +1,148 @@
+import heapq
+import json
+import math
+import re
+import sqlite3
+from collections import Counter
+
+from record_snapshot import StateView
+
+
+SEARCH_VERSION = "1"
+SHARD_VERSION = 3
+BM25_K1 = 1.2
+BM25_B = 0.75
+SEARCH_FIELDS = {
+    "knowledge": ("title", "summary", "problem", "symptom", "root_cause", "solution", "environment",
+                  "examples", "tags", "content"),
+    "news": ("title", "summary", "tags", "content"),
+}
+# The dashboard renders its cards straight from the shard, so it carries every searched field except the long body.
+SHARD_FIELDS = {
+    record_type: ("id", "timestamp") + tuple(field for field in fields if field != "content")
+    for record_type, fields in SEARCH_FIELDS.items()
+}
+CJK_RANGES = "\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff\uac00-\ud7af"
+TOKEN_RE = re.compile(f"([0-9a-z]+)|([{CJK_RANGES}]+)")
+
+
+def tokenize(text: str) -> list[str]:
+    tokens = []
+    for word, cjk in TOKEN_RE.findall(text.lower()):
+        if word:
+            tokens.append(word)
+        elif len(cjk) == 1:
+            tokens.append(cjk)
+        else:
+            tokens.extend(cjk[i:i + 2] for i in range(len(cjk) - 1))
+    return tokens
+
+
+def _field_text(value) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, str):
+        return value
+    if isinstance(value, list):
+        return " ".join(_field_text(v) for v in value)
+    if isinstance(value, dict):
+        return " ".join(_field_text(v) for v in value.values())
+    return str(value)
+
+
+def document_terms(record: dict, fields: tuple) -> Counter:
+    return Counter(tokenize(" ".join(_field_text(record.get(field)) for field in fields)))
+
+
+class SearchIndex(StateView):
+    version = SEARCH_VERSION
+    tables = ("docs", "postings")
+
+    def __init__(self, record_type: str, path: str, db_path: str, export_path: str | None = None) -> None:
+        super().__init__(path, db_path, export_path)
+        self.record_type = record_type
+        self.fields = SEARCH_FIELDS[record_type]
+
+    def create_tables(self, conn: sqlite3.Connection) -> None:
+        conn.execute("CREATE TABLE IF NOT EXISTS docs (id TEXT PRIMARY KEY, length INTEGER, timestamp TEXT, data TEXT)")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS postings (term TEXT, id TEXT, tf INTEGER, PRIMARY KEY (term, id)) WITHOUT ROWID"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS postings_id ON postings (id)")
+
+    def add(self, conn: sqlite3.Connection, records: list) -> None:
+        for record in records:
+            doc_id = str(record["id"])
+            terms = document_terms(record, self.fields)
+            conn.execute(
+                "INSERT OR REPLACE INTO docs (id, length, timestamp, data) VALUES (?, ?, ?, ?)",
+                (doc_id, sum(terms.values()), record.get("timestamp"), json.dumps(record, ensure_ascii=False)),
+            )
+            conn.executemany(
+                "INSERT OR REPLACE INTO postings (term, id, tf) VALUES (?, ?, ?)",
+                ((term, doc_id, tf) for term, tf in terms.items()),
+            )
+
+    def remove(self, conn: sqlite3.Connection, ids: list) -> None:
+        conn.executemany("DELETE FROM postings WHERE id = ?", ((i,) for i in ids))
+        conn.executemany("DELETE FROM docs WHERE id = ?", ((i,) for i in ids))
+
+    def search(self, text: str, limit: int = 10) -> list[tuple[float, dict]]:
+        self.ensure_fresh()
+        terms = list(dict.fromkeys(tokenize(text)))
+        if not terms:
+            return []
+        conn = self.connect()
+        count, total = conn.execute("SELECT COUNT(*), COALESCE(SUM(length), 0) FROM docs").fetchone()
+        if count == 0:
+            return []
+        avgdl = total / count or 1.0
+        scores: dict[str, float] = {}
+        for term in terms:
+            rows = conn.execute(
+                "SELECT p.id, p.tf, d.length FROM postings p JOIN docs d ON d.id = p.id WHERE p.term = ?",
+                (term,),
+            ).fetchall()
+            if not rows:
+                continue
+            idf = math.log(1 + (count - len(rows) + 0.5) / (len(rows) + 0.5))
+            for doc_id, tf, length in rows:
+                norm = tf + BM25_K1 * (1 - BM25_B + BM25_B * length / avgdl)
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (BM25_K1 + 1) / norm
+        top = heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
+        results = []
+        for doc_id, score in top:
+            row = conn.execute("SELECT data FROM docs WHERE id = ?", (doc_id,)).fetchone()
+            if row is not None:
+                results.append((score, json.loads(row[0])))
+        return results
+
+    def export(self) -> None:
+        if not self.export_path:
+            return
+        conn = self.connect()
+        # Postings address documents by position in `ids`, `lengths` and `docs`.
+        fields = SHARD_FIELDS[self.record_type]
+        ids, lengths, docs, positions = [], [], [], {}
+        for doc_id, length, data in conn.execute("SELECT id, length, data FROM docs ORDER BY timestamp DESC, id"):
+            record = json.loads(data)
+            positions[doc_id] = len(ids)
+            ids.append(doc_id)
+            lengths.append(length)
+            docs.append({field: record[field] for field in fields if field in record})
+        terms: dict[str, list] = {}
+        for term, doc_id, tf in conn.execute("SELECT term, id, tf FROM postings ORDER BY term"):
+            terms.setdefault(term, []).extend((positions[doc_id], tf))
+        payload = {
+            "version": SHARD_VERSION,
+            "type": self.record_type,
+            "source": self.source_sizes(),
+            "k1": BM25_K1,
+            "b": BM25_B,
+            "avgdl": sum(lengths) / len(lengths) if lengths else 0,
+            "ids": ids,
+            "lengths": lengths,
+            "docs": docs,
+            "terms": terms,
+        }
+        self.write_export(payload)
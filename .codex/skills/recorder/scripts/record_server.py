@@ -0,0 +1,124 @@
+import argparse
+import json
+import os
+import signal
+import socketserver
+import threading
+
+import record_jsonl
+from record_service import get_service_address, parse_address
+
+
+WRITE_OPS = {"create", "update", "delete"}
+EXPORT_DELAY = 2.0
+
+
+class RecorderState:
+    def __init__(self, export_delay: float = EXPORT_DELAY) -> None:
+        self.lock = threading.Lock()
+        self.export_delay = export_delay
+        self._export_timer: threading.Timer | None = None
+
+    def get_schema(self) -> dict:
+        return record_jsonl.load_schema()
+
+    def handle(self, command: dict) -> dict:
+        with self.lock:
+            try:
+                schema = self.get_schema()
+            except Exception as exc:
+                return record_jsonl.error_result(exc)
+            except SystemExit as exc:
+                return {"ok": False, "error": str(exc)}
+            result = record_jsonl.execute_command(command, schema)
+            if result.get("ok") and result.get("op") in WRITE_OPS:
+                self._schedule_export()
+            return result
+
+    def _schedule_export(self) -> None:
+        # Dashboard exports are rewritten once the service goes idle, not on every write.
+        if self._export_timer is not None:
+            self._export_timer.cancel()
+        self._export_timer = threading.Timer(self.export_delay, self.flush_exports)
+        self._export_timer.daemon = True
+        self._export_timer.start()
+
+    def flush_exports(self) -> list[str]:
+        with self.lock:
+            if self._export_timer is not None:
+                self._export_timer.cancel()
+                self._export_timer = None
+            try:
+                return record_jsonl.export_state_views()
+            except Exception:
+                return []
+
+
+class RecorderHandler(socketserver.StreamRequestHandler):
+    def handle(self) -> None:
+        state: RecorderState = self.server.state
+        for raw in self.rfile:
+            line = raw.strip()
+            if not line:
+                continue
+            try:
+                command = json.loads(line)
+            except (json.JSONDecodeError, UnicodeDecodeError) as exc:
+                response = {"ok": False, "error": f"invalid JSON: {exc}"}
+            else:
+                response = state.handle(command)
+            try:
+                payload = json.dumps(response, ensure_ascii=False)
+            except (TypeError, ValueError) as exc:
+                payload = json.dumps({"ok": False, "error": f"unserializable response: {exc}"})
+            self.wfile.write((payload + "\n").encode("utf-8"))
+            self.wfile.flush()
+
+
+def build_server(address: str) -> socketserver.BaseServer:
+    kind, target = parse_address(address)
+    if kind == "unix":
+        path = str(target)
+        record_jsonl.ensure_dir(path)
+        if os.path.exists(path):
+            os.remove(path)
+        server = socketserver.ThreadingUnixStreamServer(path, RecorderHandler)
+        os.chmod(path, 0o600)
+    else:
+        socketserver.ThreadingTCPServer.allow_reuse_address = True
+        server = socketserver.ThreadingTCPServer(target, RecorderHandler)
+    server.daemon_threads = True
+    server.state = RecorderState()
+    return server
+
+
+def _interrupt(signum, frame) -> None:
+    raise KeyboardInterrupt
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Resident recorder service (line-delimited JSON)")
+    parser.add_argument("--address", default=None, help="unix:<path> or tcp:<host>:<port>")
+    args = parser.parse_args()
+
+    address = get_service_address(args.address)
+    server = build_server(address)
+    server.state.get_schema()
+    signal.signal(signal.SIGTERM, _interrupt)
+    print(f"recorder service listening on {address}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        server.state.flush_exports()
+        kind, target = parse_address(address)
+        if kind == "unix" and os.path.exists(str(target)):
+            os.remove(str(target))
+        for index in record_jsonl._record_indexes.values():
+            index.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,27 @@
+import os
+import socket
+
+
+DEFAULT_SOCKET_PATH = os.path.join("workspace", "records", ".recorder.sock")
+DEFAULT_TCP_ADDRESS = "127.0.0.1:47615"
+
+
+def get_service_address(value: str | None = None) -> str:
+    address = value or os.environ.get("LIFEKERNEL_RECORDER_ADDRESS")
+    if address:
+        return address
+    if hasattr(socket, "AF_UNIX"):
+        return f"unix:{DEFAULT_SOCKET_PATH}"
+    return f"tcp:{DEFAULT_TCP_ADDRESS}"
+
+
+def parse_address(address: str) -> tuple[str, object]:
+    scheme, _, rest = address.partition(":")
+    if scheme == "unix":
+        if not hasattr(socket, "AF_UNIX"):
+            raise SystemExit("unix sockets are not supported on this platform")
+        return "unix", rest
+    if scheme == "tcp":
+        host, _, port = rest.rpartition(":")
+        return "tcp", (host or "127.0.0.1", int(port))
+    raise SystemExit(f"unsupported recorder address: {address}")
@@ -0,0 +1,300 @@
+import json
+import os
+import sqlite3
+
+from record_codec import loads
+from record_index import file_stamp
+from record_patches import get_patch_path, load_patches, patch_record
+from record_rollup import TASK_DIMS, build_rollup, dim_value, iso_week, write_rollup
+
+
+SNAPSHOT_VERSION = "2"
+SNAPSHOT_COLUMNS = ("status", "priority", "due")
+
+
+def source_stamps(path: str) -> list:
+    return [list(stamp) if stamp else None for stamp in (file_stamp(path), file_stamp(get_patch_path(path)))]
+
+
+def load_current_records(path: str) -> dict[str, dict]:
+    latest: dict[str, dict] = {}
+    offsets: dict[str, int] = {}
+    if os.path.exists(path):
+        offset = 0
+        with open(path, "rb") as f:
+            for line in f:
+                start = offset
+                offset += len(line)
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    data = loads(line)
+                except (json.JSONDecodeError, UnicodeDecodeError):
+                    continue
+                if isinstance(data, dict) and data.get("id"):
+                    latest[str(data["id"])] = data
+                    offsets[str(data["id"])] = start
+    by_id: dict[str, list] = {}
+    for op in load_patches(path):
+        by_id.setdefault(op["id"], []).append(op)
+    for record_id, ops in by_id.items():
+        if record_id not in latest:
+            continue
+        patched = patch_record(latest[record_id], ops, offsets[record_id])
+        if patched is None:
+            del latest[record_id]
+        else:
+            latest[record_id] = patched
+    return latest
+
+
+def _columns(data: dict) -> tuple:
+    return (
+        str(data["id"]),
+        data.get("status"),
+        data.get("priority"),
+        data.get("due") or data.get("due_time"),
+        data.get("timestamp"),
+        json.dumps(data, ensure_ascii=False),
+    )
+
+
+class StateView:
+    version = "1"
+    tables: tuple[str, ...] = ()
+    # Views whose export grows with the whole corpus leave it to export_if_stale (sync, service idle flush).
+    export_on_write = True
+
+    def __init__(self, path: str, db_path: str, export_path: str | None = None) -> None:
+        self.path = path
+        self.db_path = db_path
+        self.export_path = export_path
+        self._conn: sqlite3.Connection | None = None
+
+    def connect(self) -> sqlite3.Connection:
+        if self._conn is not None:
+            return self._conn
+        directory = os.path.dirname(self.db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        row = conn.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()
+        if row is None or row[0] != self.version:
+            for table in self.tables:
+                conn.execute(f"DROP TABLE IF EXISTS {table}")
+            conn.execute("DELETE FROM meta")
+            conn.execute("INSERT INTO meta (key, value) VALUES ('version', ?)", (self.version,))
+        self.create_tables(conn)
+        conn.commit()
+        self._conn = conn
+        return conn
+
+    def close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def source_stamps(self) -> list:
+        return source_stamps(self.path)
+
+    def stored_stamps(self) -> list | None:
+        row = self.connect().execute("SELECT value FROM meta WHERE key = 'stamps'").fetchone()
+        return None if row is None else json.loads(row[0])
+
+    def is_fresh(self) -> bool:
+        return self.stored_stamps() == self.source_stamps()
+
+    def ensure_fresh(self) -> None:
+        if not self.is_fresh():
+            self.rebuild()
+
+    def rebuild(self) -> None:
+        records = load_current_records(self.path)
+        conn = self.connect()
+        with conn:
+            for table in self.tables:
+                conn.execute(f"DELETE FROM {table}")
+            self.add(conn, list(records.values()))
+            self._store_stamps(conn)
+        self.note_write()
+
+    def apply(self, before: list | None, upserts=(), deletes=()) -> None:
+        if before is None or before != self.stored_stamps():
+            self.rebuild()
+            return
+        upserts = [record for record in upserts if record.get("id")]
+        conn = self.connect()
+        with conn:
+            self.remove(conn, [str(record["id"]) for record in upserts] + [str(i) for i in deletes])
+            self.add(conn, upserts)
+            self._store_stamps(conn)
+        if upserts or deletes:
+            self.note_write()
+
+    def note_write(self) -> None:
+        if self.export_on_write:
+            self.refresh_export()
+
+    def create_tables(self, conn: sqlite3.Connection) -> None:
+        raise NotImplementedError
+
+    def add(self, conn: sqlite3.Connection, records: list) -> None:
+        raise NotImplementedError
+
+    def remove(self, conn: sqlite3.Connection, ids: list) -> None:
+        raise NotImplementedError
+
+    def export(self) -> None:
+        pass
+
+    def export_paths(self) -> list[str]:
+        return [self.export_path] if self.export_path else []
+
+    def source_sizes(self) -> dict:
+        # Exported alongside the data so the dashboard can compare it with the live files and detect a stale export.
+        base, patches = self.stored_stamps() or [None, None]
+        return {"bytes": base[0] if base else None, "patch_bytes": patches[0] if patches else None}
+
+    def refresh_export(self) -> None:
+        self.export()
+        conn = self.connect()
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES ('exported', ?)",
+                (json.dumps(self.stored_stamps()),),
+            )
+
+    def export_if_stale(self) -> bool:
+        paths = self.export_paths()
+        if not paths:
+            return False
+        self.ensure_fresh()
+        row = self.connect().execute("SELECT value FROM meta WHERE key = 'exported'").fetchone()
+        if row is not None and json.loads(row[0]) == self.stored_stamps() and all(map(os.path.exists, paths)):
+            return False
+        self.refresh_export()
+        return True
+
+    def write_export(self, payload: dict, path: str | None = None) -> None:
+        path = path or self.export_path
+        if not path:
+            return
+        tmp_path = path + ".tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8", newline="\n") as f:
+                json.dump(payload, f, ensure_ascii=False, separators=(",", ":"))
+            os.replace(tmp_path, path)
+        except OSError:
+            pass
+
+    def _store_stamps(self, conn: sqlite3.Connection) -> None:
+        conn.execute(
+            "INSERT OR REPLACE INTO meta (key, value) VALUES ('stamps', ?)",
+            (json.dumps(self.source_stamps()),),
+        )
+
+
+class TaskSnapshot(StateView):
+    version = SNAPSHOT_VERSION
+    tables = ("tasks", "rollup")
+
+    def __init__(self, path: str, db_path: str, export_path: str | None = None,
+                 rollup_path: str | None = None, history_path: str | None = None) -> None:
+        super().__init__(path, db_path, export_path)
+        self.rollup_path = rollup_path
+        self.history_path = history_path
+
+    def create_tables(self, conn: sqlite3.Connection) -> None:
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS tasks (id TEXT PRIMARY KEY, status TEXT, priority TEXT, due TEXT, "
+            "timestamp TEXT, data TEXT)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS tasks_status ON tasks (status, priority, due)")
+        conn.execute("CREATE INDEX IF NOT EXISTS tasks_priority ON tasks (priority, due)")
+        conn.execute("CREATE INDEX IF NOT EXISTS tasks_due ON tasks (due)")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS rollup (status TEXT, priority TEXT, week TEXT, count INTEGER, "
+            "PRIMARY KEY (status, priority, week)) WITHOUT ROWID"
+        )
+
+    def add(self, conn: sqlite3.Connection, records: list) -> None:
+        self.remove(conn, [str(d["id"]) for d in records])
+        conn.executemany("INSERT INTO tasks VALUES (?, ?, ?, ?, ?, ?)", (_columns(d) for d in records))
+        self._bump(conn, [(d.get("status"), d.get("priority"), d.get("timestamp")) for d in records], 1)
+
+    def remove(self, conn: sqlite3.Connection, ids: list) -> None:
+        rows = []
+        for record_id in ids:
+            rows.extend(conn.execute("SELECT status, priority, timestamp FROM tasks WHERE id = ?", (record_id,)))
+        conn.executemany("DELETE FROM tasks WHERE id = ?", ((i,) for i in ids))
+        self._bump(conn, rows, -1)
+
+    def _bump(self, conn: sqlite3.Connection, rows: list, delta: int) -> None:
+        conn.executemany(
+            "INSERT INTO rollup (status, priority, week, count) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT (status, priority, week) DO UPDATE SET count = count + excluded.count",
+            ((dim_value(status), dim_value(priority), iso_week(timestamp), delta) for status, priority, timestamp in rows),
+        )
+        if delta < 0:
+            conn.execute("DELETE FROM rollup WHERE count <= 0")
+
+    def iter_records(self, include: dict | None = None, exclude: dict | None = None):
+        self.ensure_fresh()
+        clauses, params = [], []
+        for column, values in (include or {}).items():
+            clauses.append(f"{column} IN ({','.join('?' * len(values))})")
+            params.extend(values)
+        for column, values in (exclude or {}).items():
+            clauses.append(f"({column} IS NULL OR {column} NOT IN ({','.join('?' * len(values))}))")
+            params.extend(values)
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        cursor = self.connect().execute(f"SELECT data FROM tasks{where} ORDER BY timestamp, id", params)
+        for (data,) in cursor:
+            yield json.loads(data)
+
+    def counts(self) -> dict:
+        rows = self.connect().execute("SELECT status, COUNT(*) FROM tasks GROUP BY status ORDER BY status")
+        return {status or "": count for status, count in rows}
+
+    def rollup(self) -> dict:
+        cells = [list(row) for row in self.connect().execute(
+            "SELECT status, priority, week, count FROM rollup ORDER BY status, priority, week"
+        )]
+        return build_rollup("tasks", TASK_DIMS, cells)
+
+    def export_paths(self) -> list[str]:
+        return [p for p in (self.export_path, self.history_path, self.rollup_path) if p]
+
+    def note_write(self) -> None:
+        # The rollup is a few KB and backs the dashboard totals, so it follows every write; the task lists wait
+        # for sync or the service idle flush.
+        self.export_rollup()
+
+    def export_rollup(self) -> None:
+        if self.rollup_path:
+            try:
+                write_rollup(self.rollup_path, self.rollup())
+            except OSError:
+                pass
+
+    def export(self) -> None:
+        self.export_rollup()
+        conn = self.connect()
+        order = "ORDER BY priority, due IS NULL, due, timestamp"
+        if self.export_path:
+            open_tasks = [json.loads(row[0]) for row in conn.execute(
+                f"SELECT data FROM tasks WHERE status IS NOT 'done' {order}"
+            )]
+            self.write_export({
+                "version": 2,
+                "counts": self.counts(),
+                "source": self.source_sizes(),
+                "tasks": open_tasks,
+            })
+        if self.history_path:
+            done = [json.loads(row[0]) for row in conn.execute(f"SELECT data FROM tasks WHERE status = 'done' {order}")]
+            self.write_export({"version": 2, "tasks": done}, self.history_path)
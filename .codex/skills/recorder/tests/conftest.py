@@ -0,0 +1,70 @@
+import os
+import shutil
+import sys
+
+import pytest
+
+
+SCRIPTS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "scripts")
+REPO_ROOT = os.path.abspath(os.path.join(SCRIPTS_DIR, "..", "..", "..", ".."))
+sys.path.insert(0, SCRIPTS_DIR)
+
+import record_jsonl  # noqa: E402
+import record_schema  # noqa: E402
+
+
+def reset_state() -> None:
+    for index in record_jsonl._record_indexes.values():
+        index.close()
+    record_jsonl._record_indexes.clear()
+    for index in record_jsonl._search_indexes.values():
+        index.close()
+    record_jsonl._search_indexes.clear()
+    if record_jsonl._task_snapshot is not None:
+        record_jsonl._task_snapshot.close()
+    record_jsonl._task_snapshot = None
+    if record_jsonl._dedupe_index is not None:
+        record_jsonl._dedupe_index.close()
+    record_jsonl._dedupe_index = None
+    record_schema._loaded = None
+    record_schema._compiled.clear()
+
+
+@pytest.fixture
+def workspace(tmp_path, monkeypatch):
+    """Run the recorder against an empty records tree rooted at tmp_path."""
+    os.makedirs(tmp_path / ".codex")
+    shutil.copy(os.path.join(REPO_ROOT, ".codex", "schema.json"), tmp_path / ".codex" / "schema.json")
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("LIFEKERNEL_RECORDER_AUTO_COMPACT", "off")
+    monkeypatch.delenv("LIFEKERNEL_RECORDER_WRITE_MODE", raising=False)
+    monkeypatch.delenv("LIFEKERNEL_RECORDER_ADDRESS", raising=False)
+    reset_state()
+    yield tmp_path
+    reset_state()
+
+
+@pytest.fixture
+def recorder(workspace, capsys):
+    """Call the CLI in-process and return its stdout lines."""
+
+    def run(*argv: str) -> list[str]:
+        capsys.readouterr()
+        args = record_jsonl.build_parser().parse_args(list(argv))
+        record_jsonl.run_command(args)
+        return [line for line in capsys.readouterr().out.splitlines() if line.strip()]
+
+    return run
+
+
+@pytest.fixture
+def create_record(recorder):
+    """Create a record through the CLI, passing each keyword as its --flag."""
+
+    def create(record_type: str, record_id: str, **fields: str) -> list[str]:
+        argv = ["--record-type", record_type, "--id", record_id]
+        for key, value in fields.items():
+            argv += ["--" + key.replace("_", "-"), value]
+        return recorder(*argv)
+
+    return create
@@ -0,0 +1,35 @@
+import json
+import os
+
+import record_jsonl
+from lifelog_manifest import get_manifest_path
+
+
+def read_days() -> dict:
+    with open(get_manifest_path(record_jsonl.get_lifelog_root()), encoding="utf-8") as f:
+        return json.load(f)["days"]
+
+
+def test_each_append_updates_its_day(recorder, create_record):
+    create_record("lifelog", "a1", description="a1", timestamp="2026-10-01T09:00:00+08:00")
+    assert read_days()["2026-10-01"]["count"] == 1
+
+    create_record("lifelog", "a2", description="a2", timestamp="2026-10-01T10:00:00+08:00")
+    entry = read_days()["2026-10-01"]
+    day_path = os.path.join(record_jsonl.get_lifelog_root(), "2026", "10", "01.jsonl")
+    assert (entry["count"], entry["bytes"]) == (2, os.path.getsize(day_path))
+    assert (entry["min_ts"], entry["max_ts"]) == ("2026-10-01T09:00:00+08:00", "2026-10-01T10:00:00+08:00")
+
+    create_record("lifelog", "b1", description="b1", timestamp="2026-10-02T09:00:00+08:00")
+    assert read_days()["2026-10-02"]["count"] == 1
+
+    lines = recorder("--record-type", "sync", "--target-type", "lifelog")
+    assert json.loads(lines[-1])["exported"] == []
+
+
+def test_recreated_record_is_counted_once(recorder, create_record):
+    timestamp = "2026-10-01T09:00:00+08:00"
+    create_record("lifelog", "l1", description="first", timestamp=timestamp)
+    recorder("--record-type", "delete", "--target-type", "lifelog", "--id", "l1", "--write-mode", "patch")
+    create_record("lifelog", "l1", description="again", timestamp=timestamp)
+    assert read_days()["2026-10-01"]["count"] == 1
@@ -0,0 +1,53 @@
+import json
+import os
+
+import record_jsonl
+from lifelog_segments import list_segments, read_all_days, read_footer, write_segment
+
+
+def test_write_segment_round_trip(tmp_path):
+    days = {"01": b'{"id":"a"}\n{"id":"b"}\n', "02": b"   \n", "03": '{"id":"c","d":"中文"}\n'.encode("utf-8")}
+    path = str(tmp_path / "01.seg")
+    footer = write_segment(path, "2026-01", days)
+
+    assert read_footer(path) == footer
+    assert sorted(footer["days"]) == ["01", "03"]
+    assert footer["days"]["01"]["count"] == 2
+    assert read_all_days(path) == {"01": days["01"], "03": days["03"]}
+
+
+def test_archive_then_update_unarchives_the_day(recorder, create_record):
+    create_record("lifelog", "a1", timestamp="2025-03-04T10:00:00+08:00", description="march")
+    create_record("lifelog", "a2", timestamp="2025-03-05T10:00:00+08:00", description="march again")
+    create_record("lifelog", "b1", timestamp="2025-04-01T10:00:00+08:00", description="april")
+
+    archived = recorder("--record-type", "archive")
+    root = record_jsonl.get_lifelog_root()
+    assert sorted(archived) == sorted(list_segments(root))
+    assert not os.path.exists(os.path.join(root, "2025", "03"))
+
+    assert record_jsonl.find_record_by_id("lifelog", "a2")[1]["description"] == "march again"
+    lines = recorder("--record-type", "query", "--target-type", "lifelog", "--since", "2025-03-01",
+                     "--until", "2025-03-31", "--fields", "id")
+    assert [json.loads(line)["id"] for line in lines] == ["a1", "a2"]
+
+    recorder("--record-type", "update", "--target-type", "lifelog", "--id", "a1", "--key", "status",
+             "--value", "doing")
+    day_path = os.path.join(root, "2025", "03", "04.jsonl")
+    path, record = record_jsonl.find_record_by_id("lifelog", "a1")
+    assert (path, record["status"]) == (day_path, "doing")
+    assert sorted(read_footer(os.path.join(root, "2025", "03.seg"))["days"]) == ["05"]
+
+
+def test_partly_archived_month_is_read_in_day_order(recorder, create_record):
+    create_record("lifelog", "m1", timestamp="2025-03-04T10:00:00+08:00", description="first")
+    create_record("lifelog", "m2", timestamp="2025-03-05T10:00:00+08:00", description="second")
+    recorder("--record-type", "archive")
+    # Updating the later day moves it back out of 03.seg into 03/05.jsonl.
+    recorder("--record-type", "update", "--target-type", "lifelog", "--id", "m2", "--key", "status",
+             "--value", "done")
+
+    lines = recorder("--record-type", "query", "--target-type", "lifelog", "--fields", "id")
+    assert [json.loads(line)["id"] for line in lines] == ["m1", "m2"]
+    lines = recorder("--record-type", "query", "--target-type", "lifelog", "--fields", "id", "--limit", "1")
+    assert [json.loads(line)["id"] for line in lines] == ["m1"]
@@ -0,0 +1,48 @@
+import json
+import os
+
+import pytest
+
+import record_jsonl
+from record_index import read_line_at
+
+
+def test_lookup_reads_record_at_indexed_offset(create_record):
+    create_record("tasks", "t1", title="first")
+    create_record("tasks", "t2", title="second")
+
+    entry = record_jsonl.get_record_index("tasks").lookup("t2")
+    assert entry is not None
+    assert read_line_at(*entry)["title"] == "second"
+
+
+def test_update_resolves_through_index(recorder, create_record):
+    create_record("tasks", "t1", title="first")
+    recorder("--record-type", "update", "--target-type", "tasks", "--id", "t1", "--key", "status", "--value", "done")
+
+    path, record = record_jsonl.find_record_by_id("tasks", "t1")
+    assert path == record_jsonl.get_record_path("tasks")
+    assert record["status"] == "done"
+
+
+def test_external_rewrite_invalidates_offsets(create_record):
+    create_record("tasks", "t1", title="first")
+    create_record("tasks", "t2", title="second")
+    record_jsonl.get_record_index("tasks").lookup("t2")
+
+    path = record_jsonl.get_record_path("tasks")
+    with open(path, "r", encoding="utf-8") as f:
+        lines = f.read().splitlines()
+    rewritten = json.loads(lines[1])
+    rewritten["title"] = "second, edited elsewhere"
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(json.dumps(rewritten, ensure_ascii=False) + "\n")
+
+    assert record_jsonl.find_record_by_id("tasks", "t2")[1]["title"] == "second, edited elsewhere"
+
+
+def test_missing_id_is_reported(create_record):
+    create_record("tasks", "t1", title="first")
+    with pytest.raises(SystemExit, match="record id not found"):
+        record_jsonl.find_record_by_id("tasks", "nope")
+    assert os.path.exists(os.path.join("workspace", "records", "tasks", ".index", "ids.sqlite"))
@@ -0,0 +1,72 @@
+import json
+import os
+
+import record_jsonl
+from record_mirror import AnalyticsMirror
+
+
+TASKS = os.path.join("workspace", "records", "tasks", "tasks.jsonl")
+
+
+def mirror_titles() -> tuple[dict, dict]:
+    mirror = AnalyticsMirror(record_jsonl.get_mirror_path())
+    try:
+        stats = mirror.sync("tasks", [TASKS])
+        rows = dict(mirror.connect().execute("SELECT id, title FROM records").fetchall())
+    finally:
+        mirror.close()
+    return rows, stats
+
+
+def test_sync_after_compaction_and_append(recorder):
+    recorder("--record-type", "tasks", "--id", "t1", "--title", "one")
+    recorder("--record-type", "tasks", "--id", "t2", "--title", "two")
+    mirror_titles()
+
+    recorder("--record-type", "delete", "--target-type", "tasks", "--id", "t2", "--write-mode", "patch")
+    recorder("--record-type", "compact", "--force")
+    recorder("--record-type", "tasks", "--id", "t3", "--title", "three " * 20)
+
+    rows, stats = mirror_titles()
+    assert sorted(rows) == ["t1", "t3"]
+    assert stats["full"] == 1
+
+
+def test_mirror_follows_tombstone_and_recreate_incrementally(recorder):
+    mirror = AnalyticsMirror(record_jsonl.get_mirror_path())
+    try:
+        recorder("--record-type", "tasks", "--id", "t1", "--title", "original")
+        mirror.sync("tasks", [TASKS])
+        recorder("--record-type", "delete", "--target-type", "tasks", "--id", "t1", "--write-mode", "patch")
+        mirror.sync("tasks", [TASKS])
+        assert mirror.connect().execute("SELECT COUNT(*) FROM records").fetchone()[0] == 0
+
+        recorder("--record-type", "tasks", "--id", "t1", "--title", "re-created")
+        mirror.sync("tasks", [TASKS])
+        rows = mirror.connect().execute("SELECT id, title FROM records").fetchall()
+    finally:
+        mirror.close()
+    assert rows == [("t1", "re-created")]
+
+
+def test_inplace_rewrite_past_watermark_is_not_treated_as_append(workspace):
+    # The first line alone fills the head window, so only the bytes before the watermark reveal the rewrite.
+    lines = [{"id": "t1", "type": "tasks", "title": "x" * 5000}, {"id": "t2", "type": "tasks", "title": "two"},
+             {"id": "t3", "type": "tasks", "title": "three"}]
+    os.makedirs(os.path.dirname(TASKS), exist_ok=True)
+    with open(TASKS, "w", encoding="utf-8") as f:
+        f.writelines(json.dumps(line) + "\n" for line in lines)
+    mirror_titles()
+    inode = os.stat(TASKS).st_ino
+
+    lines = [lines[0], {"id": "t3", "type": "tasks", "title": "three, compacted"},
+             {"id": "t4", "type": "tasks", "title": "four " * 20}]
+    with open(TASKS, "r+", encoding="utf-8") as f:
+        f.truncate()
+        f.writelines(json.dumps(line) + "\n" for line in lines)
+    assert os.stat(TASKS).st_ino == inode
+
+    rows, stats = mirror_titles()
+    assert sorted(rows) == ["t1", "t3", "t4"]
+    assert rows["t3"] == "three, compacted"
+    assert stats["full"] == 1
@@ -0,0 +1,118 @@
+import json
+import os
+
+import pytest
+
+import record_jsonl
+import record_patches
+from record_mirror import AnalyticsMirror
+from record_patches import apply_patches, get_patch_path, load_patches, patch_record
+
+
+TASKS = os.path.join("workspace", "records", "tasks", "tasks.jsonl")
+
+
+def query_ids(recorder, *extra: str) -> list[str]:
+    lines = recorder("--record-type", "query", "--target-type", "tasks", "--fields", "id,status", *extra)
+    return [json.loads(line)["id"] for line in lines]
+
+
+def patch_mode(recorder, *argv: str) -> None:
+    recorder(*argv, "--target-type", "tasks", "--write-mode", "patch")
+
+
+def test_update_appends_patch_and_compaction_folds_it(recorder):
+    recorder("--record-type", "tasks", "--id", "t1", "--title", "first")
+    patch_mode(recorder, "--record-type", "update", "--id", "t1", "--key", "status", "--value", "done")
+
+    ops = load_patches(TASKS)
+    assert [(op["op"], op["set"]) for op in ops] == [("patch", {"status": "done"})]
+    assert ops[0]["end"] == os.path.getsize(TASKS)
+    assert record_jsonl.find_record_by_id("tasks", "t1")[1]["status"] == "done"
+
+    recorder("--record-type", "compact", "--force")
+    assert not os.path.exists(get_patch_path(TASKS))
+    with open(TASKS, encoding="utf-8") as f:
+        assert json.loads(f.readline())["status"] == "done"
+
+
+def test_tombstone_hides_only_earlier_lines(recorder):
+    recorder("--record-type", "tasks", "--id", "t1", "--title", "original")
+    recorder("--record-type", "tasks", "--id", "t2", "--title", "other")
+    patch_mode(recorder, "--record-type", "delete", "--id", "t1")
+
+    with pytest.raises(SystemExit, match="record id not found"):
+        record_jsonl.find_record_by_id("tasks", "t1")
+    assert query_ids(recorder) == ["t2"]
+
+    recorder("--record-type", "tasks", "--id", "t1", "--title", "re-created")
+
+    assert record_jsonl.find_record_by_id("tasks", "t1")[1]["title"] == "re-created"
+    assert sorted(query_ids(recorder)) == ["t1", "t2"]
+    assert sorted(query_ids(recorder, "--where", "status=todo")) == ["t1", "t2"]
+
+    mirror = AnalyticsMirror(record_jsonl.get_mirror_path())
+    try:
+        mirror.sync("tasks", [TASKS])
+        rows = mirror.connect().execute("SELECT id, title FROM records ORDER BY id").fetchall()
+    finally:
+        mirror.close()
+    assert rows == [("t1", "re-created"), ("t2", "other")]
+
+    recorder("--record-type", "compact", "--force")
+    with open(TASKS, encoding="utf-8") as f:
+        titles = [json.loads(line)["title"] for line in f]
+    assert titles == ["other", "re-created"]
+
+
+def test_patch_before_recreate_does_not_touch_new_record(recorder):
+    recorder("--record-type", "tasks", "--id", "t1", "--title", "original")
+    patch_mode(recorder, "--record-type", "delete", "--id", "t1")
+    recorder("--record-type", "tasks", "--id", "t1", "--title", "re-created")
+    patch_mode(recorder, "--record-type", "update", "--id", "t1", "--key", "status", "--value", "doing")
+
+    record = record_jsonl.find_record_by_id("tasks", "t1")[1]
+    assert (record["title"], record["status"]) == ("re-created", "doing")
+
+
+def test_ops_without_end_reach_every_line():
+    legacy = [{"op": "delete", "id": "a"}]
+    scoped = [{"op": "delete", "id": "a", "end": 10}]
+    assert patch_record({"id": "a"}, legacy, 50) is None
+    assert patch_record({"id": "a"}, scoped, 50) == {"id": "a"}
+    assert patch_record({"id": "a"}, scoped, 0) is None
+
+    records = [
+        {"raw": "", "data": {"id": "a", "v": 1}, "dirty": False, "offset": 0},
+        {"raw": "", "data": {"id": "a", "v": 2}, "dirty": False, "offset": 20},
+    ]
+    kept = apply_patches(records, scoped)
+    assert [item["data"]["v"] for item in kept] == [2]
+
+
+def test_auto_compaction_runs_inline_by_default(recorder, monkeypatch):
+    monkeypatch.delenv("LIFEKERNEL_RECORDER_AUTO_COMPACT")
+    monkeypatch.setattr(record_patches, "COMPACT_MIN_BYTES", 1)
+    recorder("--record-type", "tasks", "--id", "t1", "--title", "x")
+    patch_mode(recorder, "--record-type", "update", "--id", "t1", "--key", "status", "--value", "done")
+
+    assert not os.path.exists(get_patch_path(TASKS))
+    assert record_jsonl.find_record_by_id("tasks", "t1")[1]["status"] == "done"
+
+
+def test_inline_compaction_failure_is_reported(recorder, monkeypatch, capsys):
+    monkeypatch.setenv("LIFEKERNEL_RECORDER_AUTO_COMPACT", "inline")
+    monkeypatch.setattr(record_patches, "COMPACT_MIN_BYTES", 1)
+
+    def broken(path):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(record_jsonl, "compact_records", broken)
+    recorder("--record-type", "tasks", "--id", "t1", "--title", "x")
+    # Called directly: the recorder fixture would swallow stderr along with stdout.
+    record_jsonl.run_command(record_jsonl.build_parser().parse_args([
+        "--record-type", "update", "--target-type", "tasks", "--id", "t1", "--key", "status",
+        "--value", "done", "--write-mode", "patch",
+    ]))
+    assert "auto compaction" in capsys.readouterr().err
+    assert record_jsonl.find_record_by_id("tasks", "t1")[1]["status"] == "done"
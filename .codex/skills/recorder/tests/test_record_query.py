@@ -0,0 +1,45 @@
+import json
+
+import pytest
+
+from record_query import iter_lifelog_partitions, parse_bound, partition_day
+
+
+def query_ids(recorder, *bounds: str) -> list[str]:
+    lines = recorder("--record-type", "query", "--target-type", "lifelog", "--fields", "id", "--sort", "timestamp",
+                     *bounds)
+    return [json.loads(line)["id"] for line in lines]
+
+
+def test_timestamp_bounds_reach_records_in_other_timezones(recorder, create_record):
+    # 2026-10-02T01:00Z, stored in 10/01
+    create_record("lifelog", "early", description="early", timestamp="2026-10-01T20:00:00-05:00")
+    # 2026-10-02T04:30Z, stored in 10/01
+    create_record("lifelog", "inside", description="inside", timestamp="2026-10-01T23:30:00-05:00")
+    # 2026-10-02T15:30Z, stored in 10/03
+    create_record("lifelog", "late", description="late", timestamp="2026-10-03T00:30:00+09:00")
+    # 2026-10-02T23:00Z, stored in 10/03
+    create_record("lifelog", "after", description="after", timestamp="2026-10-03T08:00:00+09:00")
+
+    bounds = ("--since", "2026-10-02T03:00:00+00:00", "--until", "2026-10-02T20:00:00+00:00")
+    assert query_ids(recorder, *bounds) == ["inside", "late"]
+
+
+def test_date_bounds_use_the_record_local_date(recorder, create_record):
+    create_record("lifelog", "a", description="a", timestamp="2026-10-01T23:30:00-05:00")
+    create_record("lifelog", "b", description="b", timestamp="2026-10-02T00:30:00+09:00")
+    assert query_ids(recorder, "--since", "2026-10-02", "--until", "2026-10-02") == ["b"]
+
+
+def test_pruning_window_covers_every_offset(workspace):
+    since = parse_bound("2026-10-02T00:30:00+14:00")
+    until = parse_bound("2026-10-02T23:30:00-12:00")
+    assert partition_day(since, False) == "2026-09-30"
+    assert partition_day(until, True) == "2026-10-04"
+    assert partition_day(parse_bound("2026-10-02"), False) == "2026-10-02"
+    assert list(iter_lifelog_partitions("missing", since, until)) == []
+
+
+def test_invalid_bound_is_rejected():
+    with pytest.raises(SystemExit, match="invalid date"):
+        parse_bound("2026-13-01")
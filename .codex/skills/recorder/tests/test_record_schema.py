@@ -0,0 +1,29 @@
+import json
+import os
+
+import pytest
+
+import record_schema
+from record_schema import SCHEMA_PATH, ValidationFailed, load_schema, validate_record
+
+
+def test_validators_follow_schema_file_changes(workspace):
+    schema = load_schema()
+    task = {"id": "t1", "type": "tasks", "timestamp": "2026-10-01T09:00:00+08:00", "source": "conversation",
+            "content": "x", "title": "x", "status": "todo", "priority": "P2"}
+    validate_record(task, "tasks", schema)
+
+    with open(SCHEMA_PATH, encoding="utf-8") as f:
+        raw = json.load(f)
+    raw["types"]["tasks"]["required"] = list(raw["types"]["tasks"].get("required", [])) + ["owner"]
+    with open(SCHEMA_PATH, "w", encoding="utf-8") as f:
+        json.dump(raw, f)
+    st = os.stat(SCHEMA_PATH)
+    os.utime(SCHEMA_PATH, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+
+    updated = load_schema()
+    with pytest.raises(ValidationFailed, match="owner"):
+        validate_record(task, "tasks", updated)
+    assert len(record_schema._compiled) == 1
+    # A schema object that is not the loaded one is compiled on its own, never matched by identity.
+    validate_record(task, "tasks", schema)
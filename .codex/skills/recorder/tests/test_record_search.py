@@ -0,0 +1,45 @@
+import json
+import os
+
+import record_jsonl
+
+
+SHARD = os.path.join("workspace", "records", "knowledge", "search.json")
+
+
+def test_search_ranks_and_shard_carries_card_fields(recorder, create_record):
+    create_record("knowledge", "k1", title="目录列表", tags="test", solution="windows 目录列表 反斜杠")
+    create_record("knowledge", "k2", title="unrelated", tags="test", solution="something else entirely")
+
+    lines = recorder("--record-type", "search", "--text", "目录 反斜杠", "--target-type", "knowledge", "--fields", "id")
+    assert [json.loads(line)["id"] for line in lines] == ["k1"]
+
+    with open(SHARD, encoding="utf-8") as f:
+        shard = json.load(f)
+    assert sorted(shard["ids"]) == ["k1", "k2"]
+    assert shard["source"]["bytes"] == os.path.getsize(record_jsonl.get_record_path("knowledge"))
+    position = shard["terms"]["反斜"][0]
+    assert shard["ids"][position] == "k1"
+    doc = shard["docs"][position]
+    assert (doc["title"], doc["solution"], doc["tags"]) == ("目录列表", "windows 目录列表 反斜杠", ["test"])
+
+
+def test_writes_refresh_shard(recorder, create_record):
+    create_record("knowledge", "k1", title="first", tags="test", solution="alpha")
+    with open(SHARD, encoding="utf-8") as f:
+        shard = json.load(f)
+    assert shard["ids"] == ["k1"]
+    assert record_jsonl.find_record_by_id("knowledge", "k1")[1]["content"]
+    assert "content" not in shard["docs"][0]
+
+    create_record("knowledge", "k2", title="second", tags="test", solution="beta")
+    recorder("--record-type", "update", "--target-type", "knowledge", "--id", "k1", "--key", "title",
+             "--value", "renamed")
+    with open(SHARD, encoding="utf-8") as f:
+        shard = json.load(f)
+    titles = dict(zip(shard["ids"], (doc["title"] for doc in shard["docs"])))
+    assert titles == {"k1": "renamed", "k2": "second"}
+    assert shard["source"]["bytes"] == os.path.getsize(record_jsonl.get_record_path("knowledge"))
+
+    lines = recorder("--record-type", "sync", "--target-type", "knowledge")
+    assert SHARD not in json.loads(lines[-1])["exported"]
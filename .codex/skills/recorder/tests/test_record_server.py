@@ -0,0 +1,107 @@
+import json
+import os
+import socket
+import sys
+import threading
+
+import pytest
+
+import record_client
+import record_jsonl
+import record_server
+
+
+@pytest.fixture
+def service(workspace):
+    if not hasattr(socket, "AF_UNIX"):
+        pytest.skip("unix sockets are not available")
+    address = "unix:" + os.path.join("workspace", "records", ".recorder.sock")
+    server = record_server.build_server(address)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield address
+    server.shutdown()
+    server.server_close()
+    # Run the pending idle export now, while the temporary workspace is still the working directory.
+    server.state.flush_exports()
+
+
+def test_round_trip_create_and_get(service):
+    responses = record_client.run_commands(
+        [
+            {"op": "create", "record_type": "tasks", "id": "t1", "title": "via service"},
+            {"op": "get", "target_type": "tasks", "id": "t1"},
+        ],
+        service,
+    )
+    assert [r["ok"] for r in responses] == [True, True]
+    assert responses[1]["record"]["title"] == "via service"
+
+
+def test_unexpected_exception_is_answered(service, monkeypatch):
+    def broken(*args, **kwargs):
+        raise OSError(28, "No space left on device")
+
+    monkeypatch.setattr(record_jsonl, "append_jsonl", broken)
+    responses = record_client.run_commands(
+        [
+            {"op": "create", "record_type": "tasks", "id": "t1", "title": "will fail"},
+            {"op": "ping"},
+        ],
+        service,
+    )
+    assert responses[0]["ok"] is False
+    assert responses[0]["error"].startswith("OSError")
+    assert responses[1] == {"ok": True, "op": "ping"}
+
+
+def test_execute_command_reports_key_errors(workspace, monkeypatch):
+    def broken(*args, **kwargs):
+        raise KeyError("status")
+
+    monkeypatch.setattr(record_jsonl, "build_records", broken)
+    result = record_jsonl.execute_command(
+        {"op": "create", "record_type": "tasks", "title": "x"}, record_jsonl.load_schema()
+    )
+    assert result == {"ok": False, "error": "KeyError: 'status'"}
+
+
+def test_lost_responses_are_not_replayed_locally(workspace, monkeypatch):
+    monkeypatch.setattr(record_client, "send_commands", lambda commands, address=None: [{"ok": True}])
+    monkeypatch.setattr(record_jsonl, "execute_command", lambda command, schema: pytest.fail("replayed"))
+    responses = record_client.run_commands([{"op": "ping"}, {"op": "create", "record_type": "tasks"}])
+    assert responses[0] == {"ok": True}
+    assert responses[1]["ok"] is False
+
+
+def test_service_honours_fsync_per_command(service, monkeypatch):
+    seen = []
+    monkeypatch.setattr(record_jsonl, "commit_appends", lambda path, end, lock_dir=None: seen.append(
+        record_jsonl.is_durable()))
+    responses = record_client.run_commands(
+        [
+            {"op": "create", "record_type": "tasks", "title": "durable", "fsync": True},
+            {"op": "create", "record_type": "tasks", "title": "plain"},
+        ],
+        service,
+    )
+    assert [r["ok"] for r in responses] == [True, True]
+    assert seen == [True, False]
+
+
+def test_service_rejects_profile_field(service):
+    response = record_client.run_commands(
+        [{"op": "create", "record_type": "tasks", "title": "x", "profile": "trace"}], service
+    )[0]
+    assert response["ok"] is False
+    assert "--profile" in response["error"]
+
+
+def test_client_runs_profile_commands_locally(workspace, monkeypatch, capsys):
+    monkeypatch.setattr(record_client, "send_commands", lambda *a, **k: pytest.fail("sent to service"))
+    monkeypatch.setattr(sys, "argv", ["record_client.py", "--record-type", "tasks", "--title", "t", "--profile"])
+    record_client.main()
+    monkeypatch.setattr(sys, "argv", ["record_client.py", "--record-type", "profile"])
+    record_client.main()
+    summary = json.loads(capsys.readouterr().out.splitlines()[-1])
+    assert summary["command"] == "tasks"
@@ -0,0 +1,48 @@
+import json
+import os
+
+import record_jsonl
+import record_server
+
+
+TASKS_DIR = os.path.join("workspace", "records", "tasks")
+
+
+def read_export(name: str) -> dict:
+    with open(os.path.join(TASKS_DIR, name), encoding="utf-8") as f:
+        return json.load(f)
+
+
+def test_writes_update_rollup_and_leave_lists_to_sync(recorder):
+    recorder("--record-type", "tasks", "--id", "t1", "--title", "open")
+    assert read_export("rollup.json")["total"] == 1
+    recorder("--record-type", "tasks", "--id", "t2", "--title", "finished")
+    recorder("--record-type", "update", "--target-type", "tasks", "--id", "t2", "--key", "status", "--value", "done")
+    rollup = read_export("rollup.json")
+    status = rollup["dims"].index("status")
+    assert sorted(cell[status] for cell in rollup["cells"]) == ["done", "todo"]
+    assert not os.path.exists(os.path.join(TASKS_DIR, "snapshot.json"))
+
+    lines = recorder("--record-type", "sync", "--target-type", "tasks")
+    assert os.path.join(TASKS_DIR, "snapshot.json") in json.loads(lines[-1])["exported"]
+
+    snapshot = read_export("snapshot.json")
+    assert [t["id"] for t in snapshot["tasks"]] == ["t1"]
+    assert snapshot["counts"] == {"todo": 1, "done": 1}
+    assert snapshot["source"]["bytes"] == os.path.getsize(record_jsonl.get_record_path("tasks"))
+    assert [t["id"] for t in read_export("history.json")["tasks"]] == ["t2"]
+    assert read_export("rollup.json")["total"] == 2
+
+    lines = recorder("--record-type", "sync", "--target-type", "tasks")
+    assert json.loads(lines[-1])["exported"] == []
+
+
+def test_service_flushes_exports_when_idle(workspace):
+    state = record_server.RecorderState(export_delay=60)
+    result = state.handle({"op": "create", "record_type": "tasks", "id": "t1", "title": "via service"})
+    assert result["ok"] and state._export_timer is not None
+    assert not os.path.exists(os.path.join(TASKS_DIR, "snapshot.json"))
+
+    state.flush_exports()
+    assert state._export_timer is None
+    assert [t["id"] for t in read_export("snapshot.json")["tasks"]] == ["t1"]
@@ -1,15 +1,21 @@
 import argparse
 import asyncio
 import json
+import os
 from typing import Dict, List
 
 from src.agents import AgentSpec
+from src.cache import DEFAULT_MAX_BYTES, DEFAULT_MAX_ENTRIES, CachingProvider, ResponseCache
+from src.http_provider import HttpProvider
 from src.orchestrator import ManualProvider, MockProvider, Orchestrator
+from src.pipeline import parse_pipeline
+from src.pool import ProviderPool
+from src.storage import read_json
+from src.tools import CACHE_DIR
 
 
 def _load_config(path: str) -> Dict[str, object]:
-    with open(path, "r", encoding="utf-8") as f:
-        return json.load(f)
+    return read_json(path)
 
 
 def _build_agents(raw_agents: List[Dict[str, object]]) -> List[AgentSpec]:
@@ -26,24 +32,71 @@ def _build_agents(raw_agents: List[Dict[str, object]]) -> List[AgentSpec]:
     return agents
 
 
-def _build_provider(cfg: Dict[str, object]):
+def _build_provider(cfg: Dict[str, object], no_cache: bool = False):
     provider_type = str(cfg.get("type", "mock"))
     if provider_type == "manual":
-        return ManualProvider()
-    seed = int(cfg.get("seed", 7))
-    return MockProvider(seed=seed)
+        provider = ManualProvider()
+    elif provider_type == "http":
+        provider = HttpProvider(
+            url=str(cfg.get("url", "http://127.0.0.1:8765/generate")),
+            timeout=float(cfg.get("timeout", 60)),
+            headers={str(k): str(v) for k, v in dict(cfg.get("headers") or {}).items()},
+        )
+    else:
+        seed = int(cfg.get("seed", 7))
+        provider = MockProvider(
+            seed=seed,
+            chunk_size=int(cfg.get("chunk_size", 8)),
+            chunk_delay=float(cfg.get("chunk_delay", 0.0)),
+        )
+    if "pool" in cfg or provider_type == "http":
+        provider = _build_pool(provider, dict(cfg.get("pool") or {}))
+    cache_cfg = dict(cfg.get("cache") or {})
+    if not cache_cfg.get("enabled", False):
+        return provider
+    ttl = cache_cfg.get("ttl")
+    max_bytes = cache_cfg.get("max_bytes", DEFAULT_MAX_BYTES)
+    max_entries = cache_cfg.get("max_entries", DEFAULT_MAX_ENTRIES)
+    cache = ResponseCache(
+        str(cache_cfg.get("dir") or os.path.join(CACHE_DIR, "responses")),
+        ttl=float(ttl) if ttl else None,
+        max_bytes=int(max_bytes) if max_bytes else None,
+        max_entries=int(max_entries) if max_entries else None,
+    )
+    settings = {key: value for key, value in cfg.items() if key not in ("cache", "pool")}
+    return CachingProvider(provider, cache, settings=settings, bypass=no_cache)
+
+
+def _build_pool(provider, cfg: Dict[str, object]) -> ProviderPool:
+    rate = cfg.get("rate")
+    burst = cfg.get("burst")
+    budget = cfg.get("token_budget")
+    return ProviderPool(
+        provider,
+        max_in_flight=int(cfg.get("max_in_flight", 4)),
+        rate=float(rate) if rate else None,
+        burst=float(burst) if burst else None,
+        retries=int(cfg.get("retries", 3)),
+        backoff=float(cfg.get("backoff", 0.5)),
+        max_backoff=float(cfg.get("max_backoff", 8.0)),
+        token_budget=int(budget) if budget else None,
+    )
 
 
 def main() -> None:
     parser = argparse.ArgumentParser(description="Deep Research Orchestrator")
     parser.add_argument("--config", required=True, help="Path to config.json")
+    parser.add_argument(
+        "--no-cache", action="store_true", help="Skip cached provider responses (fresh ones are still stored)"
+    )
     args = parser.parse_args()
 
     config = _load_config(args.config)
     agents = _build_agents(config.get("agents", []))
-    provider = _build_provider(config.get("provider", {}))
+    provider = _build_provider(config.get("provider", {}), no_cache=args.no_cache)
     output_dir = str(config.get("output_dir", "workspace/lab/deep_research/outputs"))
     run_id = str(config.get("run_id", "")).strip() or None
+    pipeline_cfg = dict(config.get("pipeline") or {})
 
     orchestrator = Orchestrator(
         topic=str(config.get("topic")),
@@ -52,6 +105,9 @@ def main() -> None:
         tools_config=config.get("tools", {}),
         output_dir=output_dir,
         run_id=run_id,
+        pipeline=parse_pipeline(pipeline_cfg.get("nodes")),
+        max_concurrency=int(pipeline_cfg.get("max_concurrency", 4)),
+        stream=bool(config.get("stream", True)),
     )
 
     result = asyncio.run(orchestrator.run())
@@ -0,0 +1,198 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import time
+from dataclasses import asdict
+from typing import Any, AsyncIterator, Dict, List, Optional, Union
+
+from .agents import AgentSpec
+from .codec import dumps, loads
+from .orchestrator import BaseProvider
+
+CACHE_VERSION = 2
+DEFAULT_MAX_BYTES = 64 << 20
+DEFAULT_MAX_ENTRIES = 5000
+
+
+def cache_key(
+    agent: AgentSpec,
+    prompt: str,
+    context: Optional[Dict[str, str]],
+    settings: Dict[str, object],
+    mode: str = "generate",
+) -> str:
+    # generate may return a structured dict while stream always yields text, so the two never share an entry.
+    payload = {
+        "version": CACHE_VERSION,
+        "mode": mode,
+        "agent": asdict(agent),
+        "prompt": prompt,
+        "context": context or {},
+        "provider": settings,
+    }
+    return hashlib.sha256(dumps(payload, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """One JSON file per key; file mtime doubles as the LRU clock, touched on every hit.
+
+    Size and entry count are walked once and then kept as running totals, so only a put that crosses a limit
+    walks the directory again to evict.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        ttl: Optional[float] = None,
+        max_bytes: Optional[int] = DEFAULT_MAX_BYTES,
+        max_entries: Optional[int] = DEFAULT_MAX_ENTRIES,
+    ) -> None:
+        self.directory = directory
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self._usage: Optional[List[int]] = None
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], f"{key}.json")
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                entry = loads(f.read())
+        except (OSError, ValueError):
+            return None
+        if not isinstance(entry, dict) or "response" not in entry:
+            return None
+        if self.ttl is not None and time.time() - float(entry.get("created_at", 0)) > self.ttl:
+            self._remove(path)
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return entry
+
+    def put(self, key: str, response: Union[str, Dict[str, object]]) -> None:
+        path = self._path(key)
+        usage = self._current_usage()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(dumps({"created_at": time.time(), "response": response}))
+        replaced = self._size(path)
+        os.replace(tmp, path)
+        usage[0] += (self._size(path) or 0) - (replaced or 0)
+        if replaced is None:
+            usage[1] += 1
+        if self._over_limit(*usage):
+            self.evict()
+
+    def _current_usage(self) -> List[int]:
+        if self._usage is None:
+            entries = self._entries()
+            self._usage = [sum(size for _, size, _ in entries), len(entries)]
+        return self._usage
+
+    def _over_limit(self, total: int, count: int) -> bool:
+        over_bytes = self.max_bytes is not None and total > self.max_bytes
+        over_count = self.max_entries is not None and count > self.max_entries
+        return over_bytes or over_count
+
+    def _size(self, path: str) -> Optional[int]:
+        try:
+            return os.stat(path).st_size
+        except OSError:
+            return None
+
+    def _entries(self) -> List[tuple]:
+        entries = []
+        for dirpath, _, filenames in os.walk(self.directory):
+            for filename in filenames:
+                if not filename.endswith(".json"):
+                    continue
+                path = os.path.join(dirpath, filename)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, path))
+        return entries
+
+    def evict(self) -> int:
+        # A fresh walk also picks up entries written by other processes sharing the directory.
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for _, size, path in entries:
+            if not self._over_limit(total, len(entries) - removed):
+                break
+            self._remove(path)
+            total -= size
+            removed += 1
+        self._usage = [total, len(entries) - removed]
+        return removed
+
+    def _remove(self, path: str) -> None:
+        size = self._size(path)
+        try:
+            os.remove(path)
+        except OSError:
+            return
+        if self._usage is not None and size is not None:
+            self._usage[0] -= size
+            self._usage[1] -= 1
+
+
+class CachingProvider(BaseProvider):
+    """Wraps a provider with a content-addressed response cache.
+
+    bypass skips lookups but still stores fresh responses, so a forced rerun refreshes the cache.
+    """
+
+    def __init__(
+        self,
+        provider: BaseProvider,
+        cache: ResponseCache,
+        settings: Optional[Dict[str, object]] = None,
+        bypass: bool = False,
+    ) -> None:
+        self.provider = provider
+        self.cache = cache
+        self.settings = settings or {}
+        self.bypass = bypass
+        self.hits = 0
+        self.misses = 0
+
+    async def generate(
+        self, prompt: str, agent: AgentSpec, context: Optional[Dict[str, str]] = None
+    ) -> Union[str, Dict[str, object]]:
+        key = cache_key(agent, prompt, context, self.settings, "generate")
+        if not self.bypass:
+            entry = self.cache.get(key)
+            if entry is not None:
+                self.hits += 1
+                return entry["response"]
+        self.misses += 1
+        response = await self.provider.generate(prompt, agent, context)
+        self.cache.put(key, response)
+        return response
+
+    async def stream(
+        self, prompt: str, agent: AgentSpec, context: Optional[Dict[str, str]] = None
+    ) -> AsyncIterator[str]:
+        key = cache_key(agent, prompt, context, self.settings, "stream")
+        if not self.bypass:
+            entry = self.cache.get(key)
+            if entry is not None:
+                self.hits += 1
+                yield str(entry["response"])
+                return
+        self.misses += 1
+        chunks: List[str] = []
+        async for chunk in self.provider.stream(prompt, agent, context):
+            chunks.append(chunk)
+            yield chunk
+        self.cache.put(key, "".join(chunks))
@@ -0,0 +1,26 @@
+from __future__ import annotations
+
+import json
+from typing import Any, Optional
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+BACKEND = "orjson" if orjson is not None else "json"
+
+
+def loads(data: Any) -> Any:
+    if orjson is not None:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            pass
+    return json.loads(data)
+
+
+def dumps(data: Any, indent: Optional[int] = None, sort_keys: bool = False) -> str:
+    # Encoding stays on stdlib so outputs stay byte-identical regardless of the installed backend.
+    return json.dumps(data, ensure_ascii=False, indent=indent, sort_keys=sort_keys)
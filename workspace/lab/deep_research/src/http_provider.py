@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+import asyncio
+import socket
+import urllib.error
+import urllib.request
+from typing import Dict, Optional, Union
+
+from .agents import AgentSpec
+from .codec import dumps, loads
+from .orchestrator import BaseProvider
+from .pool import ProviderError
+
+RETRYABLE_STATUS = {408, 429, 500, 502, 503, 504}
+
+
+class HttpProvider(BaseProvider):
+    """POSTs {prompt, agent, max_tokens, context} as JSON and reads back {"content": ...}."""
+
+    def __init__(self, url: str, timeout: float = 60.0, headers: Optional[Dict[str, str]] = None) -> None:
+        self.url = url
+        self.timeout = timeout
+        self.headers = headers or {}
+
+    async def generate(
+        self, prompt: str, agent: AgentSpec, context: Optional[Dict[str, str]] = None
+    ) -> Union[str, Dict[str, object]]:
+        body = {
+            "prompt": prompt,
+            "agent": agent.name,
+            "role": agent.role,
+            "max_tokens": agent.max_tokens,
+            "context": context or {},
+        }
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self._post, body)
+
+    def _post(self, body: Dict[str, object]) -> Union[str, Dict[str, object]]:
+        request = urllib.request.Request(
+            self.url,
+            data=dumps(body).encode("utf-8"),
+            headers={"Content-Type": "application/json", **self.headers},
+            method="POST",
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                payload = loads(response.read())
+        except urllib.error.HTTPError as exc:
+            retry_after = exc.headers.get("Retry-After") if exc.headers else None
+            raise ProviderError(
+                f"HTTP {exc.code} from {self.url}",
+                retryable=exc.code in RETRYABLE_STATUS,
+                retry_after=float(retry_after) if retry_after else None,
+            ) from exc
+        except (urllib.error.URLError, socket.timeout, ConnectionError) as exc:
+            raise ProviderError(f"request to {self.url} failed: {exc}", retryable=True) from exc
+        except ValueError as exc:
+            raise ProviderError(f"invalid JSON from {self.url}") from exc
+        if not isinstance(payload, dict) or "content" not in payload:
+            raise ProviderError(f"response from {self.url} has no content")
+        return payload["content"]
@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+import argparse
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+
+from .codec import dumps, loads
+
+
+class MockLLMServer(ThreadingHTTPServer):
+    """Local stand-in for an LLM backend with injectable latency, failures and a concurrency limit."""
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        address: tuple,
+        latency: float = 0.2,
+        jitter: float = 0.1,
+        error_rate: float = 0.0,
+        rate_limit_rate: float = 0.0,
+        max_concurrent: Optional[int] = None,
+        retry_after: float = 0.2,
+        seed: Optional[int] = None,
+    ) -> None:
+        super().__init__(address, MockLLMHandler)
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.max_concurrent = max_concurrent
+        self.retry_after = retry_after
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.counts: Dict[str, int] = {"ok": 0, "error": 0, "rate_limited": 0}
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/generate"
+
+    def roll(self) -> float:
+        with self.lock:
+            return self.random.random()
+
+
+class MockLLMHandler(BaseHTTPRequestHandler):
+    server: MockLLMServer
+
+    def log_message(self, format: str, *args: object) -> None:
+        pass
+
+    def do_POST(self) -> None:
+        server = self.server
+        length = int(self.headers.get("Content-Length") or 0)
+        try:
+            body = loads(self.rfile.read(length))
+        except ValueError:
+            self._send(400, {"error": "invalid json"})
+            return
+        with server.lock:
+            server.in_flight += 1
+            server.peak_in_flight = max(server.peak_in_flight, server.in_flight)
+            over_limit = server.max_concurrent is not None and server.in_flight > server.max_concurrent
+        try:
+            if over_limit or server.roll() < server.rate_limit_rate:
+                self._count("rate_limited")
+                self._send(429, {"error": "rate limited"}, {"Retry-After": str(server.retry_after)})
+                return
+            time.sleep(max(0.0, server.latency + (server.roll() * 2 - 1) * server.jitter))
+            if server.roll() < server.error_rate:
+                self._count("error")
+                self._send(503, {"error": "injected failure"})
+                return
+            self._count("ok")
+            self._send(200, {"content": _content(body)})
+        finally:
+            with server.lock:
+                server.in_flight -= 1
+
+    def _count(self, key: str) -> None:
+        with self.server.lock:
+            self.server.counts[key] += 1
+
+    def _send(self, status: int, payload: Dict[str, object], headers: Optional[Dict[str, str]] = None) -> None:
+        data = dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+
+def _content(body: Dict[str, object]) -> str:
+    agent = str(body.get("agent", ""))
+    if agent == "planner":
+        return "\n".join(
+            [
+                "- 现有能力与目标之间的差距是什么？",
+                "- 需要哪些最小工程能力？",
+                "- 主要风险与替代方案有哪些？",
+            ]
+        )
+    prompt = str(body.get("prompt", ""))
+    text = f"[{agent}] 已处理 {len(prompt)} 字符的输入。"
+    # Honour max_tokens roughly (one character per token) so budget accounting has something to check.
+    return text[: max(int(body.get("max_tokens") or len(text)), 1)]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Mock LLM HTTP server for provider pool testing")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.2, help="seconds per request")
+    parser.add_argument("--jitter", type=float, default=0.1, help="+/- seconds added to latency")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="probability of a 503")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="probability of a 429")
+    parser.add_argument("--max-concurrent", type=int, default=None, help="429 beyond this many in-flight requests")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+    server = MockLLMServer(
+        (args.host, args.port),
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        max_concurrent=args.max_concurrent,
+        seed=args.seed,
+    )
+    print(f"mock LLM server on {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
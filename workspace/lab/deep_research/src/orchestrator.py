@@ -3,17 +3,18 @@ from __future__ import annotations
 import asyncio
 import json
 from dataclasses import asdict
-from typing import Dict, List, Optional, Sequence, Tuple, Union
+from typing import AsyncIterator, Dict, List, Optional, Sequence, Tuple, Union
 
 from .agents import AgentResult, AgentSpec, Finding, ResearchPlan
+from .pipeline import PipelineNode, parse_pipeline, run_pipeline
 from .prompts import (
     COUNTERPOINT_PROMPT,
     EVIDENCE_PROMPT,
     PLANNER_PROMPT,
     SYNTHESIS_PROMPT,
 )
-from .storage import write_json, write_report
-from .tools import ToolResult, build_tools
+from .storage import ReportWriter, append_text, write_json, write_report, write_text
+from .tools import ToolResult, build_async_tools
 from .utils import make_run_id, utc_now_iso
 
 
@@ -23,10 +24,18 @@ class BaseProvider:
     ) -> Union[str, Dict[str, object]]:
         raise NotImplementedError
 
+    async def stream(
+        self, prompt: str, agent: AgentSpec, context: Optional[Dict[str, str]] = None
+    ) -> AsyncIterator[str]:
+        """Text chunks whose concatenation equals str(generate(...)); providers without streaming yield once."""
+        yield str(await self.generate(prompt, agent, context))
+
 
 class MockProvider(BaseProvider):
-    def __init__(self, seed: int = 7) -> None:
+    def __init__(self, seed: int = 7, chunk_size: int = 8, chunk_delay: float = 0.0) -> None:
         self.seed = seed
+        self.chunk_size = max(1, chunk_size)
+        self.chunk_delay = chunk_delay
 
     async def generate(
         self, prompt: str, agent: AgentSpec, context: Optional[Dict[str, str]] = None
@@ -47,21 +56,34 @@ class MockProvider(BaseProvider):
             return "识别出编排层与多智能体运行时缺失等关键不足。"
         return "报告已按概览/发现/不足/建议输出。"
 
+    async def stream(
+        self, prompt: str, agent: AgentSpec, context: Optional[Dict[str, str]] = None
+    ) -> AsyncIterator[str]:
+        text = str(await self.generate(prompt, agent, context))
+        for start in range(0, len(text), self.chunk_size):
+            await asyncio.sleep(self.chunk_delay)
+            yield text[start : start + self.chunk_size]
+
 
 class ManualProvider(BaseProvider):
     async def generate(
         self, prompt: str, agent: AgentSpec, context: Optional[Dict[str, str]] = None
     ) -> Union[str, Dict[str, object]]:
+        return "".join([chunk async for chunk in self.stream(prompt, agent, context)])
+
+    async def stream(
+        self, prompt: str, agent: AgentSpec, context: Optional[Dict[str, str]] = None
+    ) -> AsyncIterator[str]:
         print(f"\n=== {agent.name} ({agent.role}) ===\n")
         print(prompt)
         print("\n请输入该 agent 的输出，输入空行结束：")
-        lines: List[str] = []
+        first = True
         while True:
             line = input()
             if not line.strip():
                 break
-            lines.append(line)
-        return "\n".join(lines)
+            yield line if first else "\n" + line
+            first = False
 
 
 class Orchestrator:
@@ -73,24 +95,36 @@ class Orchestrator:
         tools_config: Dict[str, Dict[str, object]],
         output_dir: str,
         run_id: Optional[str] = None,
+        pipeline: Optional[Sequence[PipelineNode]] = None,
+        max_concurrency: int = 4,
+        stream: bool = True,
     ) -> None:
         self.topic = topic
         self.agents = {agent.name: agent for agent in agents}
         self.provider = provider
-        self.tools = build_tools(tools_config)
+        self.tools = build_async_tools(tools_config)
         self.output_dir = output_dir
         self.run_id = run_id or make_run_id("deep-research")
+        self.pipeline = list(pipeline) if pipeline else parse_pipeline(None)
+        self.max_concurrency = max(1, max_concurrency)
+        self.stream = stream
+        self._limit: Optional[asyncio.Semaphore] = None
+        self._report: Optional[ReportWriter] = None
+
+    @property
+    def base_dir(self) -> str:
+        return f"{self.output_dir}/{self.run_id}"
 
     async def run(self) -> Dict[str, object]:
-        plan = await self._build_plan()
-        tool_results = self._collect_materials(plan)
-        evidence_task = asyncio.create_task(self._run_agent("evidence", plan, tool_results))
-        counter_task = asyncio.create_task(
-            self._run_agent("counterpoint", plan, tool_results)
-        )
-        evidence, counterpoint = await asyncio.gather(evidence_task, counter_task)
-        findings = self._build_findings(plan, evidence, counterpoint, tool_results)
-        synthesis = await self._run_synthesis(plan, findings)
+        self._limit = asyncio.Semaphore(self.max_concurrency)
+        if self.stream:
+            self._report = ReportWriter(f"{self.base_dir}/report.md", REPORT_SLOTS)
+        outputs = await run_pipeline(self.pipeline, self._execute)
+        plan = self._outputs_of("plan", outputs)[0]
+        tool_results = [r for results in self._outputs_of("materials", outputs) for r in results]
+        agent_results = self._outputs_of("agent", outputs)
+        findings, synthesis = self._outputs_of("synthesis", outputs)[0]
+        counterpoint = next((r for r in agent_results if r.agent == "counterpoint"), None)
         report_sections = self._assemble_report(plan, findings, synthesis, counterpoint)
         self._persist(plan, tool_results, findings, synthesis, report_sections)
         return {
@@ -100,12 +134,70 @@ class Orchestrator:
             "synthesis": synthesis.to_dict(),
         }
 
-    async def _build_plan(self) -> ResearchPlan:
-        planner = self.agents.get("planner")
+    def _outputs_of(self, kind: str, outputs: Dict[str, object]) -> List:
+        return [outputs[node.name] for node in self.pipeline if node.kind == kind and node.name in outputs]
+
+    async def _execute(self, node: PipelineNode, inputs: Dict[str, object]) -> object:
+        if node.kind == "plan":
+            plan = await self._build_plan(node.agent or "planner")
+            if self._report is not None:
+                self._report.update("overview", _overview_md(plan))
+                self._report.update("questions", _questions_md(plan), force=True)
+            return plan
+        if node.kind == "materials":
+            return await self._collect_materials(self.topic)
+        plan = self._outputs_of("plan", inputs)[0]
+        tool_results = [r for results in self._outputs_of("materials", inputs) for r in results]
+        if node.kind == "agent":
+            if node.fan_out == "questions" and plan.questions:
+                return await self._run_fan_out(node.agent, plan, tool_results, node.name)
+            slot = "gaps" if node.agent == "counterpoint" else None
+            return await self._run_agent(node.agent, plan, plan.questions, tool_results, node.name, slot)
+        findings = self._build_findings(self._outputs_of("agent", inputs), tool_results)
+        if self._report is not None:
+            self._report.update("findings", _findings_md(findings), force=True)
+        synthesis = await self._run_synthesis(node.agent or "synthesizer", plan, findings, node.name)
+        return findings, synthesis
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        if self._limit is None:
+            self._limit = asyncio.Semaphore(self.max_concurrency)
+        return self._limit
+
+    async def _generate(
+        self, prompt: str, agent: AgentSpec, context: Optional[Dict[str, str]] = None
+    ) -> Union[str, Dict[str, object]]:
+        async with self._semaphore():
+            return await self.provider.generate(prompt, agent, context)
+
+    async def _complete(
+        self,
+        prompt: str,
+        agent: AgentSpec,
+        context: Dict[str, str],
+        label: str,
+        slot: Optional[str] = None,
+    ) -> str:
+        """Text output of one agent call; when streaming, mirrored to agents/<label>.md and the report slot live."""
+        if not self.stream:
+            return str(await self._generate(prompt, agent, context))
+        path = f"{self.base_dir}/agents/{label}.md"
+        write_text(path, "")
+        chunks: List[str] = []
+        async with self._semaphore():
+            async for chunk in self.provider.stream(prompt, agent, context):
+                chunks.append(chunk)
+                append_text(path, chunk)
+                if slot is not None and self._report is not None:
+                    self._report.update(slot, REPORT_HEADINGS[slot] + "".join(chunks))
+        return "".join(chunks)
+
+    async def _build_plan(self, name: str = "planner") -> ResearchPlan:
+        planner = self.agents.get(name)
         if planner is None:
-            raise ValueError("planner agent not configured")
+            raise ValueError(f"{name} agent not configured")
         prompt = PLANNER_PROMPT.format(topic=self.topic)
-        raw = await self.provider.generate(prompt, planner, {"topic": self.topic})
+        raw = await self._generate(prompt, planner, {"topic": self.topic})
         if isinstance(raw, dict):
             questions = [str(q) for q in raw.get("questions", [])]
             scope = str(raw.get("scope", ""))
@@ -116,37 +208,60 @@ class Orchestrator:
             exclusions = []
         return ResearchPlan(topic=self.topic, questions=questions, scope=scope, exclusions=exclusions)
 
-    def _collect_materials(self, plan: ResearchPlan) -> List[ToolResult]:
+    async def _collect_materials(self, topic: str) -> List[ToolResult]:
         results: List[ToolResult] = []
         if "local_search" in self.tools:
-            for query in _keywords_from_topic(plan.topic):
-                results.append(self.tools["local_search"].run(query))
+            results.extend(await self.tools["local_search"].run_many(_keywords_from_topic(topic)))
         return results
 
     async def _run_agent(
-        self, name: str, plan: ResearchPlan, tool_results: List[ToolResult]
+        self,
+        name: str,
+        plan: ResearchPlan,
+        questions: List[str],
+        tool_results: List[ToolResult],
+        label: Optional[str] = None,
+        slot: Optional[str] = None,
     ) -> AgentResult:
         agent = self.agents.get(name)
         if agent is None:
             raise ValueError(f"agent {name} not configured")
         prompt = EVIDENCE_PROMPT if name == "evidence" else COUNTERPOINT_PROMPT
-        rendered = prompt.format(topic=plan.topic, questions="; ".join(plan.questions))
+        rendered = prompt.format(topic=plan.topic, questions="; ".join(questions))
         if tool_results:
             rendered += f"\n\n本地材料：{_tool_summary(tool_results)}"
-        raw = await self.provider.generate(rendered, agent, {"topic": plan.topic})
+        content = await self._complete(rendered, agent, {"topic": plan.topic}, label or name, slot)
         return AgentResult(
             agent=agent.name,
             role=agent.role,
             goal=agent.goal,
-            content=str(raw),
+            content=content,
+        )
+
+    async def _run_fan_out(
+        self, name: str, plan: ResearchPlan, tool_results: List[ToolResult], label: Optional[str] = None
+    ) -> AgentResult:
+        parts = await asyncio.gather(
+            *[
+                self._run_agent(name, plan, [question], tool_results, f"{label or name}.q{index}")
+                for index, question in enumerate(plan.questions, start=1)
+            ]
+        )
+        first = parts[0]
+        return AgentResult(
+            agent=first.agent,
+            role=first.role,
+            goal=first.goal,
+            content="\n\n".join(f"### {q}\n{part.content}" for q, part in zip(plan.questions, parts)),
+            metadata={
+                "fan_out": [
+                    {"question": q, "content": part.content} for q, part in zip(plan.questions, parts)
+                ]
+            },
         )
 
     def _build_findings(
-        self,
-        plan: ResearchPlan,
-        evidence: AgentResult,
-        counterpoint: AgentResult,
-        tool_results: List[ToolResult],
+        self, agent_results: List[AgentResult], tool_results: List[ToolResult]
     ) -> List[Finding]:
         findings: List[Finding] = []
         findings.append(
@@ -157,38 +272,46 @@ class Orchestrator:
                 confidence="medium",
             )
         )
-        findings.append(
-            Finding(
-                title="工程化最小能力",
-                summary="需要任务分解、并行执行、汇总写作与可追溯产出。",
-                evidence=[evidence.content],
-                confidence="medium",
-            )
-        )
-        findings.append(
-            Finding(
-                title="主要不足",
-                summary=counterpoint.content,
-                evidence=[],
-                confidence="low",
-            )
-        )
+        for result in agent_results:
+            if result.agent == "evidence":
+                parts = result.metadata.get("fan_out")
+                findings.append(
+                    Finding(
+                        title="工程化最小能力",
+                        summary="需要任务分解、并行执行、汇总写作与可追溯产出。",
+                        evidence=[f"{p['question']}：{p['content']}" for p in parts] if parts else [result.content],
+                        confidence="medium",
+                    )
+                )
+            elif result.agent == "counterpoint":
+                findings.append(
+                    Finding(
+                        title="主要不足",
+                        summary=result.content,
+                        evidence=[],
+                        confidence="low",
+                    )
+                )
+            else:
+                findings.append(Finding(title=result.role, summary=result.content))
         return findings
 
-    async def _run_synthesis(self, plan: ResearchPlan, findings: List[Finding]) -> AgentResult:
-        agent = self.agents.get("synthesizer")
+    async def _run_synthesis(
+        self, name: str, plan: ResearchPlan, findings: List[Finding], label: Optional[str] = None
+    ) -> AgentResult:
+        agent = self.agents.get(name)
         if agent is None:
-            raise ValueError("synthesizer agent not configured")
+            raise ValueError(f"{name} agent not configured")
         materials = json.dumps([f.to_dict() for f in findings], ensure_ascii=False, indent=2)
         prompt = SYNTHESIS_PROMPT.format(
             topic=plan.topic, questions="; ".join(plan.questions), materials=materials
         )
-        raw = await self.provider.generate(prompt, agent, {"topic": plan.topic})
+        content = await self._complete(prompt, agent, {"topic": plan.topic}, label or name, "synthesis")
         return AgentResult(
             agent=agent.name,
             role=agent.role,
             goal=agent.goal,
-            content=str(raw),
+            content=content,
         )
 
     def _assemble_report(
@@ -196,20 +319,11 @@ class Orchestrator:
         plan: ResearchPlan,
         findings: List[Finding],
         synthesis: AgentResult,
-        counterpoint: AgentResult,
+        counterpoint: Optional[AgentResult],
     ) -> List[str]:
-        overview = (
-            f"# 研究报告\n\n"
-            f"主题：{plan.topic}\n\n"
-            f"范围：{plan.scope}\n"
-        )
-        questions = "\n".join([f"- {q}" for q in plan.questions])
-        findings_md = "\n".join(
-            [f"## {f.title}\n{f.summary}" for f in findings]
-        )
-        gaps = f"## 主要不足\n{counterpoint.content}"
-        synthesis_md = f"## 综合结论\n{synthesis.content}"
-        return [overview, "## 研究问题\n" + questions, findings_md, gaps, synthesis_md]
+        gaps = REPORT_HEADINGS["gaps"] + counterpoint.content if counterpoint is not None else ""
+        synthesis_md = REPORT_HEADINGS["synthesis"] + synthesis.content
+        return [_overview_md(plan), _questions_md(plan), _findings_md(findings), gaps, synthesis_md]
 
     def _persist(
         self,
@@ -219,7 +333,7 @@ class Orchestrator:
         synthesis: AgentResult,
         report_sections: List[str],
     ) -> None:
-        base = f"{self.output_dir}/{self.run_id}"
+        base = self.base_dir
         write_json(f"{base}/plan.json", plan.to_dict())
         write_json(
             f"{base}/materials.json",
@@ -240,6 +354,26 @@ class Orchestrator:
         write_report(f"{base}/report.md", report_sections)
 
 
+REPORT_SLOTS = ("overview", "questions", "findings", "gaps", "synthesis")
+REPORT_HEADINGS = {"gaps": "## 主要不足\n", "synthesis": "## 综合结论\n"}
+
+
+def _overview_md(plan: ResearchPlan) -> str:
+    return (
+        f"# 研究报告\n\n"
+        f"主题：{plan.topic}\n\n"
+        f"范围：{plan.scope}\n"
+    )
+
+
+def _questions_md(plan: ResearchPlan) -> str:
+    return "## 研究问题\n" + "\n".join([f"- {q}" for q in plan.questions])
+
+
+def _findings_md(findings: List[Finding]) -> str:
+    return "\n".join([f"## {f.title}\n{f.summary}" for f in findings])
+
+
 def _parse_bullets(text: str) -> List[str]:
     lines = [line.strip("- ").strip() for line in text.splitlines() if line.strip()]
     return [line for line in lines if len(line) > 2]
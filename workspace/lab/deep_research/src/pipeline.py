@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Set
+
+NODE_KINDS = ("plan", "materials", "agent", "synthesis")
+FAN_OUT_MODES = ("questions",)
+
+DEFAULT_PIPELINE: List[Dict[str, object]] = [
+    {"name": "plan", "kind": "plan", "agent": "planner"},
+    {"name": "materials", "kind": "materials"},
+    {"name": "evidence", "kind": "agent", "agent": "evidence", "after": ["plan", "materials"], "fan_out": "questions"},
+    {"name": "counterpoint", "kind": "agent", "agent": "counterpoint", "after": ["plan", "materials"]},
+    {"name": "synthesis", "kind": "synthesis", "agent": "synthesizer", "after": ["evidence", "counterpoint"]},
+]
+
+
+@dataclass
+class PipelineNode:
+    name: str
+    kind: str
+    agent: Optional[str] = None
+    after: List[str] = field(default_factory=list)
+    fan_out: Optional[str] = None
+
+
+def parse_pipeline(raw_nodes: Optional[Sequence[Dict[str, object]]]) -> List[PipelineNode]:
+    nodes: List[PipelineNode] = []
+    for raw in raw_nodes or DEFAULT_PIPELINE:
+        name = str(raw.get("name") or "")
+        kind = str(raw.get("kind", "agent"))
+        if not name:
+            raise ValueError("pipeline node without a name")
+        if kind not in NODE_KINDS:
+            raise ValueError(f"pipeline node {name}: unknown kind {kind}")
+        fan_out = raw.get("fan_out")
+        if fan_out is not None and (kind != "agent" or fan_out not in FAN_OUT_MODES):
+            raise ValueError(f"pipeline node {name}: unsupported fan_out {fan_out}")
+        agent = raw.get("agent")
+        nodes.append(
+            PipelineNode(
+                name=name,
+                kind=kind,
+                agent=str(agent) if agent else (None if kind == "materials" else name),
+                after=[str(dep) for dep in raw.get("after", [])],
+                fan_out=str(fan_out) if fan_out else None,
+            )
+        )
+    validate_pipeline(nodes)
+    return nodes
+
+
+def validate_pipeline(nodes: Sequence[PipelineNode]) -> None:
+    names = [node.name for node in nodes]
+    if len(set(names)) != len(names):
+        raise ValueError("pipeline node names must be unique")
+    for kind in ("plan", "synthesis"):
+        if sum(1 for node in nodes if node.kind == kind) != 1:
+            raise ValueError(f"pipeline needs exactly one {kind} node")
+    by_name = {node.name: node for node in nodes}
+    for node in nodes:
+        for dep in node.after:
+            if dep not in by_name:
+                raise ValueError(f"pipeline node {node.name} depends on unknown node {dep}")
+        lineage = ancestors(by_name, node)
+        if node.kind in ("agent", "synthesis") and "plan" not in {by_name[dep].kind for dep in lineage}:
+            raise ValueError(f"pipeline node {node.name} must run after the plan node")
+
+
+def ancestors(by_name: Dict[str, PipelineNode], node: PipelineNode) -> List[str]:
+    seen: List[str] = []
+    stack = list(node.after)
+    while stack:
+        name = stack.pop()
+        if name in seen:
+            continue
+        if name == node.name:
+            raise ValueError(f"pipeline cycle through {node.name}")
+        seen.append(name)
+        stack.extend(by_name[name].after)
+    return seen
+
+
+async def run_pipeline(
+    nodes: Sequence[PipelineNode],
+    execute: Callable[[PipelineNode, Dict[str, Any]], Awaitable[Any]],
+) -> Dict[str, Any]:
+    """Start every node as soon as all of its dependencies have finished.
+
+    execute receives the outputs of the node's transitive dependencies, keyed by node name.
+    """
+    by_name = {node.name: node for node in nodes}
+    lineage = {node.name: ancestors(by_name, node) for node in nodes}
+    outputs: Dict[str, Any] = {}
+    pending: Dict[asyncio.Task, str] = {}
+    waiting: Set[str] = set(by_name)
+
+    def launch() -> None:
+        for name in sorted(waiting):
+            if all(dep in outputs for dep in by_name[name].after):
+                waiting.discard(name)
+                inputs = {dep: outputs[dep] for dep in lineage[name]}
+                pending[asyncio.create_task(execute(by_name[name], inputs))] = name
+
+    try:
+        launch()
+        while pending:
+            done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                outputs[pending.pop(task)] = task.result()
+            launch()
+    finally:
+        for task in pending:
+            task.cancel()
+    return outputs
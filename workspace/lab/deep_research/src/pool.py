@@ -0,0 +1,189 @@
+from __future__ import annotations
+
+import asyncio
+import random
+import time
+from typing import AsyncIterator, Dict, List, Optional, Union
+
+from .agents import AgentSpec
+from .orchestrator import BaseProvider
+
+
+class ProviderError(Exception):
+    def __init__(self, message: str, retryable: bool = False, retry_after: Optional[float] = None) -> None:
+        super().__init__(message)
+        self.retryable = retryable
+        self.retry_after = retry_after
+
+
+class BudgetExceeded(ProviderError):
+    pass
+
+
+def estimate_tokens(value: object) -> int:
+    """Rough count: one token per non-ASCII character, one per four ASCII characters."""
+    text = value if isinstance(value, str) else str(value)
+    wide = sum(1 for ch in text if ord(ch) > 127)
+    return wide + (len(text) - wide + 3) // 4
+
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: Optional[float] = None) -> None:
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(rate, 1.0)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock: Optional[asyncio.Lock] = None
+
+    async def acquire(self) -> None:
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class ProviderPool(BaseProvider):
+    """Concurrency cap, rate limit, retries and a per-run token budget around one provider.
+
+    Each call reserves its prompt estimate plus agent.max_tokens against the budget before it starts and
+    settles to the estimated actual usage when it finishes; calls that do not fit wait for in-flight ones.
+    """
+
+    def __init__(
+        self,
+        provider: BaseProvider,
+        max_in_flight: int = 4,
+        rate: Optional[float] = None,
+        burst: Optional[float] = None,
+        retries: int = 3,
+        backoff: float = 0.5,
+        max_backoff: float = 8.0,
+        token_budget: Optional[int] = None,
+    ) -> None:
+        self.provider = provider
+        self.max_in_flight = max(1, max_in_flight)
+        self.bucket = TokenBucket(rate, burst) if rate else None
+        self.retries = max(0, retries)
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.token_budget = token_budget
+        self.tokens_used = 0
+        self.tokens_reserved = 0
+        self.calls = 0
+        self.retried = 0
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._budget: Optional[asyncio.Condition] = None
+
+    async def generate(
+        self, prompt: str, agent: AgentSpec, context: Optional[Dict[str, str]] = None
+    ) -> Union[str, Dict[str, object]]:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_in_flight)
+            self._budget = asyncio.Condition()
+        prompt_tokens = estimate_tokens(prompt)
+        reserved = prompt_tokens + agent.max_tokens
+        await self._reserve(reserved)
+        used = prompt_tokens
+        try:
+            async with self._semaphore:
+                response = await self._call(prompt, agent, context)
+            used = prompt_tokens + min(estimate_tokens(response), agent.max_tokens)
+            return response
+        finally:
+            await self._settle(reserved, used)
+
+    async def stream(
+        self, prompt: str, agent: AgentSpec, context: Optional[Dict[str, str]] = None
+    ) -> AsyncIterator[str]:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_in_flight)
+            self._budget = asyncio.Condition()
+        prompt_tokens = estimate_tokens(prompt)
+        reserved = prompt_tokens + agent.max_tokens
+        await self._reserve(reserved)
+        used = prompt_tokens
+        chunks: List[str] = []
+        try:
+            async with self._semaphore:
+                attempt = 0
+                while True:
+                    if self.bucket is not None:
+                        await self.bucket.acquire()
+                    self.calls += 1
+                    try:
+                        async for chunk in self.provider.stream(prompt, agent, context):
+                            chunks.append(chunk)
+                            yield chunk
+                        break
+                    except ProviderError as exc:
+                        # Chunks already handed out cannot be taken back, so only retry before the first one.
+                        if chunks or not exc.retryable or attempt >= self.retries:
+                            raise
+                        delay = self._delay(attempt, exc)
+                    attempt += 1
+                    self.retried += 1
+                    await asyncio.sleep(delay)
+            used = prompt_tokens + min(estimate_tokens("".join(chunks)), agent.max_tokens)
+        finally:
+            await self._settle(reserved, used)
+
+    async def _call(
+        self, prompt: str, agent: AgentSpec, context: Optional[Dict[str, str]]
+    ) -> Union[str, Dict[str, object]]:
+        attempt = 0
+        while True:
+            if self.bucket is not None:
+                await self.bucket.acquire()
+            self.calls += 1
+            try:
+                return await self.provider.generate(prompt, agent, context)
+            except ProviderError as exc:
+                if not exc.retryable or attempt >= self.retries:
+                    raise
+                delay = self._delay(attempt, exc)
+            attempt += 1
+            self.retried += 1
+            await asyncio.sleep(delay)
+
+    def _delay(self, attempt: int, exc: ProviderError) -> float:
+        delay = min(self.max_backoff, self.backoff * 2**attempt) * random.uniform(0.5, 1.0)
+        if exc.retry_after is not None:
+            delay = max(delay, exc.retry_after)
+        return delay
+
+    async def _reserve(self, amount: int) -> None:
+        if self.token_budget is None:
+            return
+        async with self._budget:
+            while self.tokens_used + self.tokens_reserved + amount > self.token_budget:
+                if self.tokens_reserved == 0:
+                    raise BudgetExceeded(
+                        f"token budget exhausted: {self.tokens_used} used, {amount} requested, "
+                        f"budget {self.token_budget}"
+                    )
+                await self._budget.wait()
+            self.tokens_reserved += amount
+
+    async def _settle(self, reserved: int, used: int) -> None:
+        if self.token_budget is None:
+            self.tokens_used += used
+            return
+        async with self._budget:
+            self.tokens_reserved -= reserved
+            self.tokens_used += used
+            self._budget.notify_all()
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            "calls": self.calls,
+            "retries": self.retried,
+            "tokens_used": self.tokens_used,
+            "token_budget": self.token_budget,
+        }
@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+import mmap
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError, as_completed
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, Iterator, Optional, Tuple, TypeVar, Union
+
+SNIFF_BYTES = 8192
+MMAP_THRESHOLD = 1 << 20
+
+T = TypeVar("T")
+
+
+def is_binary(head: bytes) -> bool:
+    return b"\0" in head
+
+
+@contextmanager
+def open_content(path: str, max_bytes: Optional[int] = None) -> Iterator[Optional[Union[bytes, mmap.mmap]]]:
+    """Yield the file as bytes (or a read-only mmap when large); None when binary or over max_bytes."""
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if max_bytes is not None and size > max_bytes:
+            yield None
+            return
+        head = f.read(SNIFF_BYTES)
+        if is_binary(head):
+            yield None
+            return
+        if size < MMAP_THRESHOLD:
+            yield head + f.read()
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            yield data
+
+
+def read_text(path: str, max_bytes: Optional[int] = None) -> Optional[str]:
+    with open_content(path, max_bytes) as data:
+        if data is None:
+            return None
+        return bytes(data).decode("utf-8", errors="ignore")
+
+
+def decode_window(data: Union[bytes, mmap.mmap], start: int, end: int, window: int = 80) -> str:
+    before = data[max(start - window * 4, 0) : start].decode("utf-8", errors="ignore")[-window:]
+    middle = data[start:end].decode("utf-8", errors="ignore")
+    after = data[end : end + window * 4].decode("utf-8", errors="ignore")[:window]
+    return (before + middle + after).replace("\n", " ").strip()
+
+
+def scan_parallel(
+    fn: Callable[[str], T],
+    paths: Iterable[str],
+    workers: Optional[int] = None,
+    time_budget: Optional[float] = None,
+) -> Tuple[Dict[str, T], bool]:
+    """Run fn over paths on a thread pool; stop collecting once time_budget seconds have passed."""
+    results: Dict[str, T] = {}
+    deadline = None if not time_budget else time.monotonic() + time_budget
+    pool = ThreadPoolExecutor(max_workers=workers)
+    futures = {pool.submit(fn, path): path for path in paths}
+    truncated = False
+    try:
+        timeout = None if deadline is None else max(deadline - time.monotonic(), 0)
+        for future in as_completed(futures, timeout=timeout):
+            results[futures[future]] = future.result()
+    except TimeoutError:
+        truncated = True
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+    return results, truncated
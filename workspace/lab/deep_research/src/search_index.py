@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+import os
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, List, Optional, Set, Tuple, Union
+
+from .scan import read_text
+
+INDEX_VERSION = "2"
+REFRESH_BATCH = 256
+
+
+def trigrams(text: str) -> Set[str]:
+    text = text.lower()
+    return {text[i : i + 3] for i in range(len(text) - 2)}
+
+
+def _file_grams(path: str, max_bytes: Optional[int]) -> Union[Set[str], None, bool]:
+    """Trigrams of the file, None when it is skipped (binary / too large), False when unreadable."""
+    try:
+        text = read_text(path, max_bytes)
+    except OSError:
+        return False
+    return None if text is None else trigrams(text)
+
+
+class TrigramIndex:
+    """Persistent trigram -> file postings, refreshed by (size, mtime_ns).
+
+    Binary and oversized files are remembered with indexed = 0 so they are not re-sniffed until they change.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def connect(self) -> sqlite3.Connection:
+        if self._conn is not None:
+            return self._conn
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        row = conn.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()
+        if row is None or row[0] != INDEX_VERSION:
+            conn.execute("DROP TABLE IF EXISTS files")
+            conn.execute("DROP TABLE IF EXISTS grams")
+            conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('version', ?)", (INDEX_VERSION,))
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS files "
+            "(id INTEGER PRIMARY KEY, path TEXT UNIQUE, size INTEGER, mtime_ns INTEGER, indexed INTEGER)"
+        )
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS grams (gram TEXT, file_id INTEGER, "
+            "PRIMARY KEY (gram, file_id)) WITHOUT ROWID"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS grams_file ON grams (file_id)")
+        conn.commit()
+        self._conn = conn
+        return conn
+
+    def close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def refresh(
+        self, paths: Iterable[str], workers: Optional[int] = None, max_bytes: Optional[int] = None
+    ) -> Tuple[int, int]:
+        conn = self.connect()
+        if conn.execute("SELECT value FROM meta WHERE key = 'max_file_bytes'").fetchone() != (str(max_bytes),):
+            # Skip decisions depend on the size limit, so a new limit re-examines every file.
+            with conn:
+                conn.execute("DELETE FROM grams")
+                conn.execute("DELETE FROM files")
+                conn.execute(
+                    "INSERT OR REPLACE INTO meta (key, value) VALUES ('max_file_bytes', ?)", (str(max_bytes),)
+                )
+        stored = {
+            row[0]: (row[1], row[2], row[3])
+            for row in conn.execute("SELECT path, id, size, mtime_ns FROM files")
+        }
+        seen: Set[str] = set()
+        stale: List[Tuple[str, os.stat_result]] = []
+        for path in paths:
+            seen.add(path)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            entry = stored.get(path)
+            if entry is None or (entry[1], entry[2]) != (st.st_size, st.st_mtime_ns):
+                stale.append((path, st))
+        changed = removed = 0
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for offset in range(0, len(stale), REFRESH_BATCH):
+                batch = stale[offset : offset + REFRESH_BATCH]
+                extracted = pool.map(lambda item: _file_grams(item[0], max_bytes), batch)
+                with conn:
+                    for (path, st), grams in zip(batch, extracted):
+                        if grams is False:
+                            continue
+                        self._store(conn, path, st, stored.get(path), grams)
+                        changed += 1
+        with conn:
+            for path in set(stored) - seen:
+                conn.execute("DELETE FROM grams WHERE file_id = ?", (stored[path][0],))
+                conn.execute("DELETE FROM files WHERE id = ?", (stored[path][0],))
+                removed += 1
+        return changed, removed
+
+    def _store(
+        self, conn: sqlite3.Connection, path: str, st: os.stat_result, entry: Optional[tuple], grams
+    ) -> None:
+        indexed = 0 if grams is None else 1
+        if entry is not None:
+            file_id = entry[0]
+            conn.execute("DELETE FROM grams WHERE file_id = ?", (file_id,))
+            conn.execute(
+                "UPDATE files SET size = ?, mtime_ns = ?, indexed = ? WHERE id = ?",
+                (st.st_size, st.st_mtime_ns, indexed, file_id),
+            )
+        else:
+            file_id = conn.execute(
+                "INSERT INTO files (path, size, mtime_ns, indexed) VALUES (?, ?, ?, ?)",
+                (path, st.st_size, st.st_mtime_ns, indexed),
+            ).lastrowid
+        if grams:
+            conn.executemany(
+                "INSERT INTO grams (gram, file_id) VALUES (?, ?)", ((gram, file_id) for gram in grams)
+            )
+
+    def candidates(self, query: str) -> List[str]:
+        grams = sorted(trigrams(query))
+        conn = self.connect()
+        if not grams:
+            return [row[0] for row in conn.execute("SELECT path FROM files WHERE indexed = 1 ORDER BY path")]
+        marks = ", ".join("?" for _ in grams)
+        rows = conn.execute(
+            f"SELECT path FROM files WHERE id IN (SELECT file_id FROM grams WHERE gram IN ({marks}) "
+            "GROUP BY file_id HAVING COUNT(*) = ?) ORDER BY path",
+            (*grams, len(grams)),
+        )
+        return [row[0] for row in rows]
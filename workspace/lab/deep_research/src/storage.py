@@ -1,8 +1,10 @@
 from __future__ import annotations
 
-import json
 import os
-from typing import Any, Dict, Iterable, List
+import time
+from typing import Any, Dict, Iterable, List, Sequence
+
+from .codec import dumps, loads
 
 
 def ensure_dir(path: str) -> None:
@@ -12,11 +14,51 @@ def ensure_dir(path: str) -> None:
 def write_json(path: str, data: Any) -> None:
     ensure_dir(os.path.dirname(path))
     with open(path, "w", encoding="utf-8") as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+        f.write(dumps(data, indent=2))
+
+
+def read_json(path: str) -> Any:
+    with open(path, "rb") as f:
+        return loads(f.read())
 
 
 def write_report(path: str, sections: Iterable[str]) -> None:
     ensure_dir(os.path.dirname(path))
     content = "\n\n".join([s for s in sections if s.strip()])
-    with open(path, "w", encoding="utf-8") as f:
+    # Replace atomically so anyone watching the report never reads a half-written file.
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
         f.write(content + "\n")
+    os.replace(tmp, path)
+
+
+def write_text(path: str, text: str) -> None:
+    ensure_dir(os.path.dirname(path))
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+
+
+def append_text(path: str, text: str) -> None:
+    ensure_dir(os.path.dirname(path))
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(text)
+
+
+class ReportWriter:
+    """Keeps named report sections in a fixed order and rewrites report.md at most every interval seconds."""
+
+    def __init__(self, path: str, slots: Sequence[str], interval: float = 0.2) -> None:
+        self.path = path
+        self.slots = list(slots)
+        self.interval = interval
+        self.sections: Dict[str, str] = {}
+        self._flushed = 0.0
+
+    def update(self, slot: str, text: str, force: bool = False) -> None:
+        self.sections[slot] = text
+        if force or time.monotonic() - self._flushed >= self.interval:
+            self.flush()
+
+    def flush(self) -> None:
+        write_report(self.path, [self.sections.get(slot, "") for slot in self.slots])
+        self._flushed = time.monotonic()
@@ -1,15 +1,26 @@
 from __future__ import annotations
 
+import asyncio
+import hashlib
 import os
 import re
+import threading
+import time
+from concurrent.futures import Executor
 from dataclasses import dataclass
-from typing import Dict, Iterable, List, Optional
+from typing import Dict, Iterable, List, Optional, Sequence, Set
+
+from .scan import decode_window, open_content, scan_parallel
+from .search_index import TrigramIndex
+
+CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".cache")
 
 
 @dataclass
 class ToolResult:
     tool: str
     items: List[Dict[str, str]]
+    truncated: bool = False
 
 
 class BaseTool:
@@ -18,16 +29,64 @@ class BaseTool:
     def run(self, query: str) -> ToolResult:
         raise NotImplementedError
 
+    def run_many(self, queries: Sequence[str]) -> List[ToolResult]:
+        return [self.run(query) for query in queries]
+
+
+class AsyncTool:
+    name = "base"
+
+    async def run(self, query: str) -> ToolResult:
+        return (await self.run_many([query]))[0]
+
+    async def run_many(self, queries: Sequence[str]) -> List[ToolResult]:
+        raise NotImplementedError
+
+
+class ExecutorTool(AsyncTool):
+    """Runs a sync BaseTool on an executor, at most max_concurrency calls at a time."""
+
+    def __init__(
+        self, tool: BaseTool, max_concurrency: int = 1, executor: Optional[Executor] = None
+    ) -> None:
+        self.tool = tool
+        self.name = tool.name
+        self.max_concurrency = max(1, max_concurrency)
+        self.executor = executor
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    async def run_many(self, queries: Sequence[str]) -> List[ToolResult]:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        async with self._semaphore:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.executor, self.tool.run_many, list(queries))
+
 
 class LocalSearchTool(BaseTool):
     name = "local_search"
 
     def __init__(
-        self, root: str, max_files: int = 200, ignore: Optional[List[str]] = None
+        self,
+        root: str,
+        max_files: Optional[int] = None,
+        ignore: Optional[List[str]] = None,
+        index_path: Optional[str] = None,
+        workers: Optional[int] = None,
+        max_file_bytes: Optional[int] = None,
+        time_budget: Optional[float] = None,
+        refresh_interval: float = 2.0,
     ) -> None:
         self.root = root
         self.max_files = max_files
         self.ignore = _normalize_ignores(root, ignore or [])
+        self.index = TrigramIndex(index_path or default_index_path(root))
+        self.workers = workers
+        self.max_file_bytes = max_file_bytes
+        self.time_budget = time_budget
+        self.refresh_interval = refresh_interval
+        self._refreshed_at: Optional[float] = None
+        self._refresh_lock = threading.Lock()
 
     def _iter_files(self) -> Iterable[str]:
         count = 0
@@ -42,40 +101,89 @@ class LocalSearchTool(BaseTool):
             for filename in filenames:
                 if filename.startswith("."):
                     continue
-                path = os.path.join(dirpath, filename)
-                yield path
+                yield os.path.join(dirpath, filename)
                 count += 1
-                if count >= self.max_files:
+                if self.max_files is not None and count >= self.max_files:
                     return
 
-    def run(self, query: str) -> ToolResult:
-        pattern = re.compile(re.escape(query), re.IGNORECASE)
-        items: List[Dict[str, str]] = []
-        for path in self._iter_files():
-            try:
-                with open(path, "r", encoding="utf-8", errors="ignore") as f:
-                    text = f.read()
-            except OSError:
-                continue
-            if not pattern.search(text):
-                continue
-            items.append(
-                {
-                    "path": path,
-                    "snippet": _extract_snippet(text, pattern),
-                }
-            )
-        return ToolResult(tool=self.name, items=items)
+    def refresh(self) -> None:
+        self.index.refresh(self._iter_files(), workers=self.workers, max_bytes=self.max_file_bytes)
+        self._refreshed_at = time.monotonic()
 
+    def _refresh_if_due(self) -> None:
+        # The size/mtime diff is cheap next to a query, but back-to-back batches within the interval share one pass.
+        with self._refresh_lock:
+            if self._refreshed_at is None or time.monotonic() - self._refreshed_at >= self.refresh_interval:
+                self.refresh()
 
-def _extract_snippet(text: str, pattern: re.Pattern, window: int = 80) -> str:
-    match = pattern.search(text)
-    if not match:
-        return ""
-    start = max(match.start() - window, 0)
-    end = min(match.end() + window, len(text))
-    snippet = text[start:end].replace("\n", " ").strip()
-    return snippet
+    def run(self, query: str) -> ToolResult:
+        return self.run_many([query])[0]
+
+    def run_many(self, queries: Sequence[str]) -> List[ToolResult]:
+        self._refresh_if_due()
+        unique = list(dict.fromkeys(queries))
+        patterns = [re.compile(_query_source(query), re.IGNORECASE) for query in unique]
+        combined = _combined_pattern(unique)
+        wanted: Dict[str, Set[int]] = {}
+        for slot, query in enumerate(unique):
+            for path in self.index.candidates(query):
+                wanted.setdefault(path, set()).add(slot)
+
+        def scan(path: str) -> Dict[int, str]:
+            try:
+                with open_content(path, self.max_file_bytes) as data:
+                    if data is None:
+                        return {}
+                    spans = _scan_spans(data, combined, wanted[path])
+                    for slot in wanted[path] - set(spans):
+                        # Alternation consumes overlapping matches (e.g. "work" inside "coworker"); confirm the rest directly.
+                        match = patterns[slot].search(data)
+                        if match:
+                            spans[slot] = match.span()
+                    return {slot: decode_window(data, start, end) for slot, (start, end) in spans.items()}
+            except (OSError, ValueError):
+                return {}
+
+        scanned, truncated = scan_parallel(scan, sorted(wanted), self.workers, self.time_budget)
+        hits: List[List[Dict[str, str]]] = [[] for _ in unique]
+        for path in sorted(scanned):
+            for slot, snippet in scanned[path].items():
+                hits[slot].append({"path": path, "snippet": snippet})
+        by_query = dict(zip(unique, hits))
+        return [
+            ToolResult(tool=self.name, items=list(by_query[query]), truncated=truncated)
+            for query in queries
+        ]
+
+
+def _query_source(query: str) -> bytes:
+    # Byte patterns only fold ASCII case; spell out the lower/upper forms for everything else.
+    forms = dict.fromkeys(form.encode("utf-8") for form in (query, query.lower(), query.upper()))
+    return b"|".join(re.escape(form) for form in forms)
+
+
+def _combined_pattern(queries: List[str]) -> Optional[re.Pattern]:
+    slots = [slot for slot, query in enumerate(queries) if query]
+    if not slots:
+        return None
+    slots.sort(key=lambda slot: len(queries[slot].encode("utf-8")), reverse=True)
+    return re.compile(
+        b"|".join(b"(?P<q%d>%s)" % (slot, _query_source(queries[slot])) for slot in slots),
+        re.IGNORECASE,
+    )
+
+
+def _scan_spans(data, combined: Optional[re.Pattern], slots: Set[int]) -> Dict[int, tuple]:
+    spans: Dict[int, tuple] = {}
+    if combined is None:
+        return spans
+    for match in combined.finditer(data):
+        slot = int(match.lastgroup[1:])
+        if slot in slots and slot not in spans:
+            spans[slot] = match.span()
+            if len(spans) == len(slots):
+                break
+    return spans
 
 
 def build_tools(config: Dict[str, Dict[str, object]]) -> Dict[str, BaseTool]:
@@ -84,10 +192,39 @@ def build_tools(config: Dict[str, Dict[str, object]]) -> Dict[str, BaseTool]:
     if local_cfg.get("enabled"):
         root = str(local_cfg.get("root", "."))
         ignore = [str(x) for x in local_cfg.get("ignore", [])]
-        tools["local_search"] = LocalSearchTool(root=root, ignore=ignore)
+        index_path = local_cfg.get("index_path")
+        workers = local_cfg.get("workers")
+        max_files = local_cfg.get("max_files")
+        # max_bytes is the key the Node orchestrator reads for the same limit.
+        max_file_bytes = local_cfg.get("max_file_bytes", local_cfg.get("max_bytes"))
+        time_budget = local_cfg.get("time_budget")
+        refresh_interval = local_cfg.get("refresh_interval", 2.0)
+        tools["local_search"] = LocalSearchTool(
+            root=root,
+            max_files=int(max_files) if max_files else None,
+            ignore=ignore,
+            index_path=str(index_path) if index_path else None,
+            workers=int(workers) if workers else None,
+            max_file_bytes=int(max_file_bytes) if max_file_bytes else None,
+            time_budget=float(time_budget) if time_budget else None,
+            refresh_interval=float(refresh_interval),
+        )
+    return tools
+
+
+def build_async_tools(config: Dict[str, Dict[str, object]]) -> Dict[str, AsyncTool]:
+    tools: Dict[str, AsyncTool] = {}
+    for name, tool in build_tools(config).items():
+        concurrency = config.get(name, {}).get("concurrency", 1)
+        tools[name] = ExecutorTool(tool, max_concurrency=int(concurrency))
     return tools
 
 
+def default_index_path(root: str) -> str:
+    key = hashlib.sha1(os.path.normcase(os.path.abspath(root)).encode("utf-8")).hexdigest()[:12]
+    return os.path.join(CACHE_DIR, f"local_search-{key}.sqlite")
+
+
 def _normalize_ignores(root: str, ignores: List[str]) -> List[str]:
     normalized: List[str] = []
     for item in ignores:
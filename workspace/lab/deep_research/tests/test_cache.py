@@ -0,0 +1,78 @@
+import asyncio
+import os
+
+from run import _build_provider
+from src.agents import AgentSpec
+from src.cache import CachingProvider, ResponseCache
+from src.orchestrator import BaseProvider
+
+
+AGENT = AgentSpec(name="evidence", role="researcher", goal="collect evidence")
+
+
+class CountingProvider(BaseProvider):
+    def __init__(self) -> None:
+        self.calls = 0
+
+    async def generate(self, prompt, agent, context=None):
+        self.calls += 1
+        return {"text": f"answer {self.calls}"}
+
+    async def stream(self, prompt, agent, context=None):
+        self.calls += 1
+        for chunk in ("streamed ", str(self.calls)):
+            yield chunk
+
+
+async def collect(stream) -> str:
+    return "".join([chunk async for chunk in stream])
+
+
+def test_hits_are_kept_apart_by_call_mode(tmp_path):
+    inner = CountingProvider()
+    provider = CachingProvider(inner, ResponseCache(str(tmp_path)))
+
+    first = asyncio.run(provider.generate("prompt", AGENT))
+    assert asyncio.run(provider.generate("prompt", AGENT)) == first == {"text": "answer 1"}
+    streamed = asyncio.run(collect(provider.stream("prompt", AGENT)))
+    assert streamed == "streamed 2"
+    assert asyncio.run(collect(provider.stream("prompt", AGENT))) == streamed
+    assert (inner.calls, provider.hits, provider.misses) == (2, 2, 2)
+
+
+def test_bypass_refreshes_entries(tmp_path):
+    inner = CountingProvider()
+    cache = ResponseCache(str(tmp_path))
+    asyncio.run(CachingProvider(inner, cache).generate("prompt", AGENT))
+    asyncio.run(CachingProvider(inner, cache, bypass=True).generate("prompt", AGENT))
+    assert asyncio.run(CachingProvider(inner, cache).generate("prompt", AGENT)) == {"text": "answer 2"}
+
+
+def test_eviction_drops_least_recently_used(tmp_path):
+    cache = ResponseCache(str(tmp_path), max_entries=2)
+    for n, key in enumerate(("aa1", "bb2")):
+        cache.put(key, f"value {n}")
+        os.utime(os.path.join(str(tmp_path), key[:2], f"{key}.json"), (n, n))
+    cache.get("aa1")
+    cache.put("cc3", "value 2")
+    assert [k for k in ("aa1", "bb2", "cc3") if cache.get(k) is not None] == ["aa1", "cc3"]
+
+
+def test_cache_is_opt_in(tmp_path):
+    assert not isinstance(_build_provider({"type": "mock"}), CachingProvider)
+    enabled = _build_provider({"type": "mock", "cache": {"enabled": True, "dir": str(tmp_path)}})
+    assert isinstance(enabled, CachingProvider)
+
+
+def test_puts_under_the_limits_walk_the_directory_once(tmp_path, monkeypatch):
+    walks = []
+    real_walk = os.walk
+    monkeypatch.setattr(os, "walk", lambda top: walks.append(top) or real_walk(top))
+    cache = ResponseCache(str(tmp_path), max_entries=3)
+    for key in ("aa1", "bb2", "cc3", "cc3"):
+        cache.put(key, "value")
+    assert len(walks) == 1
+
+    cache.put("dd4", "value")
+    assert len(walks) == 2
+    assert sum(cache.get(k) is not None for k in ("aa1", "bb2", "cc3", "dd4")) == 3
@@ -0,0 +1,77 @@
+import asyncio
+import os
+
+import pytest
+
+from src.agents import AgentSpec
+from src.orchestrator import MockProvider, Orchestrator
+from src.pipeline import parse_pipeline, run_pipeline
+
+
+def test_default_pipeline_parses():
+    nodes = {node.name: node for node in parse_pipeline(None)}
+    assert nodes["evidence"].fan_out == "questions"
+    assert nodes["synthesis"].after == ["evidence", "counterpoint"]
+
+
+@pytest.mark.parametrize(
+    "nodes, message",
+    [
+        ([{"name": "plan", "kind": "plan"}, {"name": "plan", "kind": "synthesis"}], "unique"),
+        ([{"name": "plan", "kind": "plan"}, {"name": "s", "kind": "synthesis", "after": ["x"]}], "unknown node"),
+        ([{"name": "plan", "kind": "plan"}, {"name": "s", "kind": "synthesis"}], "after the plan"),
+        (
+            [
+                {"name": "plan", "kind": "plan"},
+                {"name": "a", "kind": "agent", "after": ["plan", "b"]},
+                {"name": "b", "kind": "agent", "after": ["a"]},
+                {"name": "s", "kind": "synthesis", "after": ["a"]},
+            ],
+            "cycle",
+        ),
+        ([{"name": "plan", "kind": "plan"}, {"name": "m", "kind": "materials", "fan_out": "questions"}], "fan_out"),
+    ],
+)
+def test_invalid_pipelines_are_rejected(nodes, message):
+    with pytest.raises(ValueError, match=message):
+        parse_pipeline(nodes)
+
+
+def test_nodes_start_as_soon_as_their_dependencies_finish():
+    nodes = parse_pipeline(
+        [
+            {"name": "plan", "kind": "plan"},
+            {"name": "slow", "kind": "agent", "after": ["plan"]},
+            {"name": "fast", "kind": "agent", "after": ["plan"]},
+            {"name": "follow", "kind": "agent", "after": ["fast"]},
+            {"name": "synthesis", "kind": "synthesis", "after": ["slow", "follow"]},
+        ]
+    )
+    events = []
+
+    async def execute(node, inputs):
+        events.append(("start", node.name))
+        await asyncio.sleep(0.05 if node.name == "slow" else 0)
+        events.append(("end", node.name))
+        return sorted(inputs)
+
+    outputs = asyncio.run(run_pipeline(nodes, execute))
+    assert events.index(("start", "follow")) < events.index(("end", "slow"))
+    assert outputs["synthesis"] == ["fast", "follow", "plan", "slow"]
+
+
+def test_orchestrator_fans_out_per_question(tmp_path):
+    agents = [
+        AgentSpec(name=name, role=name, goal=name) for name in ("planner", "evidence", "counterpoint", "synthesizer")
+    ]
+    orchestrator = Orchestrator(
+        topic="multi-agent", agents=agents, provider=MockProvider(), tools_config={}, output_dir=str(tmp_path),
+        run_id="run",
+    )
+    result = asyncio.run(orchestrator.run())
+
+    questions = result["plan"]["questions"]
+    assert len(questions) == 3
+    evidence = next(f for f in result["findings"] if f["title"] == "工程化最小能力")
+    assert [line.split("：", 1)[0] for line in evidence["evidence"]] == questions
+    assert os.path.exists(os.path.join(str(tmp_path), "run", "report.md"))
@@ -0,0 +1,94 @@
+import asyncio
+
+import pytest
+
+from src.agents import AgentSpec
+from src.orchestrator import BaseProvider
+from src.pool import BudgetExceeded, ProviderError, ProviderPool
+
+
+AGENT = AgentSpec(name="evidence", role="researcher", goal="collect evidence", max_tokens=10)
+
+
+class FlakyProvider(BaseProvider):
+    def __init__(self, failures: int, retryable: bool = True, chunks=("a", "b")) -> None:
+        self.failures = failures
+        self.retryable = retryable
+        self.chunks = chunks
+        self.calls = 0
+        self.active = 0
+        self.peak = 0
+
+    async def generate(self, prompt, agent, context=None):
+        self.calls += 1
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            await asyncio.sleep(0.01)
+            if self.calls <= self.failures:
+                raise ProviderError("busy", retryable=self.retryable)
+            return "ok"
+        finally:
+            self.active -= 1
+
+    async def stream(self, prompt, agent, context=None):
+        self.calls += 1
+        for n, chunk in enumerate(self.chunks):
+            if self.calls <= self.failures and n == 1:
+                raise ProviderError("dropped", retryable=True)
+            yield chunk
+
+
+async def collect(stream) -> str:
+    return "".join([chunk async for chunk in stream])
+
+
+def test_retryable_errors_are_retried():
+    inner = FlakyProvider(failures=2)
+    pool = ProviderPool(inner, retries=3, backoff=0)
+    assert asyncio.run(pool.generate("prompt", AGENT)) == "ok"
+    assert pool.stats()["calls"] == 3 and pool.stats()["retries"] == 2
+
+
+def test_non_retryable_errors_surface_immediately():
+    inner = FlakyProvider(failures=1, retryable=False)
+    pool = ProviderPool(inner, retries=3, backoff=0)
+    with pytest.raises(ProviderError):
+        asyncio.run(pool.generate("prompt", AGENT))
+    assert inner.calls == 1
+
+
+def test_in_flight_calls_are_capped():
+    inner = FlakyProvider(failures=0)
+    pool = ProviderPool(inner, max_in_flight=2)
+
+    async def burst():
+        return await asyncio.gather(*(pool.generate(f"prompt {n}", AGENT) for n in range(6)))
+
+    assert asyncio.run(burst()) == ["ok"] * 6
+    assert inner.peak == 2
+
+
+def test_budget_waits_for_in_flight_then_fails_when_exhausted():
+    inner = FlakyProvider(failures=0)
+    # Each call reserves 2 prompt tokens + 10 max_tokens and settles to 3.
+    pool = ProviderPool(inner, token_budget=20)
+
+    async def run():
+        pair = await asyncio.gather(pool.generate("abcdefgh", AGENT), pool.generate("abcdefgh", AGENT))
+        assert (pair, inner.peak, pool.tokens_used) == (["ok", "ok"], 1, 6)
+        assert await pool.generate("abcdefgh", AGENT) == "ok"
+        assert pool.tokens_used == 9
+        # 9 used + 12 reserved no longer fits and nothing is in flight to free budget.
+        with pytest.raises(BudgetExceeded):
+            await pool.generate("abcdefgh", AGENT)
+
+    asyncio.run(run())
+    assert inner.calls == 3
+
+
+def test_stream_is_not_retried_after_first_chunk():
+    pool = ProviderPool(FlakyProvider(failures=1), retries=3, backoff=0)
+    with pytest.raises(ProviderError):
+        asyncio.run(collect(pool.stream("prompt", AGENT)))
+    assert pool.stats()["retries"] == 0
@@ -0,0 +1,47 @@
+import os
+
+from src.tools import LocalSearchTool, build_tools
+
+
+def make_tree(root, count: int = 3) -> None:
+    for n in range(count):
+        (root / f"note{n}.md").write_text(f"note {n}: needle in file {n}\n", encoding="utf-8")
+
+
+def test_run_many_returns_hits_per_query(tmp_path):
+    make_tree(tmp_path)
+    (tmp_path / "other.txt").write_text("Ünicode HAYSTACK\n", encoding="utf-8")
+    tool = LocalSearchTool(str(tmp_path), index_path=str(tmp_path / ".index.sqlite"))
+
+    needle, haystack, missing = tool.run_many(["needle", "ünicode haystack", "absent"])
+    assert sorted(os.path.basename(item["path"]) for item in needle.items) == ["note0.md", "note1.md", "note2.md"]
+    assert [os.path.basename(item["path"]) for item in haystack.items] == ["other.txt"]
+    assert missing.items == []
+
+
+def test_large_files_are_searched_without_a_limit(tmp_path):
+    (tmp_path / "big.log").write_bytes(b"x" * (9 << 20) + b" needle\n")
+    tool = LocalSearchTool(str(tmp_path), index_path=str(tmp_path / ".index.sqlite"))
+    assert [os.path.basename(item["path"]) for item in tool.run("needle").items] == ["big.log"]
+
+    capped = LocalSearchTool(str(tmp_path), index_path=str(tmp_path / ".capped.sqlite"), max_file_bytes=1 << 20)
+    assert capped.run("needle").items == []
+
+
+def test_max_files_is_still_accepted(tmp_path):
+    make_tree(tmp_path, 5)
+    tool = LocalSearchTool(str(tmp_path), 2, index_path=str(tmp_path / ".index.sqlite"))
+    assert len(tool.run("needle").items) == 2
+
+    tools = build_tools({"local_search": {"enabled": True, "root": str(tmp_path), "max_files": 3, "max_bytes": 100,
+                                          "index_path": str(tmp_path / ".config.sqlite")}})
+    assert (tools["local_search"].max_files, tools["local_search"].max_file_bytes) == (3, 100)
+
+
+def test_files_added_between_queries_are_found(tmp_path):
+    make_tree(tmp_path, 1)
+    tool = LocalSearchTool(str(tmp_path), index_path=str(tmp_path / ".index.sqlite"), refresh_interval=0)
+    assert len(tool.run("needle").items) == 1
+
+    (tmp_path / "late.md").write_text("a needle written later\n", encoding="utf-8")
+    assert sorted(os.path.basename(item["path"]) for item in tool.run("needle").items) == ["late.md", "note0.md"]
@@ -0,0 +1,79 @@
+import argparse
+import json
+import os
+import sys
+import tempfile
+from typing import List
+
+from src.bench import ALL_OPS, RECORD_TYPES, RecorderBench, compare
+from src.generate import SIZES
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.abspath(os.path.join(BENCH_DIR, "..", "..", ".."))
+
+
+def _split(value: str, allowed: List[str], name: str) -> List[str]:
+    items = [v.strip() for v in value.split(",") if v.strip()]
+    unknown = [v for v in items if v not in allowed]
+    if unknown:
+        raise SystemExit(f"unknown {name}: {', '.join(unknown)} (choose from {', '.join(allowed)})")
+    return items
+
+
+def _load(path: str) -> dict:
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def cmd_run(args: argparse.Namespace) -> None:
+    bench = RecorderBench(REPO_ROOT, args.data_dir, samples=args.samples, seed=args.seed)
+    report = bench.run(
+        _split(args.sizes, list(SIZES), "size"),
+        _split(args.types, RECORD_TYPES, "type"),
+        _split(args.ops, ALL_OPS, "op"),
+        log=lambda line: print(line, file=sys.stderr),
+    )
+    os.makedirs(args.output_dir, exist_ok=True)
+    commit = (report["git"]["commit"] or "nogit")[:7]
+    stamp = report["created_at"][:19].replace(":", "").replace("-", "").replace("T", "-")
+    path = os.path.join(args.output_dir, f"{stamp}-{commit}{'-dirty' if report['git']['dirty'] else ''}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(path)
+
+
+def cmd_compare(args: argparse.Namespace) -> None:
+    rows = compare(_load(args.base), _load(args.head), args.threshold)
+    for row in rows:
+        flag = "  REGRESSION" if row["regression"] else ""
+        print(f"{row['case']:<36} {row['base_ms']:>10.2f} -> {row['head_ms']:>10.2f} ms  x{row['ratio']:.2f}{flag}")
+    if any(row["regression"] for row in rows):
+        raise SystemExit(1)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Recorder benchmark suite")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run = sub.add_parser("run", help="generate synthetic histories and time recorder operations")
+    run.add_argument("--sizes", default="small", help=f"comma list of {', '.join(SIZES)}")
+    run.add_argument("--types", default=",".join(RECORD_TYPES), help="comma list of record types")
+    run.add_argument("--ops", default=",".join(ALL_OPS), help="comma list of operations")
+    run.add_argument("--samples", type=int, default=5, help="timed samples per case")
+    run.add_argument("--seed", type=int, default=7)
+    run.add_argument("--data-dir", default=os.path.join(tempfile.gettempdir(), "recorder_bench"))
+    run.add_argument("--output-dir", default=os.path.join(BENCH_DIR, "results"))
+    run.set_defaults(func=cmd_run)
+
+    cmp = sub.add_parser("compare", help="compare two result files by median time")
+    cmp.add_argument("base")
+    cmp.add_argument("head")
+    cmp.add_argument("--threshold", type=float, default=1.25, help="ratio that counts as a regression")
+    cmp.set_defaults(func=cmd_compare)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1 @@
+"""Recorder benchmark lab package."""
@@ -0,0 +1,177 @@
+from __future__ import annotations
+
+import datetime as dt
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+from typing import Dict, List, Optional
+
+from .generate import generate
+
+RECORDER_SCRIPTS = os.path.join(".codex", "skills", "recorder", "scripts")
+RECORD_TYPES = ["lifelog", "knowledge", "tasks"]
+CLI_OPS = ["create", "update", "update_patch", "delete", "query_scan"]
+INPROC_OPS = ["lookup_cold", "lookup_warm", "scan", "rewrite"]
+ALL_OPS = INPROC_OPS + CLI_OPS
+UPDATE_FIELDS = {"lifelog": "description", "knowledge": "summary", "tasks": "status"}
+CREATE_ARGS = {
+    "lifelog": ["--description", "基准 benchmark entry", "--module", "work", "--status", "done"],
+    "knowledge": ["--title", "基准 benchmark card", "--solution", "写入 append path", "--tags", "bench,perf"],
+    "tasks": ["--title", "基准 benchmark task", "--status", "todo", "--priority", "P2"],
+}
+
+
+def git_info(repo_root: str) -> Dict[str, object]:
+    def git(*args: str) -> str:
+        try:
+            return subprocess.run(
+                ["git", *args], cwd=repo_root, capture_output=True, text=True, check=True
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return ""
+
+    return {
+        "commit": git("rev-parse", "HEAD") or None,
+        "subject": git("log", "-1", "--format=%s") or None,
+        "dirty": bool(git("status", "--porcelain", "--", RECORDER_SCRIPTS)),
+    }
+
+
+def summarize_samples(samples: List[float]) -> Dict[str, object]:
+    ordered = sorted(samples)
+    return {
+        "n": len(ordered),
+        "median_ms": round(statistics.median(ordered), 3) if ordered else None,
+        "min_ms": round(ordered[0], 3) if ordered else None,
+        "max_ms": round(ordered[-1], 3) if ordered else None,
+        "samples_ms": [round(s, 3) for s in samples],
+    }
+
+
+class RecorderBench:
+    def __init__(self, repo_root: str, data_root: str, samples: int = 5, seed: int = 7) -> None:
+        self.repo_root = os.path.abspath(repo_root)
+        self.data_root = os.path.abspath(data_root)
+        self.scripts = os.path.join(self.repo_root, RECORDER_SCRIPTS)
+        self.samples = samples
+        self.rng = random.Random(seed)
+        self.seed = seed
+
+    def _cli(self, root: str, args: List[str]) -> float:
+        cmd = [sys.executable, os.path.join(self.scripts, "record_jsonl.py"), *args]
+        start = time.perf_counter()
+        proc = subprocess.run(cmd, cwd=root, capture_output=True, text=True)
+        elapsed = (time.perf_counter() - start) * 1000
+        if proc.returncode != 0:
+            raise RuntimeError(f"recorder failed ({' '.join(args[:4])}): {proc.stderr.strip()}")
+        return elapsed
+
+    def _inproc(self, root: str, record_type: str, op: str, ids: List[str]) -> List[float]:
+        job = {"scripts": self.scripts, "type": record_type, "op": op, "ids": ids, "samples": self.samples}
+        proc = subprocess.run(
+            [sys.executable, os.path.join(os.path.dirname(__file__), "inproc.py")],
+            cwd=root,
+            input=json.dumps(job),
+            capture_output=True,
+            text=True,
+        )
+        if proc.returncode != 0:
+            raise RuntimeError(f"in-process {op} failed: {proc.stderr.strip()}")
+        return json.loads(proc.stdout)["samples_ms"]
+
+    def _cli_args(self, record_type: str, op: str, record_id: str) -> List[str]:
+        if op == "create":
+            return ["--record-type", record_type, "--source", "conversation", *CREATE_ARGS[record_type]]
+        if op in ("update", "update_patch"):
+            value = "doing" if record_type == "tasks" else f"更新 updated {record_id}"
+            return [
+                "--record-type", "update", "--target-type", record_type, "--id", record_id,
+                "--key", UPDATE_FIELDS[record_type], "--value", value,
+                "--write-mode", "patch" if op == "update_patch" else "rewrite",
+            ]
+        if op == "delete":
+            return ["--record-type", "delete", "--target-type", record_type, "--id", record_id]
+        if op == "query_scan":
+            return ["--record-type", "query", "--target-type", record_type, "--where", "id=__bench_missing__"]
+        raise ValueError(op)
+
+    def run_case(self, root: str, record_type: str, op: str, pool: List[str]) -> List[float]:
+        if op in INPROC_OPS:
+            return self._inproc(root, record_type, op, self._take(pool))
+        ids = self._take(pool) if op in ("update", "update_patch", "delete") else [""] * self.samples
+        # The first write after generation builds every sidecar view; keep it out of the samples.
+        self._cli(root, self._cli_args(record_type, "query_scan" if op == "query_scan" else "create", ""))
+        return [self._cli(root, self._cli_args(record_type, op, record_id)) for record_id in ids]
+
+    def _take(self, pool: List[str]) -> List[str]:
+        picked = []
+        for _ in range(min(self.samples, len(pool))):
+            picked.append(pool.pop(self.rng.randrange(len(pool))))
+        return picked
+
+    def run_size(self, size: str, types: List[str], ops: List[str], log=print) -> List[Dict[str, object]]:
+        root = os.path.join(self.data_root, size)
+        started = time.perf_counter()
+        stats = generate(root, self.repo_root, size, self.seed)
+        log(f"[{size}] generated in {time.perf_counter() - started:.1f}s")
+        results = []
+        for record_type in types:
+            pool = list(stats["ids"][record_type])
+            for op in [o for o in ALL_OPS if o in ops]:
+                samples = self.run_case(root, record_type, op, pool)
+                entry = {
+                    "size": size,
+                    "type": record_type,
+                    "op": op,
+                    "kind": "inproc" if op in INPROC_OPS else "cli",
+                    **stats["types"][record_type],
+                    **summarize_samples(samples),
+                }
+                results.append(entry)
+                log(f"[{size}] {record_type:<9} {op:<12} median {entry['median_ms']} ms")
+        return results
+
+    def run(self, sizes: List[str], types: List[str], ops: List[str], log=print) -> Dict[str, object]:
+        results: List[Dict[str, object]] = []
+        for size in sizes:
+            results.extend(self.run_size(size, types, ops, log))
+        return {
+            "version": 1,
+            "created_at": dt.datetime.now().astimezone().isoformat(timespec="seconds"),
+            "git": git_info(self.repo_root),
+            "env": {
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "cpus": os.cpu_count(),
+            },
+            "params": {"sizes": sizes, "types": types, "ops": ops, "samples": self.samples, "seed": self.seed},
+            "results": results,
+        }
+
+
+def result_key(entry: Dict[str, object]) -> str:
+    return f"{entry['size']}/{entry['type']}/{entry['op']}"
+
+
+def compare(base: Dict[str, object], head: Dict[str, object], threshold: float = 1.25) -> List[Dict[str, object]]:
+    """Pair up cases by size/type/op and report the head/base ratio of median times."""
+    before = {result_key(e): e for e in base.get("results", [])}
+    rows = []
+    for entry in head.get("results", []):
+        old: Optional[Dict[str, object]] = before.get(result_key(entry))
+        if not old or not old.get("median_ms") or entry.get("median_ms") is None:
+            continue
+        ratio = entry["median_ms"] / old["median_ms"]
+        rows.append({
+            "case": result_key(entry),
+            "base_ms": old["median_ms"],
+            "head_ms": entry["median_ms"],
+            "ratio": round(ratio, 3),
+            "regression": ratio >= threshold,
+        })
+    return rows
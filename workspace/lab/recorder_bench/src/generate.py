@@ -0,0 +1,183 @@
+from __future__ import annotations
+
+import datetime as dt
+import json
+import os
+import random
+import shutil
+from typing import Dict, List
+
+SCHEMA_SOURCE = os.path.join(".codex", "schema.json")
+
+MODULES = ["work", "life", "study", "health", "finance"]
+LIFELOG_STATUS = ["done", "done", "done", "doing", "todo"]
+TASK_STATUS = ["todo", "doing", "done"]
+PRIORITIES = ["P0", "P1", "P2", "P3"]
+SOURCES = ["conversation", "web", "manual"]
+ZH_WORDS = [
+    "索引", "记录", "补丁", "压缩", "检索", "任务", "日志", "归档", "快照", "缓存", "并发", "写锁",
+    "同步", "解析", "模型", "数据", "目录", "性能", "回归", "调研", "新闻", "知识", "分片", "清单",
+]
+EN_WORDS = [
+    "index", "record", "patch", "compact", "search", "task", "lifelog", "archive", "snapshot", "cache",
+    "lock", "fsync", "parser", "schema", "query", "latency", "throughput", "regression", "json", "sqlite",
+    "python", "dashboard", "segment", "manifest", "rollup", "offset", "stream", "window",
+]
+TAG_POOL = ["recorder", "perf", "python", "sqlite", "windows", "linux", "git", "llm", "web", "notes"]
+
+SIZES: Dict[str, Dict[str, int]] = {
+    "small": {"lifelog_days": 30, "lifelog_per_day": 8, "knowledge": 1000, "tasks": 500, "task_churn": 2},
+    "medium": {"lifelog_days": 365, "lifelog_per_day": 8, "knowledge": 10000, "tasks": 5000, "task_churn": 2},
+    "large": {"lifelog_days": 5 * 365, "lifelog_per_day": 8, "knowledge": 100000, "tasks": 50000, "task_churn": 3},
+}
+
+
+class TextGen:
+    def __init__(self, rng: random.Random) -> None:
+        self.rng = rng
+
+    def phrase(self, words: int) -> str:
+        parts = []
+        for _ in range(words):
+            if self.rng.random() < 0.5:
+                parts.append(self.rng.choice(ZH_WORDS) + self.rng.choice(ZH_WORDS))
+            else:
+                parts.append(self.rng.choice(EN_WORDS))
+        return " ".join(parts)
+
+    def tags(self) -> List[str]:
+        return self.rng.sample(TAG_POOL, self.rng.randint(1, 3))
+
+
+def iso(ts: dt.datetime) -> str:
+    return ts.isoformat(timespec="seconds")
+
+
+def write_jsonl(path: str, records: List[dict]) -> int:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    payload = "".join(json.dumps(r, ensure_ascii=False) + "\n" for r in records).encode("utf-8")
+    with open(path, "ab") as f:
+        f.write(payload)
+    return len(payload)
+
+
+def make_lifelog(text: TextGen, ts: dt.datetime, index: int) -> dict:
+    description = text.phrase(text.rng.randint(4, 10))
+    return {
+        "id": f"lifelog-{index:08d}",
+        "timestamp": iso(ts),
+        "module": text.rng.choice(MODULES),
+        "skill_name": "recorder",
+        "source": text.rng.choice(SOURCES),
+        "description": description,
+        "action": description,
+        "status": text.rng.choice(LIFELOG_STATUS),
+        "type": "lifelog",
+        "content": description,
+    }
+
+
+def make_knowledge(text: TextGen, ts: dt.datetime, index: int) -> dict:
+    title = text.phrase(text.rng.randint(3, 7))
+    return {
+        "title": title,
+        "summary": text.phrase(text.rng.randint(8, 20)),
+        "problem": text.phrase(text.rng.randint(6, 14)),
+        "solution": text.phrase(text.rng.randint(10, 30)),
+        "tags": text.tags(),
+        "module": text.rng.choice(MODULES),
+        "timestamp": iso(ts),
+        "type": "knowledge",
+        "source": text.rng.choice(SOURCES),
+        "content": title,
+        "id": f"knowledge-{index:08d}",
+    }
+
+
+def make_task(text: TextGen, ts: dt.datetime, index: int) -> dict:
+    title = text.phrase(text.rng.randint(3, 6))
+    due = ts + dt.timedelta(days=text.rng.randint(1, 30))
+    return {
+        "id": f"tasks-{index:08d}",
+        "type": "tasks",
+        "title": title,
+        "details": text.phrase(text.rng.randint(5, 15)),
+        "status": "todo",
+        "priority": text.rng.choice(PRIORITIES),
+        "module": text.rng.choice(MODULES),
+        "due": due.date().isoformat(),
+        "timestamp": iso(ts),
+        "source": text.rng.choice(SOURCES),
+        "content": title,
+    }
+
+
+def churn_patch(text: TextGen, record_id: str, ts: dt.datetime) -> dict:
+    """A patch-log op in the recorder's own format (see record_patches.build_patch)."""
+    changes = {"status": text.rng.choice(TASK_STATUS), "priority": text.rng.choice(PRIORITIES)}
+    if changes["status"] == "done":
+        changes["completed_at"] = iso(ts)
+    return {"op": "patch", "id": record_id, "set": changes, "timestamp": iso(ts)}
+
+
+def prepare_workspace(root: str, repo_root: str) -> None:
+    if os.path.exists(root):
+        shutil.rmtree(root)
+    os.makedirs(os.path.join(root, ".codex"), exist_ok=True)
+    shutil.copyfile(os.path.join(repo_root, SCHEMA_SOURCE), os.path.join(root, SCHEMA_SOURCE))
+
+
+def generate(root: str, repo_root: str, size: str, seed: int = 7) -> Dict[str, object]:
+    """Write a synthetic records tree under root/workspace/records and return its stats and sample ids."""
+    spec = SIZES[size]
+    rng = random.Random(seed)
+    text = TextGen(rng)
+    prepare_workspace(root, repo_root)
+    records_root = os.path.join(root, "workspace", "records")
+    end = dt.datetime(2026, 1, 1, tzinfo=dt.timezone(dt.timedelta(hours=8)))
+    stats: Dict[str, object] = {"size": size, "seed": seed, "spec": spec, "types": {}, "ids": {}}
+
+    lifelog_bytes = 0
+    lifelog_ids: List[str] = []
+    index = 0
+    start_day = end - dt.timedelta(days=spec["lifelog_days"])
+    for day in range(spec["lifelog_days"]):
+        base = start_day + dt.timedelta(days=day)
+        batch = []
+        for _ in range(spec["lifelog_per_day"]):
+            ts = base + dt.timedelta(minutes=rng.randint(7 * 60, 23 * 60))
+            batch.append(make_lifelog(text, ts, index))
+            index += 1
+        batch.sort(key=lambda r: r["timestamp"])
+        path = os.path.join(records_root, "lifelog", f"{base:%Y}", f"{base:%m}", f"{base:%d}.jsonl")
+        lifelog_bytes += write_jsonl(path, batch)
+        lifelog_ids.append(batch[0]["id"])
+    stats["types"]["lifelog"] = {"records": index, "files": spec["lifelog_days"], "bytes": lifelog_bytes}
+    stats["ids"]["lifelog"] = lifelog_ids
+
+    knowledge = []
+    start = end - dt.timedelta(days=spec["lifelog_days"])
+    step = (end - start) / max(spec["knowledge"], 1)
+    for i in range(spec["knowledge"]):
+        knowledge.append(make_knowledge(text, start + step * i, i))
+    path = os.path.join(records_root, "knowledge", "knowledge.jsonl")
+    stats["types"]["knowledge"] = {"records": len(knowledge), "files": 1, "bytes": write_jsonl(path, knowledge)}
+    stats["ids"]["knowledge"] = [r["id"] for r in knowledge]
+
+    task_step = (end - start) / max(spec["tasks"], 1)
+    tasks = [make_task(text, start + task_step * i, i) for i in range(spec["tasks"])]
+    path = os.path.join(records_root, "tasks", "tasks.jsonl")
+    task_bytes = write_jsonl(path, tasks)
+    churn = []
+    for i in range(spec["tasks"] * spec["task_churn"]):
+        target = tasks[rng.randrange(len(tasks))]
+        churn.append(churn_patch(text, target["id"], end + dt.timedelta(minutes=i)))
+    patch_bytes = write_jsonl(path + ".patches", churn)
+    stats["types"]["tasks"] = {
+        "records": len(tasks),
+        "patches": len(churn),
+        "files": 1,
+        "bytes": task_bytes + patch_bytes,
+    }
+    stats["ids"]["tasks"] = [r["id"] for r in tasks]
+    return stats
@@ -0,0 +1,74 @@
+"""In-process timing worker.
+
+Runs inside the synthetic workspace (cwd) in its own interpreter so recorder module caches never leak between
+benchmark cases. Reads a JSON job from stdin and prints {"samples_ms": [...]} to stdout.
+"""
+from __future__ import annotations
+
+import json
+import os
+import sys
+import time
+from typing import Callable, List
+
+
+def _timed(fn: Callable[[], object]) -> float:
+    start = time.perf_counter()
+    fn()
+    return (time.perf_counter() - start) * 1000
+
+
+def _drop_id_index(recorder, record_type: str) -> None:
+    index = recorder._record_indexes.pop(record_type, None)
+    if index is not None:
+        index.close()
+    base = os.path.join(recorder.RECORDS_ROOT, record_type, recorder.INDEX_DIRNAME, "ids.sqlite")
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(base + suffix):
+            os.remove(base + suffix)
+
+
+def _scan(recorder, record_type: str) -> int:
+    paths = recorder.list_lifelog_files() if record_type == "lifelog" else [recorder.get_record_path(record_type)]
+    return sum(len(recorder.load_records_with_raw(path)) for path in paths)
+
+
+def run(job: dict) -> List[float]:
+    sys.path.insert(0, job["scripts"])
+    import record_jsonl as recorder
+
+    record_type = job["type"]
+    ids = job["ids"]
+    op = job["op"]
+    samples: List[float] = []
+    if op == "lookup_cold":
+        for record_id in ids:
+            _drop_id_index(recorder, record_type)
+            samples.append(_timed(lambda: recorder.find_record_by_id(record_type, record_id)))
+    elif op == "lookup_warm":
+        recorder.find_record_by_id(record_type, ids[0])
+        for record_id in ids:
+            samples.append(_timed(lambda: recorder.find_record_by_id(record_type, record_id)))
+    elif op == "scan":
+        for _ in range(job["samples"]):
+            samples.append(_timed(lambda: _scan(recorder, record_type)))
+    elif op == "rewrite":
+        if record_type == "lifelog":
+            path = recorder.list_lifelog_files()[-1]
+        else:
+            path = recorder.get_record_path(record_type)
+        for _ in range(job["samples"]):
+            records = recorder.load_records_with_raw(path)
+            samples.append(_timed(lambda: recorder.write_records(path, records)))
+    else:
+        raise SystemExit(f"unknown in-process op: {op}")
+    return samples
+
+
+def main() -> None:
+    job = json.load(sys.stdin)
+    print(json.dumps({"samples_ms": run(job)}))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,161 @@
+const utf8 = new TextEncoder();
+const lineOffsets = new WeakMap();
+
 export function parseJsonl(text) {
-  return text.split(/\r?\n/).filter(Boolean).map(line => {
+  const records = [];
+  let offset = 0;
+  for (const piece of text.split('\n')) {
+    const start = offset;
+    offset += utf8.encode(piece).length + 1;
+    const line = piece.replace(/\r$/, '');
+    if (!line) continue;
+    let record;
     try {
-      return JSON.parse(line);
+      record = JSON.parse(line);
     } catch (e) {
-      return { _parseError: true, raw: line };
+      record = { _parseError: true, raw: line };
+    }
+    if (record && typeof record === 'object') lineOffsets.set(record, start);
+    records.push(record);
+  }
+  return records;
+}
+
+// Ops carry the base file size at write time ("end"); lines appended after it, e.g. a record
+// re-created with a deleted id, are out of reach. Ops without "end" reach every line.
+function opReaches(op, record) {
+  const offset = lineOffsets.get(record);
+  return !Number.isInteger(op.end) || offset === undefined || offset < op.end;
+}
+
+export function applyPatchLog(records, text) {
+  if (!text) return records;
+  const ops = parseJsonl(text).filter(op => op && op.id && (op.op === 'patch' || op.op === 'delete'));
+  if (ops.length === 0) return records;
+  const byId = new Map();
+  for (const r of records) {
+    if (!r || !r.id) continue;
+    if (!byId.has(r.id)) byId.set(r.id, []);
+    byId.get(r.id).push(r);
+  }
+  const deleted = new Set();
+  for (const op of ops) {
+    for (const r of byId.get(op.id) || []) {
+      if (deleted.has(r) || !opReaches(op, r)) continue;
+      if (op.op === 'delete') deleted.add(r);
+      else Object.assign(r, op.set || {});
     }
-  });
+  }
+  return deleted.size ? records.filter(r => !deleted.has(r)) : records;
+}
+
+export async function fetchPatchLog(path) {
+  try {
+    const res = await fetch(`${path}.patches`, { cache: 'no-store' });
+    return res.ok ? await res.text() : '';
+  } catch (e) {
+    return '';
+  }
+}
+
+async function headSize(path) {
+  try {
+    const res = await fetch(path, { method: 'HEAD', cache: 'no-store' });
+    if (!res.ok) return { size: null, modified: 0 };
+    return { size: Number(res.headers.get('Content-Length')), modified: Date.parse(res.headers.get('Last-Modified') || '') || 0 };
+  } catch (e) {
+    return { size: null, modified: 0 };
+  }
+}
+
+// Exports are rebuilt on sync / service idle, so compare them with the live source before trusting them.
+export async function exportIsStale(res, sourcePath, source) {
+  if (!source) return true;
+  const exported = Date.parse(res.headers.get('Last-Modified') || '') || 0;
+  const [base, patches] = await Promise.all([headSize(sourcePath), headSize(`${sourcePath}.patches`)]);
+  if (base.size !== (source.bytes ?? null) || patches.size !== (source.patch_bytes ?? null)) return true;
+  return Math.max(base.modified, patches.modified) > exported;
+}
+
+const SEARCH_TOKEN_RE = /([0-9a-z]+)|([\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff\uac00-\ud7af]+)/g;
+
+export function tokenizeSearchText(text) {
+  const tokens = [];
+  for (const m of String(text || '').toLowerCase().matchAll(SEARCH_TOKEN_RE)) {
+    if (m[1]) {
+      tokens.push(m[1]);
+    } else if (m[2].length === 1) {
+      tokens.push(m[2]);
+    } else {
+      for (let i = 0; i < m[2].length - 1; i += 1) tokens.push(m[2].slice(i, i + 2));
+    }
+  }
+  return tokens;
+}
+
+export async function fetchSearchShard(path) {
+  try {
+    const res = await fetch(path, { cache: 'no-store' });
+    if (!res.ok) return null;
+    const shard = await res.json();
+    if (!shard || !Array.isArray(shard.ids) || !shard.terms) return null;
+    return { shard, res };
+  } catch (e) {
+    return null;
+  }
+}
+
+export async function fetchRollup(paths) {
+  try {
+    const result = await fetchFirst(paths);
+    const rollup = await result.res.json();
+    return rollup && Array.isArray(rollup.dims) && Array.isArray(rollup.cells) ? rollup : null;
+  } catch (e) {
+    return null;
+  }
+}
+
+export function sumRollup(rollup, match = {}) {
+  const checks = Object.entries(match).map(([dim, value]) => [rollup.dims.indexOf(dim), value]);
+  let total = 0;
+  for (const cell of rollup.cells) {
+    if (checks.every(([i, value]) => i >= 0 && (typeof value === 'function' ? value(cell[i]) : cell[i] === value))) {
+      total += cell[cell.length - 1];
+    }
+  }
+  return total;
+}
+
+export function groupRollup(rollup, dim) {
+  const i = rollup.dims.indexOf(dim);
+  const groups = new Map();
+  if (i < 0) return groups;
+  for (const cell of rollup.cells) {
+    groups.set(cell[i], (groups.get(cell[i]) || 0) + cell[cell.length - 1]);
+  }
+  return groups;
+}
+
+export function searchShard(shard, query) {
+  const terms = Array.from(new Set(tokenizeSearchText(query)));
+  const n = shard.ids.length;
+  const avgdl = shard.avgdl || 1;
+  const scores = new Map();
+  for (const term of terms) {
+    const postings = shard.terms[term];
+    if (!postings) continue;
+    const df = postings.length / 2;
+    const idf = Math.log(1 + (n - df + 0.5) / (df + 0.5));
+    for (let i = 0; i < postings.length; i += 2) {
+      const doc = postings[i];
+      const tf = postings[i + 1];
+      const norm = tf + shard.k1 * (1 - shard.b + shard.b * shard.lengths[doc] / avgdl);
+      scores.set(doc, (scores.get(doc) || 0) + idf * tf * (shard.k1 + 1) / norm);
+    }
+  }
+  return Array.from(scores.entries())
+    .sort((a, b) => b[1] - a[1])
+    .map(([doc, score]) => ({ id: shard.ids[doc], doc, score }));
 }
 
 export function extractDateOnly(value) {
@@ -1,6 +1,16 @@
-import { parseJsonl, formatDateTime, toText } from './common.js';
+import {
+  parseJsonl,
+  applyPatchLog,
+  fetchPatchLog,
+  fetchSearchShard,
+  exportIsStale,
+  searchShard,
+  formatDateTime,
+  toText
+} from './common.js';
 
 let allKnowledge = [];
+let knowledgeShard = null;
 let knowledgeTimer = null;
 
 function renderKnowledge(items) {
@@ -41,6 +51,10 @@ function applyKnowledgeFilters() {
     renderKnowledge(allKnowledge);
     return;
   }
+  if (knowledgeShard) {
+    renderKnowledge(searchShard(knowledgeShard, search).map(hit => knowledgeShard.docs[hit.doc]));
+    return;
+  }
   const filtered = allKnowledge.filter(item => {
     const blob = JSON.stringify(item).toLowerCase();
     return blob.includes(search);
@@ -54,13 +68,27 @@ function getKnowledgeBase() {
   return `${root}records/knowledge/knowledge.jsonl`;
 }
 
+async function loadKnowledgeShard(path) {
+  const result = await fetchSearchShard(path.replace(/knowledge\.jsonl$/, 'search.json'));
+  if (!result || !Array.isArray(result.shard.docs)) return null;
+  if (await exportIsStale(result.res, path, result.shard.source)) return null;
+  return result.shard;
+}
+
+async function loadKnowledgeItems(path) {
+  // The shard already holds the card fields; the raw JSONL is only read when it is missing or stale.
+  knowledgeShard = await loadKnowledgeShard(path);
+  if (knowledgeShard) return knowledgeShard.docs.slice();
+  const res = await fetch(path, { cache: 'no-store' });
+  if (!res.ok) throw new Error(`HTTP ${res.status}`);
+  const text = await res.text();
+  return applyPatchLog(parseJsonl(text), await fetchPatchLog(path)).filter(i => !i._parseError);
+}
+
 async function loadKnowledge() {
   const status = document.getElementById('knowledgeStatus');
   try {
-    const res = await fetch(getKnowledgeBase(), { cache: 'no-store' });
-    if (!res.ok) throw new Error(`HTTP ${res.status}`);
-    const text = await res.text();
-    const items = parseJsonl(text).filter(i => !i._parseError);
+    const items = await loadKnowledgeItems(getKnowledgeBase());
     items.sort((a, b) => (Date.parse(b.timestamp || '') || 0) - (Date.parse(a.timestamp || '') || 0));
     allKnowledge = items;
     if (status) status.textContent = `已加载 ${items.length} 条`;
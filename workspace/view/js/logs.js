@@ -8,7 +8,9 @@ import {
   formatTimeShort,
   formatDateTime,
   toText,
-  debounce
+  debounce,
+  fetchRollup,
+  groupRollup
 } from './common.js';
 
 let allLifelog = [];
@@ -16,6 +18,12 @@ let lifelogRangeKey = null;
 let lifelogSource = null;
 let lifelogBase = null;
 let lifelogFileIndex = null;
+let lifelogManifest = null;
+let lifelogDayCounts = null;
+let lifelogHistoryTotal = null;
+const manifestByBase = new Map();
+const segmentDaysByBase = new Map();
+const segmentBuffers = new Map();
 let filteredLifelog = [];
 let rangeStart = null;
 let rangeEnd = null;
@@ -86,7 +94,10 @@ function updateTimelineControls() {
   const loadMoreBtn = document.getElementById('logLoadMore');
   const total = filteredLifelog.length;
   const shown = Math.min(timelineState.rendered, total);
-  if (countEl) countEl.textContent = `Showing ${shown} / ${total}`;
+  if (countEl) {
+    const history = lifelogHistoryTotal !== null ? ` (${lifelogHistoryTotal} in history)` : '';
+    countEl.textContent = `Showing ${shown} / ${total}${history}`;
+  }
   if (loadMoreBtn) loadMoreBtn.style.display = shown < total ? 'inline-flex' : 'none';
 }
 
@@ -122,7 +133,8 @@ function renderTimelineChunk(reset = false) {
     if (date && date !== timelineState.lastDate) {
       const header = document.createElement('div');
       header.className = 'timeline-date';
-      header.textContent = date;
+      const dayCount = lifelogDayCounts?.get(date);
+      header.textContent = dayCount ? `${date} · ${dayCount}` : date;
       header.id = `log-date-${date}`;
       header.dataset.date = date;
       timeline.appendChild(header);
@@ -235,16 +247,18 @@ function filterByName(entries, name) {
 
 async function loadOlderRangeChunk(statusEl) {
   if (isLoadingMore || !hasMoreOlder || !rangeStart) return;
-  const newEnd = shiftDate(rangeStart, -1);
-  const newStart = shiftDate(rangeStart, -3);
-  if (!newEnd || !newStart) return;
-  const files = buildRangeFiles(newStart, newEnd);
+  let newStart = shiftDate(rangeStart, -3);
+  const files = buildRangeFiles(newStart, shiftDate(rangeStart, -1));
   if (!files.length) return;
   isLoadingMore = true;
   try {
     const index = await getLifelogFileIndex();
     let useFiles = files;
-    if (index && index.length) {
+    if (index && lifelogManifest) {
+      const boundary = manifestDayFile(rangeStart);
+      useFiles = index.filter(f => f < boundary).slice(-files.length);
+      if (useFiles.length) newStart = useFiles[0].slice(0, -'.jsonl'.length).replace(/\//g, '-');
+    } else if (index && index.length) {
       const set = new Set(index);
       useFiles = files.filter(f => set.has(f));
     }
@@ -380,12 +394,93 @@ async function tryListFilesFromDirectory() {
   throw new Error('no directory listing');
 }
 
+function manifestDayFile(day) {
+  return `${day.replace(/-/g, '/')}.jsonl`;
+}
+
+async function fetchLifelogManifest(base) {
+  if (manifestByBase.has(base)) return manifestByBase.get(base);
+  let manifest = null;
+  try {
+    const res = await fetch(`${base}manifest.json`, { cache: 'no-cache' });
+    if (res.ok) {
+      const data = await res.json();
+      if (data && data.days) manifest = data;
+    }
+  } catch (e) {
+    // no manifest generated yet
+  }
+  manifestByBase.set(base, manifest);
+  return manifest;
+}
+
+async function getSegmentDays(base) {
+  if (segmentDaysByBase.has(base)) return segmentDaysByBase.get(base);
+  const days = new Map();
+  const manifest = await fetchLifelogManifest(base);
+  for (const [day, entry] of Object.entries(manifest?.days || {})) {
+    if (entry.segment) {
+      days.set(manifestDayFile(day), { file: entry.segment, offset: entry.offset, length: entry.length });
+    }
+  }
+  segmentDaysByBase.set(base, days);
+  return days;
+}
+
+async function loadLifelogRollup() {
+  const rollup = await fetchRollup(getLifelogBases().map(base => `${base}rollup.json`));
+  if (!rollup) return;
+  lifelogDayCounts = groupRollup(rollup, 'day');
+  lifelogHistoryTotal = rollup.total;
+  updateTimelineControls();
+}
+
+async function loadManifestIndex() {
+  for (const base of getLifelogBases()) {
+    const manifest = await fetchLifelogManifest(base);
+    if (!manifest) continue;
+    lifelogBase = base;
+    lifelogManifest = manifest;
+    return Object.keys(manifest.days)
+      .filter(day => manifest.days[day].count !== 0)
+      .sort()
+      .map(manifestDayFile);
+  }
+  return null;
+}
+
+async function fetchSegmentDay(baseDir, frame) {
+  const url = `${baseDir}${frame.file}`;
+  const end = frame.offset + frame.length;
+  let bytes = null;
+  let whole = segmentBuffers.get(url);
+  if (!whole) {
+    const res = await fetch(url, { headers: { Range: `bytes=${frame.offset}-${end - 1}` } });
+    if (!res.ok) return '';
+    if (res.status === 206) {
+      bytes = await res.arrayBuffer();
+    } else {
+      whole = await res.arrayBuffer();
+      segmentBuffers.set(url, whole);
+    }
+  }
+  if (!bytes) bytes = whole.slice(frame.offset, end);
+  const stream = new Blob([bytes]).stream().pipeThrough(new DecompressionStream('gzip'));
+  return new Response(stream).text();
+}
+
 async function getLifelogFileIndex() {
   if (Array.isArray(lifelogFileIndex)) return lifelogFileIndex;
+  const manifestFiles = await loadManifestIndex();
+  if (manifestFiles) {
+    lifelogFileIndex = manifestFiles;
+    return lifelogFileIndex;
+  }
   try {
     const result = await tryListFilesFromDirectory();
     lifelogBase = result.base;
-    lifelogFileIndex = result.files || [];
+    const segments = await getSegmentDays(result.base);
+    lifelogFileIndex = Array.from(new Set([...(result.files || []), ...segments.keys()])).sort();
     return lifelogFileIndex;
   } catch (e) {
     lifelogFileIndex = null;
@@ -411,9 +506,12 @@ async function fetchLifelogEntries(files, baseDir, statusEl) {
   const texts = [];
   const batchSize = 20;
   try {
+    const segments = await getSegmentDays(baseDir);
     for (let i = 0; i < files.length; i += batchSize) {
       const batch = files.slice(i, i + batchSize);
-      const results = await Promise.all(batch.map(f => fetch(`${baseDir}${f}`).then(r => r.ok ? r.text() : '')));
+      const results = await Promise.all(batch.map(f => segments.has(f)
+        ? fetchSegmentDay(baseDir, segments.get(f))
+        : fetch(`${baseDir}${f}`).then(r => r.ok ? r.text() : '')));
       texts.push(...results);
       const done = Math.min(i + batchSize, files.length);
       setLogLoading(true, `Loading... ${done}/${files.length}`);
@@ -560,5 +658,6 @@ export function initLogs(statusEl) {
   rangeEnd = end;
   lifelogRangeKey = `${start}..${end}`;
   lifelogSource = 'range';
+  loadLifelogRollup();
   loadLifelogByRange(start, end, statusEl);
 }
@@ -1,4 +1,4 @@
-import { parseJsonl, formatDateShort, inDateRange, fetchFirst, debounce } from './common.js';
+import { parseJsonl, applyPatchLog, fetchPatchLog, formatDateShort, inDateRange, fetchFirst, debounce } from './common.js';
 
 let allItems = [];
 let allRecords = [];
@@ -186,9 +186,9 @@ async function loadNews() {
     '../../records/news/news.jsonl'
   ];
   try {
-    const { res } = await fetchFirst(paths);
+    const { res, path } = await fetchFirst(paths);
     const text = await res.text();
-    const records = parseJsonl(text).filter(r => !r._parseError);
+    const records = applyPatchLog(parseJsonl(text), await fetchPatchLog(path)).filter(r => !r._parseError);
     allRecords = records;
     allItems = flattenRecords(records);
     updateCategoryOptions(allItems);
@@ -1,9 +1,14 @@
 import {
   parseJsonl,
+  applyPatchLog,
+  fetchPatchLog,
   inDateRange,
   formatDateShort,
   debounce,
   fetchFirst,
+  exportIsStale,
+  fetchRollup,
+  sumRollup,
   setActiveButton,
   clearActiveButtons
 } from './common.js';
@@ -58,19 +63,22 @@ function renderTaskTable(tasks) {
   if (tableEl) tableEl.innerHTML = table.join('');
 }
 
+function renderTaskSummary(total, pending, done) {
+  const summary = document.getElementById('taskSummary');
+  if (!summary) return;
+  summary.innerHTML = '';
+  summary.appendChild(makeStatCard('Total', String(total), ''));
+  summary.appendChild(makeStatCard('Pending', String(pending), 'stat-accent-pending'));
+  summary.appendChild(makeStatCard('Done', String(done), 'stat-accent-done'));
+}
+
 function renderTasks(tasks) {
   const pending = tasks.filter(t => t.status !== 'done');
   const dueOf = t => t.due_time || t.due || '';
   pending.sort((a, b) => dueOf(a).localeCompare(dueOf(b)));
   const done = tasks.filter(t => t.status === 'done');
 
-  const summary = document.getElementById('taskSummary');
-  if (summary) {
-    summary.innerHTML = '';
-    summary.appendChild(makeStatCard('Total', String(tasks.length), ''));
-    summary.appendChild(makeStatCard('Pending', String(pending.length), 'stat-accent-pending'));
-    summary.appendChild(makeStatCard('Done', String(done.length), 'stat-accent-done'));
-  }
+  renderTaskSummary(tasks.length, pending.length, done.length);
 
   const list = document.getElementById('taskList');
   if (list) {
@@ -126,21 +134,78 @@ function applyTaskFilters() {
   renderTasks(tasks);
 }
 
+async function loadTaskSnapshot() {
+  const candidates = [
+    '../records/tasks/snapshot.json',
+    './records/tasks/snapshot.json',
+    '/records/tasks/snapshot.json',
+    '/workspace/records/tasks/snapshot.json'
+  ];
+  const result = await fetchFirst(candidates);
+  const snapshot = await result.res.json();
+  if (!snapshot || !Array.isArray(snapshot.tasks)) throw new Error('invalid task snapshot');
+  const dir = result.path.replace(/snapshot\.json$/, '');
+  if (await exportIsStale(result.res, `${dir}tasks.jsonl`, snapshot.source)) throw new Error('stale task snapshot');
+  return { tasks: snapshot.tasks, path: result.path, history: `${dir}history.json` };
+}
+
+async function loadTaskHistory(path) {
+  try {
+    const res = await fetch(path, { cache: 'no-store' });
+    if (!res.ok) return [];
+    const history = await res.json();
+    return Array.isArray(history?.tasks) ? history.tasks : [];
+  } catch (e) {
+    return [];
+  }
+}
+
+async function loadTaskLog() {
+  const candidates = [
+    '../records/tasks/tasks.jsonl',
+    './records/tasks/tasks.jsonl',
+    '/records/tasks/tasks.jsonl',
+    '/workspace/records/tasks/tasks.jsonl'
+  ];
+  const result = await fetchFirst(candidates);
+  const text = await result.res.text();
+  return { tasks: applyPatchLog(parseJsonl(text), await fetchPatchLog(result.path)), path: result.path };
+}
+
+async function renderRollupSummary() {
+  const rollup = await fetchRollup([
+    '../records/tasks/rollup.json',
+    './records/tasks/rollup.json',
+    '/records/tasks/rollup.json',
+    '/workspace/records/tasks/rollup.json'
+  ]);
+  if (!rollup || allTasks.length) return;
+  const done = sumRollup(rollup, { status: 'done' });
+  renderTaskSummary(rollup.total, rollup.total - done, done);
+}
+
 export async function loadTasks(statusEl) {
+  renderRollupSummary();
   try {
-    const candidates = [
-      '../records/tasks/tasks.jsonl',
-      './records/tasks/tasks.jsonl',
-      '/records/tasks/tasks.jsonl',
-      '/workspace/records/tasks/tasks.jsonl'
-    ];
-    const result = await fetchFirst(candidates);
-    const text = await result.res.text();
-    allTasks = parseJsonl(text);
+    let result;
+    try {
+      result = await loadTaskSnapshot();
+    } catch (e) {
+      result = await loadTaskLog();
+    }
+    allTasks = result.tasks;
     applyTaskFilters();
     if (statusEl) {
       statusEl.textContent = `Loaded tasks: ${result.path.replace(/^\//, '')}`;
     }
+    if (result.history) {
+      // The snapshot only carries open tasks; done ones follow without blocking the first render.
+      const done = await loadTaskHistory(result.history);
+      if (done.length) {
+        allTasks = result.tasks.concat(done);
+        applyTaskFilters();
+      }
+    }
   } catch (e) {
     if (statusEl) {
       statusEl.textContent = 'Cannot read tasks.jsonl. Use Live Preview with access to workspace files.';